@@ -4,16 +4,17 @@ Located at: apps/news/admin.py
 """
 
 from django.contrib import admin
-from django.db.models import Count
 from django.utils.html import format_html
-from .models import Article, NewsSource, Category
+from .models import Article, NewsSource, Category, CategoryKeyword
+from .unique_views import unique_viewer_counts
 
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
     list_display = (
         'title_link', 'published_at', 'source', 'category',
-        'short_summary', 'views', 'display_image'
+        'short_summary', 'views', 'unique_viewers', 'comment_count',
+        'like_count', 'save_count', 'display_image'
     )
     list_filter = (
         'published_at', 'source', 'category'
@@ -22,9 +23,30 @@ class ArticleAdmin(admin.ModelAdmin):
         'title', 'content', 'summary', 'url'
     )
     date_hierarchy = 'published_at'
-    readonly_fields = ('slug', 'published_at', 'views')
+    readonly_fields = (
+        'slug', 'published_at', 'views', 'unique_viewers',
+        'comment_count', 'like_count', 'save_count'
+    )
     ordering = ('-published_at',)
 
+    def get_changelist_instance(self, request):
+        # One pipelined PFCOUNT for the page instead of one per row
+        changelist = super().get_changelist_instance(request)
+        counts = unique_viewer_counts(
+            article.id for article in changelist.result_list
+        )
+        for article in changelist.result_list:
+            article._unique_viewers = counts.get(article.id, 0)
+        return changelist
+
+    def unique_viewers(self, obj):
+        if not obj.pk:
+            return 0
+        if not hasattr(obj, '_unique_viewers'):
+            obj._unique_viewers = unique_viewer_counts([obj.pk])[obj.pk]
+        return obj._unique_viewers
+    unique_viewers.short_description = "Unique Viewers"
+
     def title_link(self, obj):
         try:
             url = obj.get_absolute_url()
@@ -54,23 +76,6 @@ class ArticleAdmin(admin.ModelAdmin):
         return "-"
     short_summary.short_description = "Summary"
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(
-            _like_count=Count('likes'),
-            _save_count=Count('saves'),
-        )
-
-    def like_count(self, obj):
-        return getattr(obj, '_like_count', 0)
-    like_count.admin_order_field = '_like_count'
-    like_count.short_description = "Likes"
-
-    def save_count(self, obj):
-        return getattr(obj, '_save_count', 0)
-    save_count.admin_order_field = '_save_count'
-    save_count.short_description = "Saves"
-
 
 @admin.register(NewsSource)
 class NewsSourceAdmin(admin.ModelAdmin):
@@ -95,4 +100,13 @@ class CategoryAdmin(admin.ModelAdmin):
         return "-"
     icon_preview.short_description = "Icon Preview"
 
+
+@admin.register(CategoryKeyword)
+class CategoryKeywordAdmin(admin.ModelAdmin):
+    list_display = ('keyword', 'category', 'weight')
+    list_editable = ('weight',)
+    list_filter = ('category',)
+    list_select_related = ('category',)
+    search_fields = ('keyword', 'category__name')
+
 import apps.news.admin_tasks  # NOQA
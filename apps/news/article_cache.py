@@ -0,0 +1,204 @@
+"""
+Rolling Redis cache of recently ingested articles.
+Each feed keeps a sorted set of URL hashes scored by publish time
+(news:v2:<feed>) next to a hash of JSON payloads keyed by the same URL
+hash (news:v2:<feed>:articles). The v2 prefix keeps these apart from the
+older news:<feed> lists, which simply expire. Writes go through one
+MULTI/EXEC pipeline, so dedupe and trimming stay O(log n) however large
+the window grows.
+The "latest" feed collects every article and backs the homepage.
+Located at: apps/news/article_cache.py
+"""
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+import redis
+from django.utils.dateparse import parse_datetime
+
+from apps.news.lookups import news_source_lookup
+from apps.news.models import Article
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Feed holding every cached article, newest first
+LATEST_FEED = "latest"
+
+# Set Redis expiry time for news articles (28 days)
+REDIS_ARTICLE_EXPIRY = timedelta(days=28).total_seconds()
+
+# Bumped whenever the layout of the feed keys changes
+KEY_PREFIX = "news:v2:"
+
+# Drop members beyond the window and their payloads in one step
+TRIM_WINDOW = """
+local trimmed = redis.call('zrange', KEYS[1], 0, -(tonumber(ARGV[1]) + 1))
+if #trimmed > 0 then
+    redis.call('zremrangebyrank', KEYS[1], 0, -(tonumber(ARGV[1]) + 1))
+    redis.call('hdel', KEYS[2], unpack(trimmed))
+end
+return #trimmed
+"""
+
+
+# Helper functions to generate Redis keys dynamically
+def get_redis_key(source):
+    return f"{KEY_PREFIX}{source.lower()}"
+
+
+def get_payload_key(source):
+    return f"{get_redis_key(source)}:articles"
+
+
+def url_hash(url):
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def article_payload(article):
+    """
+    Serialise an Article into the dict stored in the cache.
+    """
+    return {
+        "id": article.id,
+        "title": article.title,
+        "url": article.url,
+        "slug": article.slug,
+        "summary": article.summary,
+        "image_url": article.image_url,
+        "published_at": article.published_at.isoformat(),
+        "source": article.source.name if article.source else None,
+        "source_id": article.source_id,
+        "category_id": article.category_id,
+        "views": article.views,
+    }
+
+
+def article_from_payload(payload):
+    """
+    Rebuild a read-only Article instance from a cached payload.
+    The source comes from the lookup cache, so rendering a card
+    needs no extra query for it.
+    """
+    data = json.loads(payload)
+    article = Article(
+        id=data["id"],
+        title=data["title"],
+        url=data["url"],
+        slug=data.get("slug") or "",
+        summary=data.get("summary"),
+        image_url=data.get("image_url"),
+        published_at=parse_datetime(data["published_at"]),
+        category_id=data.get("category_id"),
+        views=data.get("views") or 0,
+    )
+    if data.get("source_id"):
+        article.source = news_source_lookup.get(id=data["source_id"])
+    article._state.adding = False
+    article._state.db = "default"
+    return article
+
+
+def write_articles(client, articles, source, max_articles=100):
+    """
+    Add payloads to one feed's rolling window in a single transaction.
+    ZADD NX skips URLs already cached; members beyond max_articles are
+    trimmed oldest first and their payloads removed in the same MULTI.
+    Returns the number of newly cached articles.
+    """
+    key = get_redis_key(source)
+    payload_key = get_payload_key(source)
+    members = {}
+    payloads = {}
+    for article in articles:
+        member = url_hash(article["url"])
+        published_at = parse_datetime(article["published_at"])
+        members[member] = published_at.timestamp() if published_at else 0
+        payloads[member] = json.dumps(article)
+    if not members:
+        return 0
+
+    trim = client.register_script(TRIM_WINDOW)
+    pipe = client.pipeline(transaction=True)
+    pipe.zadd(key, members, nx=True)
+    pipe.hset(payload_key, mapping=payloads)
+    trim(keys=[key, payload_key], args=[max_articles], client=pipe)
+    pipe.expire(key, int(REDIS_ARTICLE_EXPIRY))
+    pipe.expire(payload_key, int(REDIS_ARTICLE_EXPIRY))
+    return pipe.execute()[0]
+
+
+def cache_article(article, source=LATEST_FEED):
+    """
+    Add one saved article to a feed, e.g. after it is written by hand.
+    """
+    try:
+        write_articles(redis_client, [article_payload(article)], source)
+    except redis.RedisError as e:
+        logger.error(f"Redis error: {e}")
+
+
+def remove_article(url, source=LATEST_FEED):
+    """
+    Drop one article from a feed, e.g. after it is deleted.
+    """
+    member = url_hash(url)
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.zrem(get_redis_key(source), member)
+        pipe.hdel(get_payload_key(source), member)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.error(f"Redis error: {e}")
+
+
+def get_cached_articles(limit, source=LATEST_FEED):
+    """
+    Return up to `limit` cached Article instances, newest first.
+    Returns an empty list if Redis is unavailable.
+    """
+    try:
+        members = redis_client.zrevrange(get_redis_key(source), 0, limit - 1)
+        payloads = redis_client.hmget(
+            get_payload_key(source), members
+        ) if members else []
+    except redis.RedisError as e:
+        logger.error(f"Redis error: {e}")
+        return []
+    return [article_from_payload(payload) for payload in payloads if payload]
+
+
+def get_latest_articles(limit=12):
+    """
+    Latest articles for the homepage, served from the "latest" feed.
+    Falls back to the database while the cache is cold or short.
+    """
+    articles = get_cached_articles(limit)
+    if len(articles) < limit:
+        articles = list(
+            Article.objects.select_related("source")
+            .order_by("-published_at")[:limit]
+        )
+    return articles
+
+
+def apply_counters(articles):
+    """
+    Copy the current engagement counters onto articles rebuilt from the
+    cache, with a single query; payloads do not carry them since they
+    change far more often than the articles themselves.
+    """
+    counters = {
+        row[0]: row[1:]
+        for row in Article.objects.filter(
+            id__in=[article.id for article in articles]
+        ).values_list("id", *Article.counter_fields)
+    }
+    for article in articles:
+        for field, value in zip(
+            Article.counter_fields, counters.get(article.id, ())
+        ):
+            setattr(article, field, value)
+    return articles
@@ -0,0 +1,221 @@
+"""
+Search-as-you-type suggestions from a prefix index in Redis.
+Every article title is stored in one sorted set, and every category
+and source name in a second, once per word it contains: "climate talks
+stall" is indexed as "climate talks stall", "talks stall" and "stall",
+so typing any word of a title finds it. All members share score 0,
+which makes the sets ordered lexicographically, and a prefix lookup is
+one ZRANGEBYLEX.
+Because that range is cut off lexicographically, article matches are
+ranked the other way round: a Lua script walks the global trending set
+(see trending.py) best first and keeps the articles whose normalised
+title, held in a hash next to the index, has a word starting with the
+prefix. Untrended matches from the lexicographic range fill any slots
+left. A lookup is one pipelined Redis round trip and no database query.
+The indexes and the title hash are rebuilt into scratch keys and
+swapped in with RENAME after every ingestion batch and expiry run.
+Located at: apps/news/autocomplete.py
+"""
+
+import logging
+
+import redis
+
+from apps.news.lookups import category_lookup, news_source_lookup
+from apps.news.models import Article
+from apps.news.search import TOKEN_RE
+from apps.news.trending import GLOBAL_KEY, TRENDING_MAX_MEMBERS
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+INDEX_KEY = "autocomplete:index"
+NAMES_KEY = "autocomplete:names"
+TITLES_KEY = "autocomplete:titles"
+
+ARTICLE = "article"
+CATEGORY = "category"
+SOURCE = "source"
+
+# Separates the indexed term from the suggestion it points to; it sorts
+# below every printable character, so "stall" comes before "stalls"
+SEPARATOR = "\x1f"
+# Upper bound for a ZRANGEBYLEX prefix range
+LEX_MAX = "\U0010ffff"
+
+# Index at most this many of the newest articles, starting a term at
+# each of a title's first TERM_START_WORDS words
+AUTOCOMPLETE_MAX_ARTICLES = 5000
+TERM_START_WORDS = 8
+TERM_MAX_WORDS = 6
+
+MIN_PREFIX_LENGTH = 2
+# Entries read from each prefix range per lookup, before de-duplication
+CANDIDATE_LIMIT = 100
+# Category and source suggestions shown ahead of articles
+MAX_NAME_SUGGESTIONS = 2
+
+# Return up to ARGV[2] (id, label) pairs from the top ARGV[4] trending
+# articles whose normalised title has a word starting with ARGV[1];
+# titles are stored as "<normalised title><ARGV[3]><label>"
+MATCH_TRENDING = """
+local ids = redis.call('zrevrange', KEYS[1], 0, tonumber(ARGV[4]) - 1)
+local found = {}
+if #ids == 0 then
+    return found
+end
+local titles = redis.call('hmget', KEYS[2], unpack(ids))
+local needle = ' ' .. ARGV[1]
+for i, entry in ipairs(titles) do
+    if entry then
+        local sep = string.find(entry, ARGV[3], 1, true)
+        if string.find(' ' .. string.sub(entry, 1, sep - 1), needle, 1,
+                       true) then
+            table.insert(found, ids[i])
+            table.insert(found, string.sub(entry, sep + 1))
+            if #found >= 2 * tonumber(ARGV[2]) then
+                break
+            end
+        end
+    end
+end
+return found
+"""
+
+
+def normalize_prefix(text):
+    return " ".join(TOKEN_RE.findall(text.casefold()))
+
+
+def index_terms(text):
+    """
+    Yield the terms `text` is indexed under, one per starting word.
+    """
+    words = TOKEN_RE.findall(text.casefold())
+    for start in range(min(len(words), TERM_START_WORDS)):
+        yield " ".join(words[start:start + TERM_MAX_WORDS])
+
+
+def index_members(kind, key, label):
+    payload = SEPARATOR.join((kind, str(key), label))
+    return {
+        f"{term}{SEPARATOR}{payload}" for term in index_terms(label)
+    }
+
+
+def replace_sorted_set(pipe, key, members):
+    """
+    Queue writing `members` (all scored 0) to a scratch key and renaming
+    it over `key`, or deleting `key` if there are none.
+    """
+    building_key = f"{key}:building"
+    members = sorted(members)
+    pipe.delete(building_key)
+    for start in range(0, len(members), 1000):
+        pipe.zadd(building_key, {
+            member: 0 for member in members[start:start + 1000]
+        })
+    if members:
+        pipe.rename(building_key, key)
+    else:
+        pipe.delete(key)
+
+
+def rebuild_autocomplete_index():
+    """
+    Rebuild the prefix indexes from the database; returns the number of
+    index entries. Readers keep using the old index until the RENAME.
+    """
+    members, names = set(), set()
+    titles = {}
+    articles = Article.objects.order_by("-published_at").values_list(
+        "id", "title"
+    )[:AUTOCOMPLETE_MAX_ARTICLES]
+    for pk, title in articles:
+        members |= index_members(ARTICLE, pk, title)
+        titles[pk] = f"{normalize_prefix(title)}{SEPARATOR}{title}"
+    for category in category_lookup.all():
+        names |= index_members(CATEGORY, category.slug, category.name)
+    for source in news_source_lookup.all():
+        names |= index_members(SOURCE, source.slug, source.name)
+
+    building_titles_key = f"{TITLES_KEY}:building"
+    pipe = redis_client.pipeline()
+    replace_sorted_set(pipe, INDEX_KEY, members)
+    replace_sorted_set(pipe, NAMES_KEY, names)
+    pipe.delete(building_titles_key)
+    if titles:
+        pipe.hset(building_titles_key, mapping=titles)
+        pipe.rename(building_titles_key, TITLES_KEY)
+    else:
+        pipe.delete(TITLES_KEY)
+    pipe.execute()
+    return len(members) + len(names)
+
+
+def parse_member(member):
+    _, kind, key, label = member.split(SEPARATOR, 3)
+    return kind, key, label
+
+
+def get_suggestions(text, limit=8):
+    """
+    Return up to `limit` suggestions for what the user has typed so far,
+    as dicts with `type` (article, category or source), `key` (article
+    id or slug) and `label`. Categories and sources come first, then
+    the best trending articles matching anywhere in the index, then
+    untrended ones in index order.
+    """
+    prefix = normalize_prefix(text)
+    if len(prefix) < MIN_PREFIX_LENGTH:
+        return []
+    lex_range = (f"[{prefix}", f"[{prefix}{LEX_MAX}")
+    try:
+        match_trending = redis_client.register_script(MATCH_TRENDING)
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.exists(INDEX_KEY, NAMES_KEY)
+        pipe.zrangebylex(NAMES_KEY, *lex_range, start=0, num=CANDIDATE_LIMIT)
+        pipe.zrangebylex(INDEX_KEY, *lex_range, start=0, num=CANDIDATE_LIMIT)
+        match_trending(
+            keys=[GLOBAL_KEY, TITLES_KEY],
+            args=[prefix, limit, SEPARATOR, TRENDING_MAX_MEMBERS],
+            client=pipe,
+        )
+        indexed, name_members, members, trending = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Autocomplete index unavailable: {e}")
+        return search_database(prefix, limit)
+    if not indexed:
+        return search_database(prefix, limit)
+
+    names = []
+    for member in name_members:
+        if parse_member(member) not in names:
+            names.append(parse_member(member))
+    articles = dict(zip(trending[::2], trending[1::2]))
+    for member in members:
+        _, key, label = parse_member(member)
+        articles.setdefault(key, label)
+    suggestions = [
+        {"type": kind, "key": key, "label": label}
+        for kind, key, label in names[:MAX_NAME_SUGGESTIONS]
+    ]
+    suggestions += [
+        {"type": ARTICLE, "key": pk, "label": label}
+        for pk, label in articles.items()
+    ]
+    return suggestions[:limit]
+
+
+def search_database(prefix, limit):
+    """
+    Title matches straight from the database, for when the index is
+    missing or Redis is down.
+    """
+    articles = Article.objects.filter(title__icontains=prefix).order_by(
+        "-published_at"
+    ).values_list("id", "title")[:limit]
+    return [
+        {"type": ARTICLE, "key": str(pk), "label": title}
+        for pk, title in articles
+    ]
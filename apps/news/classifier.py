@@ -0,0 +1,252 @@
+"""
+Keyword classifier used to categorise imported articles.
+Text is split into tokens once and intersected with a precompiled keyword
+vocabulary, so one pass scores every category at once. Only whole tokens
+match, and all-caps keywords such as "AI" are matched case-sensitively.
+Keywords come from the CategoryKeyword table (editable in the admin),
+falling back to DEFAULT_KEYWORDS when the table is empty. Keyword
+changes bump a version key in Redis, which every gunicorn and Celery
+process compares at most every LOOKUP_CACHE_CHECK_INTERVAL seconds,
+recompiling its classifier when it moves (as apps/news/lookups.py does).
+Located at: apps/news/classifier.py
+"""
+
+import logging
+import re
+import string
+import threading
+import time
+from collections import Counter
+
+import redis
+from django.conf import settings
+from django.db import transaction
+
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_VERSION_KEY = "classifier:keywords:version"
+
+# Punctuation is turned into whitespace before splitting into tokens
+PUNCTUATION_TABLE = str.maketrans(
+    {char: " " for char in string.punctuation + "\u2018\u2019\u201c\u201d"
+     "\u2013\u2014\u2026\u00ab\u00bb"}
+)
+
+# Built-in keywords, in priority order for breaking ties
+DEFAULT_KEYWORDS = {
+    "Politics":
+        ["election", "government", "minister", "policy", "parliament"],
+    "Business":
+        ["market", "economy", "trade", "inflation", "stock"],
+    "Technology":
+        ["AI", "tech", "software", "hardware", "startup"],
+    "Sports":
+        ["match", "goal", "team", "tournament", "league"],
+    "World News":
+        ["UN", "international", "global", "conflict", "diplomacy"],
+    "Entertainment":
+        ["movie", "music", "celebrity", "TV", "film"],
+}
+
+
+def tokenize(text):
+    return text.translate(PUNCTUATION_TABLE).split()
+
+
+def is_acronym(keyword):
+    """
+    All-caps keywords such as "AI" or "UN" only match in upper case,
+    so they are not found in words like "said" or "under".
+    """
+    return keyword.isupper()
+
+
+def keyword_variants(word):
+    """
+    Token spellings counted as a hit for a lower-case keyword: plain,
+    plural ("elections", "matches"), and their Title/UPPER case forms.
+    """
+    for form in (word, f"{word}s", f"{word}es"):
+        yield from (form, form.capitalize(), form.upper())
+
+
+class KeywordClassifier:
+    """
+    Score text against weighted keywords for each category.
+    """
+
+    def __init__(self, keywords):
+        """
+        keywords: iterable of (category_name, keyword, weight) tuples.
+        Category priority follows the order categories first appear.
+        """
+        self.priority = {}
+        self.rules = {}
+        phrases = []
+        for category_name, keyword, weight in keywords:
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            self.priority.setdefault(category_name, len(self.priority))
+            rule = (category_name, weight)
+            if len(tokens) > 1:
+                phrases.append((tokens, is_acronym(keyword), rule))
+            elif is_acronym(keyword):
+                self._add(tokens[0], rule)
+            else:
+                for variant in keyword_variants(tokens[0].lower()):
+                    self._add(variant, rule)
+        self.vocabulary = frozenset(self.rules)
+
+        # Multi-word keywords need a regex; single words never do
+        self.phrase_rules = [rule for _, _, rule in phrases]
+        self.phrase_pattern = re.compile("|".join(
+            f"(?P<p{index}>"
+            + ("" if acronym else "(?i:")
+            + r"\s+".join(re.escape(token) for token in tokens)
+            + ("" if acronym else "(?:e?s)?)")
+            + ")"
+            for index, (tokens, acronym, _) in enumerate(phrases)
+        ).join([r"(?<!\w)(?:", r")(?!\w)"])) if phrases else None
+
+    def _add(self, token, rule):
+        rules = self.rules.setdefault(token, [])
+        if rule not in rules:
+            rules.append(rule)
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        return cls(
+            (category_name, keyword, 1)
+            for category_name, keywords in mapping.items()
+            for keyword in keywords
+        )
+
+    def _tally(self, text):
+        tally = {}
+        if not text:
+            return tally
+        rules = self.rules
+        for token in filter(
+            self.vocabulary.__contains__, tokenize(text)
+        ):
+            for category_name, weight in rules[token]:
+                tally[category_name] = tally.get(category_name, 0) + weight
+        if self.phrase_pattern:
+            for match in self.phrase_pattern.finditer(text):
+                category_name, weight = self.phrase_rules[
+                    int(match.lastgroup[1:])
+                ]
+                tally[category_name] = tally.get(category_name, 0) + weight
+        return tally
+
+    def scores(self, text):
+        """
+        Return a Counter of category name -> weighted keyword hits.
+        """
+        return Counter(self._tally(text))
+
+    def classify(self, text):
+        """
+        Return the best scoring category name, or None if nothing matched.
+        Ties go to the category listed first.
+        """
+        tally = self._tally(text)
+        if not tally:
+            return None
+        priority = self.priority
+        return min(tally, key=lambda name: (-tally[name], priority[name]))
+
+    def classify_many(self, texts):
+        return [self.classify(text) for text in texts]
+
+
+_classifier = None
+_classifier_version = None
+_classifier_checked_at = 0.0
+_classifier_lock = threading.Lock()
+
+
+def build_classifier():
+    """
+    Compile a classifier from the CategoryKeyword table, or from
+    DEFAULT_KEYWORDS when no keywords have been configured.
+    """
+    from apps.news.models import CategoryKeyword
+
+    rows = list(
+        CategoryKeyword.objects.order_by("id").values_list(
+            "category__name", "keyword", "weight"
+        )
+    )
+    if rows:
+        return KeywordClassifier(rows)
+    return KeywordClassifier.from_mapping(DEFAULT_KEYWORDS)
+
+
+def _check_version():
+    """
+    Drop the compiled classifier if another process bumped the shared
+    version. Redis being unavailable keeps the current classifier.
+    """
+    global _classifier, _classifier_version, _classifier_checked_at
+    interval = getattr(settings, "LOOKUP_CACHE_CHECK_INTERVAL", 5)
+    now = time.monotonic()
+    if now - _classifier_checked_at < interval:
+        return
+    _classifier_checked_at = now
+    try:
+        version = redis_client.get(CLASSIFIER_VERSION_KEY)
+    except redis.RedisError as e:
+        logger.debug(f"Classifier version check failed: {e}")
+        return
+    if version != _classifier_version:
+        with _classifier_lock:
+            _classifier = None
+            _classifier_version = version
+
+
+def get_classifier():
+    """
+    Return the process-wide classifier, compiling it on first use and
+    again after the keywords changed in any process.
+    """
+    global _classifier
+    _check_version()
+    classifier = _classifier
+    if classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = build_classifier()
+            classifier = _classifier
+    return classifier
+
+
+def reset_classifier():
+    """
+    Drop this process's compiled classifier so the next call rebuilds
+    it, without touching other processes.
+    """
+    global _classifier
+    _classifier = None
+
+
+def invalidate_classifier():
+    """
+    Drop the compiled classifier now and, once the surrounding
+    transaction commits, bump the shared version so other processes
+    follow.
+    """
+    reset_classifier()
+    transaction.on_commit(_bump_version)
+
+
+def _bump_version():
+    global _classifier_version
+    reset_classifier()
+    try:
+        _classifier_version = str(redis_client.incr(CLASSIFIER_VERSION_KEY))
+    except redis.RedisError as e:
+        logger.warning(f"Could not bump {CLASSIFIER_VERSION_KEY}: {e}")
@@ -0,0 +1,94 @@
+"""
+Comment tree loader for article pages.
+All comments for an article are fetched in one query (vote counts are
+stored on each row), the viewer's own votes in a second, and the thread is
+assembled in memory. Templates walk `comment.children` instead of
+querying `comment.replies`, so the page costs the same number of
+queries however deep a thread goes.
+Located at: apps/news/comment_tree.py
+"""
+
+from dataclasses import dataclass, field
+
+from apps.users.models import Comment, CommentVote
+
+UPVOTE = CommentVote.UPVOTE
+DOWNVOTE = CommentVote.DOWNVOTE
+
+
+@dataclass
+class CommentTree:
+    """
+    Top-level comments (each with nested `children`) and the total
+    number of comments shown.
+    """
+    roots: list = field(default_factory=list)
+    total: int = 0
+
+
+def load_user_votes(article, user):
+    """
+    Return {comment_id: UPVOTE or DOWNVOTE} for the user's votes on an
+    article's comments, using one query.
+    """
+    if user is None or not user.is_authenticated:
+        return {}
+    return dict(
+        CommentVote.objects.filter(
+            user_id=user.id, comment__article_id=article.id
+        ).values_list("comment_id", "value")
+    )
+
+
+def sort_roots(roots, sort_order):
+    if sort_order == "oldest":
+        roots.sort(key=lambda c: (c.created_at, c.id))
+    elif sort_order == "most_upvoted":
+        roots.sort(
+            key=lambda c: (c.score, c.created_at, c.id), reverse=True
+        )
+    else:  # "newest" or unknown fallback
+        roots.sort(key=lambda c: (c.created_at, c.id), reverse=True)
+    return roots
+
+
+def count_comments(roots):
+    total = 0
+    stack = list(roots)
+    while stack:
+        comment = stack.pop()
+        total += 1
+        stack.extend(comment.children)
+    return total
+
+
+def load_comment_tree(article, user=None, sort_order="newest"):
+    """
+    Build the comment tree for an article.
+    Replies keep chronological order; top-level comments follow
+    sort_order. Repeated top-level posts by the same user with the same
+    text collapse to the latest one, as before.
+    """
+    comments = list(
+        Comment.objects.filter(article_id=article.id)
+        .select_related("user")
+        .order_by("created_at", "id")
+    )
+    votes = load_user_votes(article, user) if comments else {}
+
+    by_id = {}
+    for comment in comments:
+        comment.children = []
+        comment.user_vote = votes.get(comment.id, 0)
+        by_id[comment.id] = comment
+
+    latest_roots = {}
+    for comment in comments:
+        parent = by_id.get(comment.parent_id)
+        if parent is not None:
+            parent.children.append(comment)
+        else:
+            latest_roots[(comment.user_id, comment.content)] = comment
+
+    roots = sort_roots(list(latest_roots.values()), sort_order)
+    return CommentTree(roots=roots, total=count_comments(roots))
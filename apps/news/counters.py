@@ -0,0 +1,161 @@
+"""
+Denormalised engagement counters.
+Article.comment_count/like_count/save_count and Comment.upvote_count/
+downvote_count/score are stored columns, kept in step by F() updates
+from model and M2M signals (see apps/news/signals.py and
+apps/users/signals.py) and the vote engine (apps/users/votes.py), so
+cards and comment threads never aggregate at render time.
+rebuild_counters() and verify_counters() recompute them in bulk and back
+the `manage.py rebuild_counters` command.
+Located at: apps/news/counters.py
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.news.models import Article
+
+
+def adjust_counter(model, pks, field, delta):
+    """
+    Atomically add delta to `field` on the given rows, never below zero.
+    """
+    if not pks or not delta:
+        return
+    value = F(field) + delta
+    if delta < 0:
+        value = Greatest(value, Value(0))
+    model.objects.filter(pk__in=pks).update(**{field: value})
+
+
+def adjust_counters(model, field, deltas):
+    """
+    Apply {pk: delta} with one UPDATE per distinct delta.
+    """
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        adjust_counter(model, pks, field, delta)
+
+
+def _through_fields(through, counted_model):
+    """
+    Return the (counted, other) foreign key names on an M2M through model.
+    """
+    counted = other = None
+    for field in through._meta.fields:
+        if field.related_model is counted_model and counted is None:
+            counted = field.name
+        elif field.is_relation:
+            other = field.name
+    return counted, other
+
+
+def update_m2m_counter(counted_model, counter, sender, instance, action,
+                       reverse, pk_set, **kwargs):
+    """
+    m2m_changed handler body keeping counted_model.<counter> equal to
+    its number of through rows, for changes made from either side.
+    Returns the {pk: delta} applied, empty for the pre_* actions.
+    Removals are measured in pre_remove/pre_clear, since pk_set may name
+    rows that were never there and clear() passes none at all.
+    """
+    counted, other = _through_fields(sender, counted_model)
+    pending = instance.__dict__.setdefault("_pending_counter_changes", {})
+    key = (sender, counter)
+
+    if action in ("pre_remove", "pre_clear"):
+        rows = sender.objects.filter(
+            **{f"{other if reverse else counted}_id": instance.pk}
+        )
+        if action == "pre_remove":
+            rows = rows.filter(
+                **{f"{counted if reverse else other}_id__in": pk_set}
+            )
+        pending[key] = Counter(rows.values_list(f"{counted}_id", flat=True))
+        return {}
+
+    if action == "post_add":
+        if reverse:
+            deltas = {pk: 1 for pk in pk_set}
+        else:
+            deltas = {instance.pk: len(pk_set)}
+    elif action in ("post_remove", "post_clear"):
+        deltas = {pk: -n for pk, n in pending.pop(key, {}).items()}
+    else:
+        return {}
+    adjust_counters(counted_model, counter, deltas)
+    return deltas
+
+
+def _count_subquery(model, fk_name, aggregate=None, **filters):
+    rows = (
+        model.objects.filter(**{fk_name: OuterRef("pk")}, **filters)
+        .order_by().values(fk_name)
+        .annotate(n=aggregate or Count("*")).values("n")
+    )
+    return Coalesce(Subquery(rows), Value(0))
+
+
+def counter_definitions():
+    """
+    Yield (model, counter field, expression computing its true value).
+    """
+    from apps.users.models import Comment, CommentVote
+
+    yield Article, "comment_count", _count_subquery(Comment, "article")
+    yield Article, "like_count", _count_subquery(
+        Article.likes.through, "article"
+    )
+    yield Article, "save_count", _count_subquery(
+        Article.saves.through, "article"
+    )
+    yield Comment, "upvote_count", _count_subquery(
+        CommentVote, "comment", value=CommentVote.UPVOTE
+    )
+    yield Comment, "downvote_count", _count_subquery(
+        CommentVote, "comment", value=CommentVote.DOWNVOTE
+    )
+    yield Comment, "score", _count_subquery(
+        CommentVote, "comment", aggregate=Sum("value")
+    )
+
+
+def verify_counters():
+    """
+    Return {"<model>.<counter>": number of rows holding a wrong value}.
+    """
+    return {
+        f"{model._meta.label}.{counter}": model.objects.annotate(
+            _actual=expression
+        ).exclude(**{counter: F("_actual")}).count()
+        for model, counter, expression in counter_definitions()
+    }
+
+
+def rebuild_counters(batch_size=10000):
+    """
+    Recompute every counter with UPDATE ... SET counter = (SELECT COUNT),
+    in primary key ranges of batch_size rows to keep locks short.
+    Returns {"<model>.<counter>": rows updated}.
+    """
+    updated = {}
+    for model, counter, expression in counter_definitions():
+        label = f"{model._meta.label}.{counter}"
+        updated[label] = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                model.objects.filter(pk__gt=last_pk).order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            updated[label] += model.objects.filter(
+                pk__gte=pks[0], pk__lte=pks[-1]
+            ).update(**{counter: expression})
+            last_pk = pks[-1]
+    return updated
@@ -0,0 +1,169 @@
+"""
+Article likes and saves.
+Each change is one conditional statement on the M2M through table, an
+INSERT ... ON CONFLICT DO NOTHING or a DELETE, whose row count says
+whether anything changed; the stored counter then moves by one with an
+F() update. The relation itself is never loaded, so a click costs the
+same on an article with ten likes as on one with ten thousand, and
+parallel clicks cannot double count: the (article, user) unique
+constraint decides which of them wins.
+Writing the through table directly bypasses m2m_changed, so the
+counter, trending and cached engagement set updates its handlers make
+for ORM changes are made here.
+get_engagement_state() answers "which of these articles has the user
+liked, saved or commented on" for a whole page of cards with one query
+per relation; apply_engagement_state() puts the answer on the articles
+for templates.
+Located at: apps/news/engagement.py
+"""
+
+from django.db import connection, transaction
+
+from apps.news.counters import adjust_counter
+from apps.news.models import Article
+from apps.news.trending import record_engagement
+from apps.users.engagement_cache import (
+    LIKED, SAVED, filter_engaged, update_engagement_sets
+)
+from apps.users.models import Comment
+
+LIKE = "like"
+SAVE = "save"
+
+# Most article ids one engagement-state lookup accepts
+MAX_STATE_ARTICLES = 100
+
+RELATIONS = {
+    LIKE: ("likes", "like_count", LIKED),
+    SAVE: ("saves", "save_count", SAVED),
+}
+
+
+def get_relation(kind):
+    """
+    Return (through model, counter field) for LIKE or SAVE.
+    """
+    field, counter, _ = RELATIONS[kind]
+    return getattr(Article, field).through, counter
+
+
+def _insert(through, article_id, user_id):
+    quote = connection.ops.quote_name
+    table = quote(through._meta.db_table)
+    article = quote(through._meta.get_field("article").column)
+    user = quote(through._meta.get_field("user").column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({article}, {user}) VALUES (%s, %s) "
+            "ON CONFLICT DO NOTHING",
+            [article_id, user_id],
+        )
+        return cursor.rowcount == 1
+
+
+def _delete(through, article_id, user_id):
+    deleted, _ = through.objects.filter(
+        article_id=article_id, user_id=user_id
+    ).delete()
+    return deleted == 1
+
+
+def _changed(kind, counter, article_id, user_id, delta):
+    adjust_counter(Article, [article_id], counter, delta)
+    update_engagement_sets([
+        (user_id, RELATIONS[kind][2], article_id, delta > 0)
+    ])
+    transaction.on_commit(
+        lambda: record_engagement(kind, {article_id: delta})
+    )
+
+
+def add_engagement(kind, article_id, user_id):
+    """
+    Like or save the article; returns False if it already was.
+    """
+    through, counter = get_relation(kind)
+    with transaction.atomic():
+        added = _insert(through, article_id, user_id)
+        if added:
+            _changed(kind, counter, article_id, user_id, 1)
+    return added
+
+
+def remove_engagement(kind, article_id, user_id):
+    """
+    Undo a like or save; returns False if there was none.
+    """
+    through, counter = get_relation(kind)
+    with transaction.atomic():
+        removed = _delete(through, article_id, user_id)
+        if removed:
+            _changed(kind, counter, article_id, user_id, -1)
+    return removed
+
+
+def toggle_engagement(kind, article_id, user_id):
+    """
+    Flip a like or save; returns (now active, stored count).
+    Raises Article.DoesNotExist, rolling back, for a missing article.
+    If a parallel request inserted the row first, both report it
+    active and only one of them counts it.
+    """
+    through, counter = get_relation(kind)
+    with transaction.atomic():
+        if _delete(through, article_id, user_id):
+            active, delta = False, -1
+        else:
+            active = True
+            delta = 1 if _insert(through, article_id, user_id) else 0
+        if delta:
+            _changed(kind, counter, article_id, user_id, delta)
+        count = Article.objects.values_list(counter, flat=True).get(
+            pk=article_id
+        )
+    return active, count
+
+
+def get_engagement_state(user_id, article_ids):
+    """
+    Return {article id: {"liked", "saved", "commented"}} for the user.
+    Likes and saves come from the user's cached sets (loaded with one
+    query each on a miss), comments from one query, whatever the
+    number of articles.
+    """
+    article_ids = set(article_ids)
+    if not article_ids:
+        return {}
+    liked = filter_engaged(user_id, LIKED, article_ids)
+    saved = filter_engaged(user_id, SAVED, article_ids)
+    commented = set(
+        Comment.objects.filter(
+            user_id=user_id, article_id__in=article_ids, deleted=False
+        ).values_list("article_id", flat=True).distinct()
+    )
+    return {
+        pk: {
+            "liked": pk in liked,
+            "saved": pk in saved,
+            "commented": pk in commented,
+        }
+        for pk in article_ids
+    }
+
+
+def apply_engagement_state(user, articles):
+    """
+    Set liked, saved and commented on each article for the user, so
+    partials/article_card.html can mark its buttons. Anonymous users
+    get all False without a query. Returns the articles as a list.
+    """
+    articles = list(articles)
+    state = {}
+    if user.is_authenticated:
+        state = get_engagement_state(user.id, [a.id for a in articles])
+    for article in articles:
+        flags = state.get(article.id, {})
+        article.liked = flags.get("liked", False)
+        article.saved = flags.get("saved", False)
+        article.commented = flags.get("commented", False)
+    return articles
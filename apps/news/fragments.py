@@ -0,0 +1,88 @@
+"""
+Versioned HTML fragment cache for the homepage sections.
+Rendered sections are stored in Django's cache (locmem in DEBUG,
+django_redis in production) together with the content version they
+were built from and when. A fragment is fresh while its version is
+current and it is younger than HOMEPAGE_FRAGMENT_TTL seconds; after
+that the first request to take the rebuild lock (an atomic cache.add)
+renders it again while every other request keeps serving the stale
+copy, so an expiry never sends all workers to the database at once.
+Ingestion, article edits and changes to the displayed trending top bump
+the version; engagement counts on the cards catch up within the TTL.
+Located at: apps/news/fragments.py
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+logger = logging.getLogger(__name__)
+
+HOMEPAGE_VERSION_KEY = "fragments:homepage:version"
+
+# Stale fragments are kept this long for stale-while-revalidate
+FRAGMENT_STALE_TTL = 60 * 60
+# Longest a rebuild may hold the lock if its worker dies
+FRAGMENT_LOCK_TIMEOUT = 30
+
+
+def get_version(version_key=HOMEPAGE_VERSION_KEY):
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, 1, timeout=None)
+        version = cache.get(version_key, 1)
+    return version
+
+
+def bump_version(version_key=HOMEPAGE_VERSION_KEY):
+    """
+    Mark every fragment built from the current version as stale.
+    """
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # incr() raises ValueError for a missing key
+        cache.add(version_key, 2, timeout=None)
+
+
+def get_fragment_key(name):
+    return f"fragments:{name}:{get_language()}"
+
+
+def cached_fragment(name, build, version_key=HOMEPAGE_VERSION_KEY):
+    """
+    Return the HTML for fragment `name`, calling build() to render it
+    when there is no copy yet or this request won the rebuild lock for
+    a stale one.
+    """
+    key = get_fragment_key(name)
+    version = get_version(version_key)
+    entry = cache.get(key)
+    ttl = getattr(settings, "HOMEPAGE_FRAGMENT_TTL", 60)
+
+    if entry is not None:
+        fresh = (
+            entry["version"] == version
+            and time.time() - entry["built_at"] < ttl
+        )
+        if fresh:
+            return entry["html"]
+
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, timeout=FRAGMENT_LOCK_TIMEOUT):
+        if entry is not None:
+            return entry["html"]
+        logger.info(f"Fragment {name} is being built; building it too.")
+        return build()
+
+    try:
+        html = build()
+        cache.set(key, {
+            "version": version, "built_at": time.time(), "html": html,
+        }, timeout=FRAGMENT_STALE_TTL)
+    finally:
+        cache.delete(lock_key)
+    return html
@@ -0,0 +1,296 @@
+"""
+Batched ingestion pipeline for imported news articles.
+This module normalises a raw API payload, resolves sources and categories
+with set-based queries and writes new articles with a single bulk insert
+keyed on Article.url.
+Located at: apps/news/ingestion.py
+"""
+
+import logging
+from dataclasses import dataclass, field
+from dateutil import parser
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.text import slugify
+from apps.news.models import Article, NewsSource
+from apps.news.classifier import get_classifier
+from apps.news.lookups import category_lookup, news_source_lookup
+from apps.news.article_cache import article_payload
+
+logger = logging.getLogger(__name__)
+
+# Sent once per batch with `articles`, the rows it created; the
+# post_save sent for each of them carries ingested=True
+articles_ingested = Signal()
+
+# Map GNews topics to Category names
+TOPIC_CATEGORY_MAP = {
+    "world": "World News",
+    "nation": "Politics",
+    "business": "Business",
+    "technology": "Technology",
+    "sports": "Sports",
+    "entertainment": "Entertainment",
+}
+
+FALLBACK_CATEGORY = "General"
+
+# Fields refreshed on existing rows when update_existing is requested
+UPDATABLE_FIELDS = ["title", "content", "summary", "image_url"]
+
+# Leave room for a "-<counter>" suffix within Article.slug max_length
+MAX_BASE_SLUG_LENGTH = 240
+
+
+@dataclass
+class IngestionResult:
+    """
+    Outcome of a single ingestion batch.
+    """
+    created: list = field(default_factory=list)
+    updated: int = 0
+    skipped: int = 0
+    cached_articles: list = field(default_factory=list)
+
+    @property
+    def created_count(self):
+        return len(self.created)
+
+
+def category_name_from_topic(topic):
+    """
+    Return the Category name mapped to a GNews topic, if any.
+    """
+    return TOPIC_CATEGORY_MAP.get(topic.lower()) if topic else None
+
+
+def category_name_from_keywords(title, summary, content):
+    """
+    Return the best keyword-matched Category name for the text, if any.
+    """
+    return get_classifier().classify(f"{title} {summary} {content}")
+
+
+def parse_published_at(published_str):
+    try:
+        return parser.parse(
+            published_str
+        ) if published_str else timezone.now()
+    except (TypeError, ValueError, OverflowError):
+        return timezone.now()
+
+
+def normalise_articles(articles_data):
+    """
+    Clean a raw API payload into a list of article records.
+    Items without a title or URL, and repeated URLs within the batch,
+    are skipped. Returns a (records, skipped_count) tuple.
+    """
+    records = []
+    seen_urls = set()
+    skipped = 0
+    for article_data in articles_data:
+        title = article_data.get("title")
+        url_article = article_data.get("url")
+        if not title or not url_article:
+            logger.warning("Skipping article due to missing title or URL")
+            skipped += 1
+            continue
+        if url_article in seen_urls:
+            skipped += 1
+            continue
+        seen_urls.add(url_article)
+
+        source_info = article_data.get("source") or {}
+        records.append({
+            "title": title,
+            "url": url_article,
+            "published_at": parse_published_at(
+                article_data.get("publishedAt")
+            ),
+            "source_name": source_info.get("name") or "Unknown",
+            "content": article_data.get("content") or "",
+            "summary": article_data.get("description") or "",
+            "image_url": article_data.get("image"),
+            "topic": article_data.get("topic") or "",
+        })
+    return records, skipped
+
+
+def resolve_sources(names):
+    """
+    Map source names to NewsSource rows, creating missing ones in bulk.
+    """
+    names = set(names)
+    sources = news_source_lookup.get_many("name", names)
+    missing = names - sources.keys()
+    if missing:
+        NewsSource.objects.bulk_create(
+            [
+                NewsSource(
+                    name=name, slug=slugify(name),
+                    website="", description=""
+                )
+                for name in missing
+            ],
+            ignore_conflicts=True,
+        )
+        sources.update(news_source_lookup.get_many("name", missing))
+        for name in missing - sources.keys():
+            logger.warning(f"Could not create news source '{name}'.")
+    return sources
+
+
+def resolve_categories(records):
+    """
+    Map each record's URL to a Category from the lookup cache.
+    Hybrid matching: GNews topic first, then keywords, then fallback.
+    Keyword classification runs over the whole batch at once.
+    """
+    categories = {
+        category.name: category for category in category_lookup.all()
+    }
+    keyword_names = get_classifier().classify_many(
+        f"{record['title']} {record['summary']} {record['content']}"
+        for record in records
+    )
+    resolved = {}
+    for record, keyword_name in zip(records, keyword_names):
+        category = None
+        for cat_name in (
+            category_name_from_topic(record["topic"]), keyword_name
+        ):
+            if not cat_name:
+                continue
+            category = categories.get(cat_name)
+            if category:
+                break
+            logger.warning(f"Category '{cat_name}' not found.")
+        if not category:
+            category = categories.get(FALLBACK_CATEGORY)
+            if not category:
+                logger.warning(
+                    "Fallback category 'General' does not exist."
+                )
+        resolved[record["url"]] = category
+    return resolved
+
+
+def assign_unique_slugs(articles):
+    """
+    Give each unsaved article a slug that is unique across the table
+    and the batch, mirroring the pre_save slug signal in one query.
+    """
+    base_slugs = {
+        id(article): (
+            slugify(article.title)[:MAX_BASE_SLUG_LENGTH] or "article"
+        )
+        for article in articles
+    }
+    query = Q()
+    for base in set(base_slugs.values()):
+        query |= Q(slug__startswith=base)
+    taken = set(
+        Article.objects.filter(query).values_list("slug", flat=True)
+    ) if articles else set()
+
+    for article in articles:
+        base_slug = base_slugs[id(article)]
+        slug = base_slug
+        counter = 1
+        while slug in taken:
+            slug = f"{base_slug}-{counter}"
+            counter += 1
+        taken.add(slug)
+        article.slug = slug
+
+
+def ingest_articles(articles_data, update_existing=False):
+    """
+    Normalise, categorise and store a batch of raw articles.
+    New URLs are written with a single bulk insert; existing URLs are
+    skipped unless update_existing is set. post_save fires once per
+    created row, then articles_ingested once for the whole batch.
+    """
+    records, skipped = normalise_articles(articles_data)
+    result = IngestionResult(skipped=skipped)
+    if not records:
+        return result
+
+    with transaction.atomic():
+        sources = resolve_sources(
+            record["source_name"] for record in records
+        )
+        categories = resolve_categories(records)
+        existing = {
+            article.url: article
+            for article in Article.objects.filter(
+                url__in=[record["url"] for record in records]
+            ).select_related("source", "category")
+        }
+
+        new_articles = []
+        changed_articles = []
+        for record in records:
+            current = existing.get(record["url"])
+            if current is None:
+                new_articles.append(Article(
+                    title=record["title"],
+                    url=record["url"],
+                    content=record["content"],
+                    summary=record["summary"],
+                    image_url=record["image_url"],
+                    published_at=record["published_at"],
+                    source=sources.get(record["source_name"]),
+                    category=categories[record["url"]],
+                    imported=True,
+                ))
+            elif update_existing and any(
+                getattr(current, name) != record[name]
+                for name in UPDATABLE_FIELDS
+            ):
+                for name in UPDATABLE_FIELDS:
+                    setattr(current, name, record[name])
+                changed_articles.append(current)
+            else:
+                result.skipped += 1
+
+        assign_unique_slugs(new_articles)
+        Article.objects.bulk_create(new_articles, ignore_conflicts=True)
+        if changed_articles:
+            Article.objects.bulk_update(changed_articles, UPDATABLE_FIELDS)
+            result.updated = len(changed_articles)
+
+        # Rows inserted concurrently by another worker carry a different
+        # slug, so only rows holding our slug count as created here.
+        our_slugs = {
+            article.url: article.slug for article in new_articles
+        }
+        stored = dict(existing)
+        for article in Article.objects.filter(
+            url__in=our_slugs.keys()
+        ).select_related("source", "category"):
+            stored[article.url] = article
+            if our_slugs[article.url] == article.slug:
+                result.created.append(article)
+        result.skipped += len(new_articles) - len(result.created)
+
+        for article in result.created:
+            post_save.send(
+                sender=Article, instance=article, created=True,
+                update_fields=None, raw=False, using=article._state.db,
+                ingested=True,
+            )
+        if result.created:
+            articles_ingested.send(
+                sender=Article, articles=list(result.created)
+            )
+
+    result.cached_articles = [
+        article_payload(stored[record["url"]])
+        for record in records if record["url"] in stored
+    ]
+    return result
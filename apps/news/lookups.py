@@ -0,0 +1,164 @@
+"""
+Per-process lookup caches for the small Category and NewsSource tables.
+Rows are memoised by id, slug and name in a bounded LRU map, so request
+and ingestion hot paths stop re-querying them. Saves and deletes clear
+the local cache through signals and bump a version key in Redis; every
+other gunicorn and Celery process compares that version at most every
+LOOKUP_CACHE_CHECK_INTERVAL seconds and drops its entries when it moves.
+Cached instances are shared, so callers must treat them as read-only.
+Located at: apps/news/lookups.py
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+from django.db import transaction
+
+from apps.news.models import Category, NewsSource
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class LookupCache:
+    """
+    Bounded, version-checked memo of one model's rows.
+    """
+
+    def __init__(self, model, fields=("id", "slug", "name"), max_size=512):
+        self.model = model
+        self.fields = fields
+        self.max_size = max_size
+        self.version_key = f"lookups:{model._meta.label_lower}:version"
+        self._entries = OrderedDict()
+        self._all = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _check_version(self):
+        """
+        Clear local entries if another process bumped the shared version.
+        Redis being unavailable leaves the local cache in place; local
+        signals still keep it correct for changes made in this process.
+        """
+        interval = getattr(settings, "LOOKUP_CACHE_CHECK_INTERVAL", 5)
+        now = time.monotonic()
+        if now - self._checked_at < interval:
+            return
+        self._checked_at = now
+        try:
+            version = redis_client.get(self.version_key)
+        except redis.RedisError as e:
+            logger.debug(f"Lookup version check failed: {e}")
+            return
+        if version != self._version:
+            with self._lock:
+                self._entries.clear()
+                self._all = None
+                self._version = version
+
+    def _store(self, instance):
+        for field in self.fields:
+            key = (field, getattr(instance, field))
+            self._entries[key] = instance
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, **lookup):
+        """
+        Return the row matching a single field lookup, e.g. get(slug=...),
+        or None if no such row exists. Misses are not cached.
+        """
+        ((field, value),) = lookup.items()
+        if field == "pk":
+            field = "id"
+        self._check_version()
+        key = (field, value)
+        with self._lock:
+            instance = self._entries.get(key)
+            if instance is not None:
+                self._entries.move_to_end(key)
+                return instance
+        instance = self.model.objects.filter(**{field: value}).first()
+        if instance is not None:
+            with self._lock:
+                self._store(instance)
+        return instance
+
+    def get_many(self, field, values):
+        """
+        Return a dict of value -> row for the given values of one field,
+        fetching every uncached value with a single query.
+        """
+        self._check_version()
+        found = {}
+        missing = []
+        with self._lock:
+            for value in set(values):
+                instance = self._entries.get((field, value))
+                if instance is None:
+                    missing.append(value)
+                else:
+                    found[value] = instance
+        if missing:
+            rows = self.model.objects.filter(**{f"{field}__in": missing})
+            with self._lock:
+                for instance in rows:
+                    self._store(instance)
+                    found[getattr(instance, field)] = instance
+        return found
+
+    def all(self):
+        """
+        Return every row in the model's default ordering.
+        Only used for tables small enough to hold in full.
+        """
+        self._check_version()
+        rows = self._all
+        if rows is None:
+            rows = list(self.model.objects.all())
+            with self._lock:
+                self._all = rows
+                for instance in rows[:self.max_size // len(self.fields)]:
+                    self._store(instance)
+        return list(rows)
+
+    def clear(self):
+        """
+        Drop this process's entries without touching other processes.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._all = None
+
+    def invalidate(self):
+        """
+        Drop local entries now and, once the surrounding transaction
+        commits, bump the shared version so other processes follow.
+        """
+        self.clear()
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self):
+        self.clear()
+        try:
+            self._version = str(redis_client.incr(self.version_key))
+        except redis.RedisError as e:
+            logger.warning(f"Could not bump {self.version_key}: {e}")
+
+
+category_lookup = LookupCache(Category)
+news_source_lookup = LookupCache(NewsSource, max_size=2048)
+
+LOOKUP_CACHES = (category_lookup, news_source_lookup)
+
+
+def clear_lookup_caches():
+    for lookup in LOOKUP_CACHES:
+        lookup.clear()
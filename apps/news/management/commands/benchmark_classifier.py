@@ -0,0 +1,78 @@
+"""
+Benchmark the compiled keyword classifier against the previous
+substring scan over synthetic article text.
+Usage: python manage.py benchmark_classifier --articles 20000
+Located at: apps/news/management/commands/benchmark_classifier.py
+"""
+
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.news.classifier import DEFAULT_KEYWORDS, KeywordClassifier
+
+FILLER = (
+    "the a report said under today officials announced new plans after "
+    "weeks of talks while critics warned about rising costs and delays"
+).split()
+
+
+def legacy_classify(title, summary, content):
+    """The per-call substring scan this classifier replaced."""
+    combined_text = re.sub(
+        r"[^\w\s]", "", f"{title} {summary} {content}".lower()
+    )
+    for cat_name, keywords in DEFAULT_KEYWORDS.items():
+        if any(keyword.lower() in combined_text for keyword in keywords):
+            return cat_name
+    return None
+
+
+def synthetic_article(rng):
+    keywords = [kw for kws in DEFAULT_KEYWORDS.values() for kw in kws]
+    words = rng.choices(FILLER, k=rng.randint(80, 200))
+    for _ in range(rng.randint(0, 4)):
+        words.insert(rng.randrange(len(words)), rng.choice(keywords))
+    return " ".join(words[:12]), " ".join(words[12:40]), " ".join(words)
+
+
+class Command(BaseCommand):
+    help = "Measure keyword classifier throughput (articles per second)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, default=20000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        articles = [
+            synthetic_article(rng) for _ in range(options["articles"])
+        ]
+
+        start = time.perf_counter()
+        for title, summary, content in articles:
+            legacy_classify(title, summary, content)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        classifier = KeywordClassifier.from_mapping(DEFAULT_KEYWORDS)
+        compile_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        classifier.classify_many(
+            f"{title} {summary} {content}"
+            for title, summary, content in articles
+        )
+        compiled_seconds = time.perf_counter() - start
+
+        count = len(articles)
+        self.stdout.write(f"Articles:   {count}")
+        self.stdout.write(
+            f"Legacy:     {count / legacy_seconds:,.0f} articles/s"
+        )
+        self.stdout.write(
+            f"Compiled:   {count / compiled_seconds:,.0f} articles/s "
+            f"(compiled once in {compile_seconds * 1000:.2f} ms)"
+        )
@@ -0,0 +1,89 @@
+"""
+Benchmark the personalised "Latest in X" sections: one query per
+category (as the homepage used to run) against one windowed query.
+Synthetic categories and articles are created in a transaction that is
+rolled back afterwards.
+Usage: python manage.py benchmark_homepage_sections --categories 20
+Located at: apps/news/management/commands/benchmark_homepage_sections.py
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.news.models import Article, Category
+from apps.news.utils import top_per_category
+
+
+def per_category_latest(categories, limit):
+    """The loop this benchmark's windowed query replaced."""
+    return {
+        category.id: list(
+            category.articles.select_related("source")
+            .order_by("-published_at")[:limit]
+        )
+        for category in categories
+    }
+
+
+def measure(func, repeat):
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat, len(queries)
+
+
+class Command(BaseCommand):
+    help = "Compare per-category and windowed homepage section queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--articles", type=int, default=100,
+                            help="Articles per category.")
+        parser.add_argument("--limit", type=int, default=12)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        limit, repeat = options["limit"], options["repeat"]
+        with transaction.atomic():
+            categories = [
+                Category.objects.create(name=f"Benchmark category {n}")
+                for n in range(options["categories"])
+            ]
+            Article.objects.bulk_create(
+                Article(
+                    title=f"Benchmark {category.id}-{n}",
+                    slug=f"benchmark-{category.id}-{n}",
+                    url=f"https://example.com/benchmark/{category.id}/{n}",
+                    content="x", category=category,
+                )
+                for category in categories
+                for n in range(options["articles"])
+            )
+            ids = [category.id for category in categories]
+
+            legacy_seconds, legacy_queries = measure(
+                lambda: per_category_latest(categories, limit), repeat
+            )
+            windowed_seconds, windowed_queries = measure(
+                lambda: top_per_category(ids, "-published_at", limit),
+                repeat,
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"Categories: {len(categories)} x {options['articles']} "
+            f"articles, {limit} per section"
+        )
+        self.stdout.write(
+            f"Per-category: {legacy_seconds * 1000:.2f} ms, "
+            f"{legacy_queries} queries"
+        )
+        self.stdout.write(
+            f"Windowed:     {windowed_seconds * 1000:.2f} ms, "
+            f"{windowed_queries} query"
+        )
@@ -0,0 +1,95 @@
+"""
+Benchmark article search: the old icontains scan against the full-text
+index (FTS5 on SQLite, tsvector + GIN on PostgreSQL).
+Synthetic articles are inserted in a transaction that is rolled back
+afterwards, so this can run against a development database.
+Usage: python manage.py benchmark_search --articles 100000
+Located at: apps/news/management/commands/benchmark_search.py
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from apps.news.models import Article
+from apps.news.search import full_text_search, search_backend
+
+VOCABULARY = (
+    "election market climate vaccine football striker orbit telescope "
+    "budget inflation startup merger drought wildfire festival album "
+    "court verdict senate protest harvest rainfall satellite battery "
+    "museum exhibit transfer derby hospital surgeon treaty border"
+).split()
+FILLER = (
+    "the a report said under today officials announced new plans after "
+    "weeks of talks while critics warned about rising costs and delays"
+).split()
+QUERIES = ["telescope", "climate drought", "court verdict", "zebra"]
+
+
+def synthetic_text(rng, words):
+    text = rng.choices(FILLER, k=words)
+    for _ in range(max(1, words // 40)):
+        text.insert(rng.randrange(len(text)), rng.choice(VOCABULARY))
+    return " ".join(text)
+
+
+def time_query(queryset, repeat):
+    """Time what a search page runs: the paginator count and page one."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        queryset.count()
+        list(queryset[:9])
+    return (time.perf_counter() - start) / repeat
+
+
+class Command(BaseCommand):
+    help = "Compare icontains and full-text search latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        repeat = options["repeat"]
+        self.stdout.write(f"Backend: {search_backend() or 'icontains'}")
+
+        with transaction.atomic():
+            batch = []
+            for n in range(options["articles"]):
+                batch.append(Article(
+                    title=synthetic_text(rng, 8),
+                    slug=f"search-benchmark-{n}",
+                    url=f"https://example.com/search-benchmark/{n}",
+                    summary=synthetic_text(rng, 30),
+                    content=synthetic_text(rng, 200),
+                ))
+                if len(batch) == 5000:
+                    Article.objects.bulk_create(batch)
+                    batch = []
+            Article.objects.bulk_create(batch)
+            self.stdout.write(f"Articles: {Article.objects.count()}")
+
+            for query in QUERIES:
+                words = query.split()
+                scan = Article.objects.all()
+                for word in words:
+                    scan = scan.filter(
+                        Q(title__icontains=word) | Q(content__icontains=word)
+                    )
+                ranked = full_text_search(
+                    Article.objects.all(), query
+                ).order_by("-search_rank", "-published_at")
+
+                scan_seconds = time_query(scan.order_by("-id"), repeat)
+                ranked_seconds = time_query(ranked, repeat)
+                self.stdout.write(
+                    f"{query!r:18} icontains {scan_seconds * 1000:8.1f} ms"
+                    f"   full-text {ranked_seconds * 1000:8.1f} ms"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,38 @@
+"""
+Recompute or check the denormalised engagement counters on Article and
+Comment (comment, like, save and vote counts).
+Usage: python manage.py rebuild_counters [--verify] [--batch-size 10000]
+Located at: apps/news/management/commands/rebuild_counters.py
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.news.counters import rebuild_counters, verify_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or with --verify, check) the stored engagement counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify", action="store_true",
+            help="Report mismatched counters without changing anything.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            mismatches = verify_counters()
+            for label, rows in mismatches.items():
+                self.stdout.write(f"{label}: {rows} mismatched")
+            if any(mismatches.values()):
+                raise CommandError(
+                    "Counters are out of date; run rebuild_counters."
+                )
+            self.stdout.write(self.style.SUCCESS("All counters match."))
+            return
+
+        updated = rebuild_counters(batch_size=options["batch_size"])
+        for label, rows in updated.items():
+            self.stdout.write(f"{label}: {rows} rows rebuilt")
+        self.stdout.write(self.style.SUCCESS("Counters rebuilt."))
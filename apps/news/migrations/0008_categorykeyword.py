@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+def seed_keywords(apps, schema_editor):
+    CategoryKeyword = apps.get_model("news", "CategoryKeyword")
+    keywords = {
+        "Politics":
+            ["election", "government", "minister", "policy", "parliament"],
+        "Business":
+            ["market", "economy", "trade", "inflation", "stock"],
+        "Technology":
+            ["AI", "tech", "software", "hardware", "startup"],
+        "Sports":
+            ["match", "goal", "team", "tournament", "league"],
+        "World News":
+            ["UN", "international", "global", "conflict", "diplomacy"],
+        "Entertainment":
+            ["movie", "music", "celebrity", "TV", "film"],
+    }
+    CategoryKeyword.objects.bulk_create([
+        CategoryKeyword(category_name=category_name, keyword=keyword)
+        for category_name, words in keywords.items()
+        for keyword in words
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_article_likes_article_saves'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryKeyword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_name', models.CharField(help_text='Name of the category this keyword points to', max_length=100)),
+                ('keyword', models.CharField(help_text="Word or phrase matched on word boundaries. All-caps keywords such as 'AI' only match in upper case.", max_length=100)),
+                ('weight', models.PositiveSmallIntegerField(default=1, help_text='Score added for each match')),
+            ],
+            options={
+                'ordering': ['category_name', 'keyword'],
+                'unique_together': {('category_name', 'keyword')},
+            },
+        ),
+        migrations.RunPython(seed_keywords, migrations.RunPython.noop),
+    ]
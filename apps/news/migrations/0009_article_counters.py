@@ -0,0 +1,50 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_rows(model, fk_name):
+    rows = (
+        model.objects.filter(**{fk_name: OuterRef("pk")})
+        .order_by().values(fk_name).annotate(n=Count("*")).values("n")
+    )
+    return Coalesce(Subquery(rows), Value(0))
+
+
+def populate_counters(apps, schema_editor):
+    Article = apps.get_model("news", "Article")
+    Comment = apps.get_model("users", "Comment")
+    likes = Article._meta.get_field("likes").remote_field.through
+    saves = Article._meta.get_field("saves").remote_field.through
+    Article.objects.update(
+        comment_count=count_rows(Comment, "article"),
+        like_count=count_rows(likes, "article"),
+        save_count=count_rows(saves, "article"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_categorykeyword'),
+        ('users', '0016_alter_profile_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='save_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE news_article ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'C')
+    ) STORED
+    """,
+    """
+    CREATE INDEX news_article_search_vector_idx
+    ON news_article USING GIN (search_vector)
+    """,
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS news_article_search_vector_idx",
+    "ALTER TABLE news_article DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE news_article_fts USING fts5(
+        title, summary, content,
+        content='news_article', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER news_article_fts_insert AFTER INSERT ON news_article
+    BEGIN
+        INSERT INTO news_article_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER news_article_fts_delete AFTER DELETE ON news_article
+    BEGIN
+        INSERT INTO news_article_fts(
+            news_article_fts, rowid, title, summary, content
+        ) VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER news_article_fts_update
+    AFTER UPDATE OF title, summary, content ON news_article
+    BEGIN
+        INSERT INTO news_article_fts(
+            news_article_fts, rowid, title, summary, content
+        ) VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO news_article_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    "INSERT INTO news_article_fts(news_article_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS news_article_fts_update",
+    "DROP TRIGGER IF EXISTS news_article_fts_delete",
+    "DROP TRIGGER IF EXISTS news_article_fts_insert",
+    "DROP TABLE IF EXISTS news_article_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {
+            "postgresql": postgres, "sqlite": sqlite,
+        }.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_article_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
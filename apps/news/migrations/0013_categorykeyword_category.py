@@ -0,0 +1,77 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_categories(apps, schema_editor):
+    """
+    Point each keyword at the Category its name matched. Keywords naming
+    a category that does not exist could never categorise an article,
+    so they are dropped.
+    """
+    Category = apps.get_model("news", "Category")
+    CategoryKeyword = apps.get_model("news", "CategoryKeyword")
+    categories = dict(Category.objects.values_list("name", "id"))
+    orphans = []
+    for keyword in CategoryKeyword.objects.all():
+        category_id = categories.get(keyword.category_name)
+        if category_id is None:
+            orphans.append(keyword.id)
+            continue
+        keyword.category_id = category_id
+        keyword.save(update_fields=["category"])
+    CategoryKeyword.objects.filter(id__in=orphans).delete()
+
+
+def unlink_categories(apps, schema_editor):
+    CategoryKeyword = apps.get_model("news", "CategoryKeyword")
+    for keyword in CategoryKeyword.objects.select_related("category"):
+        keyword.category_name = keyword.category.name
+        keyword.save(update_fields=["category_name"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0012_viewflush'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categorykeyword',
+            name='category',
+            field=models.ForeignKey(
+                null=True, on_delete=django.db.models.deletion.CASCADE,
+                related_name='keywords', to='news.category',
+                help_text='Category this keyword points to',
+            ),
+        ),
+        migrations.RunPython(link_categories, unlink_categories),
+        migrations.AlterField(
+            model_name='categorykeyword',
+            name='category',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='keywords', to='news.category',
+                help_text='Category this keyword points to',
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name='categorykeyword',
+            unique_together={('category', 'keyword')},
+        ),
+        migrations.AlterModelOptions(
+            name='categorykeyword',
+            options={'ordering': ['category__name', 'keyword']},
+        ),
+        # A default lets the column be added back to existing rows when
+        # migrating backwards
+        migrations.AlterField(
+            model_name='categorykeyword',
+            name='category_name',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='categorykeyword',
+            name='category_name',
+        ),
+    ]
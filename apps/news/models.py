@@ -47,7 +47,30 @@ class Category(models.Model):
         return self.name
 
 
-class Article(models.Model):
+class CounterFieldsMixin:
+    """
+    For models with denormalised counters kept up to date by F() updates.
+    A plain save() of an existing row leaves the counter columns alone,
+    so an instance loaded before a like or vote cannot write back a
+    stale count. Pass update_fields explicitly to write them.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            self.pk is not None and not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Article(CounterFieldsMixin, models.Model):
     title = models.CharField(max_length=255, db_index=True)
     content = models.TextField(db_index=True)
     summary = models.TextField(blank=True, null=True)
@@ -64,6 +87,11 @@ class Article(models.Model):
         User, blank=True, related_name='saved_articles'
     )
 
+    # Denormalised counters, maintained by signals (apps/news/counters.py)
+    comment_count = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    save_count = models.PositiveIntegerField(default=0)
+
     # Link to article source and category
     source = models.ForeignKey(
         'news.NewsSource',
@@ -88,8 +116,16 @@ class Article(models.Model):
         )
     )
 
+    counter_fields = ("comment_count", "like_count", "save_count")
+
     class Meta:
         ordering = ['-published_at']
+        indexes = [
+            models.Index(
+                fields=['published_at', 'id'],
+                name='news_article_published_id_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.published_at.strftime('%Y-%m-%d')})"
@@ -98,3 +134,37 @@ class Article(models.Model):
         return reverse(
             "news:article_detail", kwargs={"article_id": self.id}
         )
+
+
+class CategoryKeyword(models.Model):
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="keywords",
+        help_text="Category this keyword points to"
+    )
+    keyword = models.CharField(
+        max_length=100,
+        help_text=(
+            "Word or phrase matched on word boundaries. All-caps keywords "
+            "such as 'AI' only match in upper case."
+        )
+    )
+    weight = models.PositiveSmallIntegerField(
+        default=1, help_text="Score added for each match"
+    )
+
+    class Meta:
+        ordering = ['category__name', 'keyword']
+        unique_together = ('category', 'keyword')
+
+    def __str__(self):
+        return f"{self.keyword} → {self.category.name}"
+
+
+# Buffered view flushes already written to Article.views (see
+# apps/news/view_counts.py), so a retried flush is not applied twice
+class ViewFlush(models.Model):
+    flush_id = models.CharField(max_length=32, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"View flush {self.flush_id}"
@@ -0,0 +1,234 @@
+"""
+Keyset (cursor) pagination for article listings.
+Pages are fetched with WHERE (sort key) < (last row's key) instead of
+OFFSET, so page 500 costs the same as page 1. Cursors are opaque strings
+holding the boundary row's sort values; the ordering always ends in
+`id`, which makes every position unique and the pages stable while new
+articles arrive.
+Counting the full result set is the other per-page cost, so the total
+can be exact, cached for COUNT_CACHE_TTL seconds, or (on PostgreSQL) the
+planner's row estimate.
+Located at: apps/news/pagination.py
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+COUNT_CACHE_TTL = 300
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATE = "estimate"
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+def encode_cursor(direction, values):
+    # Full isoformat: DjangoJSONEncoder would drop the microseconds
+    values = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    payload = json.dumps([direction, values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Return (direction, values), or None for a missing or broken cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError, binascii.Error):
+        return None
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+def keyset_filter(ordering, values, forward=True):
+    """
+    Build the Q for rows after (or, with forward=False, before) the row
+    whose sort values are `values` under `ordering`:
+    (a > x) OR (a = x AND b > y) OR ...
+    """
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip("-")
+        descending = field.startswith("-")
+        op = "lt" if descending == forward else "gt"
+        step = Q(**{f"{name}__{op}": values[i]})
+        for previous, value in zip(ordering[:i], values):
+            step &= Q(**{previous.lstrip("-"): value})
+        condition |= step
+    return condition
+
+
+def reverse_ordering(ordering):
+    return [
+        field[1:] if field.startswith("-") else f"-{field}"
+        for field in ordering
+    ]
+
+
+def cached_count(queryset, version=None):
+    """
+    COUNT(*) cached by the query's SQL; pass a `version` that changes
+    with the data to retire the cached totals early.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    digest = hashlib.sha1(
+        f"{sql}|{params!r}".encode(), usedforsecurity=False
+    ).hexdigest()
+    key = f"pagination:count:{version}:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TTL)
+    return count
+
+
+def estimated_count(queryset):
+    """
+    The PostgreSQL planner's row estimate, or None elsewhere.
+    """
+    if connection.vendor != "postgresql":
+        return None
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPage:
+    """
+    One page of results with cursors to its neighbours.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate `queryset` in `ordering` (order_by strings naming model
+    fields or annotations; `id` is appended as the tiebreaker).
+    Ordering fields must not be NULL; annotate a Coalesce for nullable
+    ones.
+    count_mode is COUNT_EXACT, COUNT_CACHED or COUNT_ESTIMATE (which
+    falls back to the cached count where no estimate is available);
+    count_version is passed on to cached_count().
+    """
+
+    def __init__(self, queryset, per_page, ordering,
+                 count_mode=COUNT_EXACT, count_version=None):
+        ordering = list(ordering)
+        if ordering[-1].lstrip("-") != "id":
+            ordering.append("-id" if ordering[0].startswith("-") else "id")
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.count_mode = count_mode
+        self.count_version = count_version
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.queryset.order_by()
+        if self.count_mode == COUNT_ESTIMATE:
+            estimate = estimated_count(queryset)
+            if estimate is not None:
+                self.count_is_estimate = True
+                return estimate
+        if self.count_mode in (COUNT_CACHED, COUNT_ESTIMATE):
+            return cached_count(queryset, self.count_version)
+        return queryset.count()
+
+    def row_values(self, obj):
+        return [getattr(obj, field.lstrip("-")) for field in self.ordering]
+
+    def get_page(self, cursor=None):
+        """
+        Return the page after a NEXT cursor or before a PREVIOUS one;
+        the first page for no cursor or one that cannot be decoded.
+        """
+        decoded = decode_cursor(cursor)
+        direction, values = decoded or (NEXT, None)
+        if values is not None and len(values) != len(self.ordering):
+            direction, values = NEXT, None
+
+        queryset = self.queryset
+        if values is not None:
+            try:
+                queryset = queryset.filter(keyset_filter(
+                    self.ordering, values, forward=direction == NEXT
+                ))
+            except (ValidationError, ValueError, TypeError):
+                # A tampered cursor: start again from the first page
+                direction, values = NEXT, None
+                queryset = self.queryset
+
+        forward = direction == NEXT
+        ordering = self.ordering if forward else reverse_ordering(
+            self.ordering
+        )
+        queryset = queryset.order_by(*ordering)
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        # Going forward there is more ahead if we over-fetched, and
+        # something behind if we started from a cursor; and vice versa.
+        has_next = has_more if forward else values is not None
+        has_previous = values is not None if forward else has_more
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(NEXT, self.row_values(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(
+                PREVIOUS, self.row_values(rows[0])
+            )
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
@@ -0,0 +1,188 @@
+"""
+Full-text article search.
+On PostgreSQL, news_article has a stored generated tsvector column
+(title weighted over summary over content) with a GIN index, matched
+with websearch_to_tsquery and ranked with SearchRank. On SQLite, an FTS5
+table over the same columns is kept in step by triggers and ranked with
+bm25(). Both are maintained by the database itself (migration 0010), so
+every write path, including ingestion's bulk_create/bulk_update and
+Article.save(), keeps the index current. SQLite drops triggers when a
+migration rebuilds news_article, so ensure_sqlite_index() restores them
+after every migrate. Other databases fall back to the old icontains
+filter without ranking.
+Keyset pagination sorts on `search_rank_key`, the rank scaled by
+RANK_SCALE and rounded to an integer, rather than on the float rank:
+a float4 ts_rank or a double bm25() written into a JSON cursor is not
+guaranteed to compare equal to the stored value on the next page.
+Located at: apps/news/search.py
+"""
+
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVectorField
+)
+from django.db import connection, connections
+from django.db.models import (
+    BigIntegerField, F, FloatField, Func, Q, Value
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Round
+
+SEARCH_CONFIG = "english"
+FTS_TABLE = "news_article_fts"
+
+# bm25() weights for the FTS5 title, summary and content columns
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Rank resolution kept in search_rank_key; closer ranks tie
+RANK_SCALE = 10 ** 9
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def search_backend():
+    """
+    Return "postgresql", "sqlite" or None for the icontains fallback.
+    """
+    if connection.vendor in ("postgresql", "sqlite"):
+        return connection.vendor
+    return None
+
+
+SQLITE_TRIGGERS = {
+    "news_article_fts_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS news_article_fts_insert
+        AFTER INSERT ON news_article BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, summary, content)
+            VALUES (new.id, new.title, new.summary, new.content);
+        END
+    """,
+    "news_article_fts_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS news_article_fts_delete
+        AFTER DELETE ON news_article BEGIN
+            INSERT INTO {FTS_TABLE}(
+                {FTS_TABLE}, rowid, title, summary, content
+            ) VALUES ('delete', old.id, old.title, old.summary,
+                      old.content);
+        END
+    """,
+    "news_article_fts_update": f"""
+        CREATE TRIGGER IF NOT EXISTS news_article_fts_update
+        AFTER UPDATE OF title, summary, content ON news_article BEGIN
+            INSERT INTO {FTS_TABLE}(
+                {FTS_TABLE}, rowid, title, summary, content
+            ) VALUES ('delete', old.id, old.title, old.summary,
+                      old.content);
+            INSERT INTO {FTS_TABLE}(rowid, title, summary, content)
+            VALUES (new.id, new.title, new.summary, new.content);
+        END
+    """,
+}
+
+
+def ensure_sqlite_index(using=None):
+    """
+    Recreate missing FTS5 triggers and rebuild the index if any were
+    missing. Returns True if the index was rebuilt.
+    """
+    db = connections[using or "default"]
+    if db.vendor != "sqlite":
+        return False
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name = %s", [FTS_TABLE],
+        )
+        if cursor.fetchone() is None:
+            # Migration 0010 has not run on this database yet
+            return False
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing.issuperset(SQLITE_TRIGGERS):
+            return False
+        for statement in SQLITE_TRIGGERS.values():
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+    return True
+
+
+def fts5_query(query):
+    """
+    Turn free text into an FTS5 MATCH expression requiring every word.
+    Words are quoted so punctuation and FTS5 operators in user input
+    can never cause a syntax error.
+    """
+    return " ".join(f'"{token}"' for token in TOKEN_RE.findall(query))
+
+
+class BM25Rank(Func):
+    """
+    Weighted bm25() of one article for an FTS5 MATCH expression, negated
+    so that higher is more relevant: BM25Rank(match, article id). The id
+    is an expression, so the subquery follows the outer query's alias.
+    """
+    template = (
+        f"(SELECT -bm25({FTS_TABLE}, "
+        f"{', '.join(str(weight) for weight in FTS_WEIGHTS)}) "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %(expressions)s)"
+    )
+    arg_joiner = " AND rowid = "
+    arity = 2
+    output_field = FloatField()
+
+
+def full_text_search(queryset, query):
+    """
+    Filter an Article queryset to matches for `query` and annotate each
+    with `search_rank` (higher is more relevant) and its integer
+    `search_rank_key` for ordering and cursors.
+    """
+    backend = search_backend()
+
+    if backend == "postgresql":
+        vector = RawSQL(
+            '"news_article"."search_vector"', (),
+            output_field=SearchVectorField(),
+        )
+        search_query = SearchQuery(
+            query, search_type="websearch", config=SEARCH_CONFIG
+        )
+        return annotate_rank_key(queryset.annotate(
+            _search_vector=vector,
+            search_rank=SearchRank(vector, search_query),
+        ).filter(_search_vector=search_query))
+
+    if backend == "sqlite":
+        match = fts5_query(query)
+        if not match:
+            return queryset.none()
+        # The IN subquery runs the MATCH once to pick the hits; bm25()
+        # needs a MATCH in its own query, which FTS5 answers per hit by
+        # seeking to its rowid
+        hits = RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            (match,),
+        )
+        return annotate_rank_key(queryset.filter(id__in=hits).annotate(
+            search_rank=BM25Rank(Value(match), F("id"))
+        ))
+
+    return annotate_rank_key(queryset.filter(
+        Q(title__icontains=query) | Q(content__icontains=query)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField())))
+
+
+def annotate_rank_key(queryset):
+    """
+    Annotate `search_rank_key`, the `search_rank` annotation as an
+    integer that orders, compares and round-trips through a cursor
+    exactly.
+    """
+    return queryset.annotate(search_rank_key=Cast(
+        Round(F("search_rank") * RANK_SCALE), BigIntegerField()
+    ))
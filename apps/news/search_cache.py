@@ -0,0 +1,103 @@
+"""
+Cache for search result pages and their facet counts.
+Articles only change when an ingestion batch runs or expired articles
+are deleted, so a search page is stored as the ids it showed, its
+cursors and total, and the category/source facet counts, keyed by the
+normalised query and filters. Each key includes a corpus version; both
+writers bump it, which retires every cached search at once.
+A cached page is hydrated with a single in_bulk() query, so counters
+and titles are always current.
+Located at: apps/news/search_cache.py
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from apps.news.fragments import bump_version, get_version
+from apps.news.models import Article
+
+CORPUS_VERSION_KEY = "search:corpus:version"
+
+FACET_LIMIT = 10
+
+
+def get_corpus_version():
+    return get_version(CORPUS_VERSION_KEY)
+
+
+def bump_corpus_version():
+    """
+    Retire every cached search page; call after the articles change.
+    """
+    bump_version(CORPUS_VERSION_KEY)
+
+
+def normalize_query(query):
+    """
+    Case-fold and collapse whitespace, so "Climate  Drought" and
+    "climate drought" share one cache entry. Matching is already
+    case-insensitive on every search backend.
+    """
+    return " ".join(query.casefold().split())
+
+
+def get_search_key(**params):
+    payload = json.dumps(params, sort_keys=True)
+    digest = hashlib.sha1(
+        payload.encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"search:{get_corpus_version()}:{digest}"
+
+
+def facet_counts(queryset):
+    """
+    Count matches per category and per source, largest first.
+    """
+    queryset = queryset.order_by()
+    facets = {}
+    for facet in ("category", "source"):
+        rows = (
+            queryset.filter(**{f"{facet}__isnull": False})
+            .values(f"{facet}__slug", f"{facet}__name")
+            .annotate(count=Count("id"))
+            .order_by("-count", f"{facet}__name")[:FACET_LIMIT]
+        )
+        facets[facet] = [
+            {
+                "slug": row[f"{facet}__slug"],
+                "name": row[f"{facet}__name"],
+                "count": row["count"],
+            }
+            for row in rows
+        ]
+    return facets
+
+
+def hydrate_articles(ids):
+    """
+    Load articles by id in one query, in the given order; ids deleted
+    since the page was cached are dropped.
+    """
+    articles = Article.objects.select_related(
+        "source", "category"
+    ).in_bulk(ids)
+    return [articles[pk] for pk in ids if pk in articles]
+
+
+def cached_search(key, build):
+    """
+    Return the cached entry for `key`, calling build() and storing its
+    result on a miss. Entries are dicts holding `ids`, `next_cursor`,
+    `previous_cursor`, `count`, `count_is_estimate` and `facets`.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        entry = build()
+        cache.set(
+            key, entry, getattr(settings, "SEARCH_CACHE_TTL", 60 * 60)
+        )
+    return entry
@@ -1,14 +1,29 @@
 """
 Signal handlers for the News app.
 This module contains signal handlers that automatically generate
-unique slugs for news articles before they are saved to the database.
+unique slugs for news articles before they are saved to the database,
+and keep the compiled keyword classifier, the Category/NewsSource
+lookup caches, the Redis "latest" article cache, the like/save
+counters, the trending sets, the users' cached engagement sets and the
+homepage fragments in step with their tables.
 Located at: apps/news/signals.py
 """
 
-from django.db.models.signals import pre_save
+from django.db.models.signals import (
+    pre_save, post_save, post_delete, m2m_changed, post_migrate
+)
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils.text import slugify
-from .models import Article, Category
+from .models import Article, Category, CategoryKeyword, NewsSource
+from .classifier import invalidate_classifier
+from .lookups import category_lookup, news_source_lookup
+from .article_cache import cache_article, remove_article
+from .counters import update_m2m_counter
+from .trending import record_engagement
+from .fragments import bump_version
+from .search import ensure_sqlite_index
+from apps.users.engagement_cache import LIKED, SAVED, track_m2m_change
 
 
 @receiver(pre_save, sender=Article)
@@ -33,3 +48,97 @@ def generate_unique_slug(sender, instance, **kwargs):
 def generate_category_slug(sender, instance, **kwargs):
     if not instance.slug:
         instance.slug = slugify(instance.name)
+
+
+@receiver(post_save, sender=CategoryKeyword)
+@receiver(post_delete, sender=CategoryKeyword)
+@receiver(post_save, sender=Category)
+def rebuild_keyword_classifier(sender, instance, **kwargs):
+    """
+    Recompile the keyword classifier here and in every other worker
+    process after its keywords change, or a category they point to is
+    renamed (deleting one deletes its keywords).
+    """
+    invalidate_classifier()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_lookup(sender, instance, **kwargs):
+    """
+    Drop cached categories here and in every other worker process.
+    """
+    category_lookup.invalidate()
+
+
+@receiver(post_save, sender=NewsSource)
+@receiver(post_delete, sender=NewsSource)
+def invalidate_news_source_lookup(sender, instance, **kwargs):
+    """
+    Drop cached news sources here and in every other worker process.
+    """
+    news_source_lookup.invalidate()
+
+
+@receiver(post_save, sender=Article)
+def cache_manual_article(sender, instance, created, **kwargs):
+    """
+    Add articles written in the admin to the "latest" cache.
+    Imported articles are cached in bulk by fetch_news_articles.
+    """
+    if created and not instance.imported:
+        transaction.on_commit(lambda: cache_article(instance))
+
+
+@receiver(post_delete, sender=Article)
+def uncache_deleted_article(sender, instance, **kwargs):
+    """
+    Remove deleted articles from the "latest" cache.
+    """
+    url = instance.url
+    transaction.on_commit(lambda: remove_article(url))
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def expire_homepage_fragments(sender, instance, **kwargs):
+    """
+    Mark cached homepage sections stale once the change is committed.
+    """
+    transaction.on_commit(bump_version)
+
+
+@receiver(m2m_changed, sender=Article.likes.through)
+def count_article_likes(sender, **kwargs):
+    """
+    Keep Article.like_count, trending and the users' cached liked sets
+    in step with likes added or removed.
+    """
+    track_m2m_change(LIKED, sender, **kwargs)
+    deltas = update_m2m_counter(Article, "like_count", sender, **kwargs)
+    if deltas:
+        transaction.on_commit(lambda: record_engagement("like", deltas))
+
+
+@receiver(m2m_changed, sender=Article.saves.through)
+def count_article_saves(sender, **kwargs):
+    """
+    Keep Article.save_count, trending and the users' cached saved sets
+    in step with saves added or removed.
+    """
+    track_m2m_change(SAVED, sender, **kwargs)
+    deltas = update_m2m_counter(Article, "save_count", sender, **kwargs)
+    if deltas:
+        transaction.on_commit(lambda: record_engagement("save", deltas))
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    """
+    SQLite loses the full-text triggers whenever a migration rebuilds
+    news_article; put them back once migrations have run.
+    """
+    if sender.label == "news":
+        ensure_sqlite_index(using)
@@ -0,0 +1,315 @@
+"""
+Pluggable news feed sources and a concurrent fetcher.
+Each source knows how to build its request and turn the response into
+GNews-shaped article dicts, so every feed can go through the same
+ingestion pipeline. Fetches run on a thread pool sharing one pooled
+HTTP session, with a concurrency cap per host and request timeouts.
+Located at: apps/news/sources.py
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+MEDIA_NS = "{http://search.yahoo.com/mrss/}"
+
+# Registry of source types, keyed by the "type" used in settings
+SOURCE_TYPES = {}
+
+FeedResult = namedtuple("FeedResult", ["source", "articles", "error"])
+
+
+def json_items(response, field):
+    """
+    Return (document, list of item dicts) from a JSON response, raising
+    ValueError if the body is not an object or `field` is not a list of
+    objects. A missing or null `field` counts as no items.
+    """
+    data = response.json()
+    if not isinstance(data, dict):
+        raise ValueError(
+            f"Expected a JSON object, got {type(data).__name__}."
+        )
+    items = data.get(field) or []
+    if not isinstance(items, list) or not all(
+        isinstance(item, dict) for item in items
+    ):
+        raise ValueError(f"Expected '{field}' to be a list of objects.")
+    return data, items
+
+
+def register_source(type_name):
+    """
+    Class decorator adding a FeedSource subclass to the registry.
+    """
+    def decorator(cls):
+        cls.type_name = type_name
+        SOURCE_TYPES[type_name] = cls
+        return cls
+    return decorator
+
+
+class FeedSource(ABC):
+    """
+    Base class for a single feed fetched on each ingestion cycle.
+    Subclasses must implement parse(); one that does not cannot be
+    instantiated, so a broken source fails in build_source() rather
+    than in the middle of a fetch.
+    """
+    type_name = None
+
+    def __init__(self, name, url, params=None):
+        self.name = name
+        self.url = url
+        self.params = params or {}
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name}>"
+
+    @property
+    def host(self):
+        return urlsplit(self.url).netloc
+
+    @property
+    def cache_name(self):
+        """Name of the rolling Redis cache this feed writes to."""
+        return slugify(self.name)
+
+    @abstractmethod
+    def parse(self, response):
+        """Return a list of GNews-shaped article dicts."""
+
+
+@register_source("gnews")
+class GNewsSource(FeedSource):
+    """
+    GNews top headlines, optionally narrowed to a topic.
+    """
+    BASE_URL = "https://gnews.io/api/v4/top-headlines"
+
+    def __init__(self, name=None, topic=None, country="gb", page_size=20,
+                 url=BASE_URL):
+        self.topic = topic
+        params = {
+            "country": country,
+            "token": settings.GNEWS_API_KEY,
+            "pageSize": page_size,
+        }
+        if topic:
+            params["category"] = topic
+        super().__init__(
+            name or f"gnews-{topic or 'top'}-{country}", url, params
+        )
+
+    @property
+    def cache_name(self):
+        # All GNews feeds share the "gnews" cache checked before fetching
+        return "gnews"
+
+    def parse(self, response):
+        _, articles = json_items(response, "articles")
+        if self.topic:
+            for article in articles:
+                article.setdefault("topic", self.topic)
+        return articles
+
+
+@register_source("rss")
+class RSSFeedSource(FeedSource):
+    """
+    Generic RSS 2.0 or Atom feed.
+    """
+
+    def parse(self, response):
+        root = ElementTree.fromstring(response.content)
+        if root.tag == f"{ATOM_NS}feed":
+            return self._parse_atom(root)
+        return self._parse_rss(root)
+
+    def _parse_rss(self, root):
+        feed_title = self._text(root.find("channel"), "title")
+        articles = []
+        for item in root.iter("item"):
+            description = strip_tags(self._text(item, "description") or "")
+            enclosure = item.find("enclosure")
+            media = item.find(f"{MEDIA_NS}content")
+            image = None
+            if enclosure is not None:
+                image = enclosure.get("url")
+            elif media is not None:
+                image = media.get("url")
+            articles.append({
+                "title": self._text(item, "title"),
+                "url": self._text(item, "link"),
+                "description": description,
+                "content": description,
+                "publishedAt": self._text(item, "pubDate"),
+                "image": image,
+                "source": {"name": feed_title or self.name},
+            })
+        return articles
+
+    def _parse_atom(self, root):
+        feed_title = self._text(root, f"{ATOM_NS}title")
+        articles = []
+        for entry in root.iter(f"{ATOM_NS}entry"):
+            link = None
+            for link_el in entry.findall(f"{ATOM_NS}link"):
+                if link_el.get("rel", "alternate") == "alternate":
+                    link = link_el.get("href")
+                    break
+            summary = strip_tags(
+                self._text(entry, f"{ATOM_NS}summary")
+                or self._text(entry, f"{ATOM_NS}content") or ""
+            )
+            articles.append({
+                "title": self._text(entry, f"{ATOM_NS}title"),
+                "url": link,
+                "description": summary,
+                "content": summary,
+                "publishedAt": (
+                    self._text(entry, f"{ATOM_NS}published")
+                    or self._text(entry, f"{ATOM_NS}updated")
+                ),
+                "image": None,
+                "source": {"name": feed_title or self.name},
+            })
+        return articles
+
+    @staticmethod
+    def _text(element, tag):
+        child = element.find(tag) if element is not None else None
+        if child is None or child.text is None:
+            return None
+        return child.text.strip()
+
+
+@register_source("json")
+class JSONFeedSource(FeedSource):
+    """
+    JSON Feed (https://jsonfeed.org) document.
+    """
+
+    def parse(self, response):
+        data, items = json_items(response, "items")
+        feed_title = data.get("title")
+        articles = []
+        for item in items:
+            content = item.get("content_text") or strip_tags(
+                item.get("content_html") or ""
+            )
+            articles.append({
+                "title": item.get("title"),
+                "url": item.get("url") or item.get("external_url"),
+                "description": item.get("summary") or content[:300],
+                "content": content,
+                "publishedAt": item.get("date_published"),
+                "image": item.get("image") or item.get("banner_image"),
+                "source": {"name": feed_title or self.name},
+            })
+        return articles
+
+
+def build_source(config):
+    """
+    Instantiate a FeedSource from a settings entry such as
+    {"type": "rss", "name": "BBC", "url": "https://..."}.
+    """
+    config = dict(config)
+    source_type = config.pop("type")
+    try:
+        source_cls = SOURCE_TYPES[source_type]
+    except KeyError:
+        raise ValueError(f"Unknown news source type '{source_type}'.")
+    return source_cls(**config)
+
+
+def get_configured_sources():
+    """
+    Build the feed sources listed in settings.NEWS_FEED_SOURCES.
+    """
+    configs = getattr(
+        settings, "NEWS_FEED_SOURCES", [{"type": "gnews", "country": "gb"}]
+    )
+    return [build_source(config) for config in configs]
+
+
+class FeedFetcher:
+    """
+    Fetch many feeds concurrently over a shared, pooled HTTP session.
+    """
+
+    def __init__(self, max_workers=8, max_per_host=2, timeout=10,
+                 session=None):
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.session = session or self._build_session()
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            max_workers=getattr(settings, "NEWS_FETCH_MAX_WORKERS", 8),
+            max_per_host=getattr(settings, "NEWS_FETCH_MAX_PER_HOST", 2),
+            timeout=getattr(settings, "NEWS_FETCH_TIMEOUT", 10),
+        )
+
+    def _build_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.max_workers,
+            pool_maxsize=self.max_workers,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _host_limit(self, host):
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(
+                    self.max_per_host
+                )
+            return self._host_limits[host]
+
+    def fetch(self, source):
+        """
+        Fetch and parse one source, returning a FeedResult.
+        Errors are captured so one failing feed never sinks the batch.
+        """
+        try:
+            with self._host_limit(source.host):
+                response = self.session.get(
+                    source.url, params=source.params, timeout=self.timeout
+                )
+            response.raise_for_status()
+            return FeedResult(source, source.parse(response), None)
+        except (requests.RequestException, ValueError,
+                ElementTree.ParseError) as e:
+            return FeedResult(source, [], e)
+
+    def fetch_all(self, sources):
+        """
+        Fetch all sources concurrently, preserving their order.
+        """
+        sources = list(sources)
+        if not sources:
+            return []
+        workers = min(self.max_workers, len(sources))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.fetch, sources))
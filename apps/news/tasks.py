@@ -5,66 +5,52 @@ store them in the database, and cache them in Redis.
 Located at: apps/news/tasks.py
 """
 
-import requests
 import logging
 import redis
-import json
-import re
 from datetime import timedelta
-from dateutil import parser
 from celery import shared_task
 from django.conf import settings
+from django.db import transaction
 from django.utils.text import slugify
 from django.utils import timezone
-from apps.news.models import Article, NewsSource, Category
+from apps.news.models import Article, NewsSource
+from apps.news.ingestion import (
+    ingest_articles, category_name_from_topic, category_name_from_keywords
+)
+from apps.news.sources import FeedFetcher, get_configured_sources
+from apps.news.lookups import category_lookup, news_source_lookup
+from apps.news.article_cache import (
+    LATEST_FEED, get_redis_key, write_articles
+)
+from apps.news.view_counts import flush_views
+from apps.news.trending import reconcile_trending
+from apps.news.fragments import bump_version
+from apps.news.search_cache import bump_corpus_version
+from apps.news.autocomplete import rebuild_autocomplete_index
+from core.redis_client import redis_client
 
 # Define a module-level logger
 logger = logging.getLogger(__name__)
 
-# Initialize Redis client using full REDIS_URL (e.g., from Upstash)
-REDIS_URL = getattr(settings, 'REDIS_URL')
-redis_client = redis.StrictRedis.from_url(REDIS_URL, decode_responses=True)
-
-# Set Redis expiry time for news articles (28 days)
-REDIS_ARTICLE_EXPIRY = timedelta(days=28).total_seconds()
-
-
-# Helper function to generate Redis keys dynamically
-def get_redis_key(source):
-    return f"news:{source.lower()}"
-
 
 def cache_articles(articles, source, max_articles=100):
     """
     Cache news articles in Redis using a rolling cache approach.
-    - Avoids redundant storage by checking existing articles before pushing.
-    - Stores only new articles while maintaining a max limit.
+    - Stores a sorted set by publish time plus a hash of payloads
+      (see apps/news/article_cache.py), written in one transaction.
+    - URLs already cached are skipped with ZADD NX, no full-list scan.
+    - Keeps only the newest max_articles entries.
     - Handles Redis connection failures gracefully.
     """
-    key = get_redis_key(source)
     try:
-        existing_articles = redis_client.lrange(key, 0, -1)
-        existing_urls = {
-            json.loads(article)["url"] for article in existing_articles
-        }
-        new_articles = [
-            json.dumps(article) for article in articles if article
-            ["url"] not in existing_urls
-        ]
-        if not new_articles:
-            logger.info(f"No new articles to cache for {source}.")
-            return
-        redis_client.lpush(
-            key, *new_articles
-        )  # Bulk insert for efficiency
-        redis_client.ltrim(
-            key, 0, max_articles - 1
-        )  # Keep latest 100
-        redis_client.expire(
-            key, int(REDIS_ARTICLE_EXPIRY)
-        )  # Set expiry to 28 days
+        added = write_articles(
+            redis_client, articles, source, max_articles=max_articles
+        )
     except redis.RedisError as e:
         logger.error(f"Redis error: {e}")
+        return
+    if not added:
+        logger.info(f"No new articles to cache for {source}.")
 
 
 @shared_task
@@ -79,6 +65,9 @@ def delete_expired_articles():
     )
     count = old_articles.count()
     old_articles.delete()
+    if count:
+        bump_corpus_version()
+        schedule_autocomplete_refresh()
     logger.info(f"Deleted {count} expired articles older than 28 days.")
     return f"{count} expired articles deleted."
 
@@ -87,20 +76,12 @@ def get_category_from_topic(topic):
     """
     Map GNews topic to a Category instance.
     """
-    topic_map = {
-        "world": "World News",
-        "nation": "Politics",
-        "business": "Business",
-        "technology": "Technology",
-        "sports": "Sports",
-        "entertainment": "Entertainment",
-    }
-    cat_name = topic_map.get(topic.lower()) if topic else None
+    cat_name = category_name_from_topic(topic)
     if cat_name:
-        try:
-            return Category.objects.get(name=cat_name)
-        except Category.DoesNotExist:
-            logger.warning(f"Category '{cat_name}' from topic not found.")
+        category = category_lookup.get(name=cat_name)
+        if category:
+            return category
+        logger.warning(f"Category '{cat_name}' from topic not found.")
     return None
 
 
@@ -108,39 +89,23 @@ def get_category_from_keywords(title, summary, content):
     """
     Match article content against keyword map to determine category.
     """
-    combined_text = re.sub(
-        r"[^\w\s]", "", f"{title} {summary} {content}".lower()
-    )
-    keyword_map = {
-        "Politics":
-            ["election", "government", "minister", "policy", "parliament"],
-        "Business":
-            ["market", "economy", "trade", "inflation", "stock"],
-        "Technology":
-            ["AI", "tech", "software", "hardware", "startup"],
-        "Sports":
-            ["match", "goal", "team", "tournament", "league"],
-        "World News":
-            ["UN", "international", "global", "conflict", "diplomacy"],
-        "Entertainment":
-            ["movie", "music", "celebrity", "TV", "film"],
-    }
-    for cat_name, keywords in keyword_map.items():
-        if any(keyword.lower() in combined_text for keyword in keywords):
-            try:
-                return Category.objects.get(name=cat_name)
-            except Category.DoesNotExist:
-                logger.warning(
-                    f"Keyword-matched category '{cat_name}' not found."
-                )
-                return None
+    cat_name = category_name_from_keywords(title, summary, content)
+    if cat_name:
+        category = category_lookup.get(name=cat_name)
+        if category:
+            return category
+        logger.warning(
+            f"Keyword-matched category '{cat_name}' not found."
+        )
     return None
 
 
 @shared_task
 def fetch_news_articles():
     """
-    Fetch top headlines from GNews API, categorize, store, and cache.
+    Fetch every configured feed concurrently, categorize, store, and cache.
+    Feeds are listed in settings.NEWS_FEED_SOURCES (see apps/news/sources.py)
+    and the combined payload is ingested as one batch.
     """
 
     if getattr(settings, "SKIP_FETCH_IF_CACHED", True):
@@ -149,89 +114,48 @@ def fetch_news_articles():
             logger.info("News articles already cached, skipping fetch.")
             return "News articles already cached, skipping fetch."
 
-    api_key = settings.GNEWS_API_KEY
-    url = "https://gnews.io/api/v4/top-headlines"
-    params = {
-        "country": "gb",
-        "token": api_key,
-        "pageSize": 20,
-    }
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        logger.error(f"Error fetching articles from GNews API: {e}")
-        return f"Error fetching articles from GNews API: {e}"
-
-    data = response.json()
-    articles_data = data.get("articles", [])
-    created_count = 0
-    cached_articles = []
-
-    for article_data in articles_data:
-        title = article_data.get("title")
-        url_article = article_data.get("url")
-        published_str = article_data.get("publishedAt")
-        if not title or not url_article:
-            logger.warning("Skipping article due to missing title or URL")
+    results = FeedFetcher.from_settings().fetch_all(get_configured_sources())
+    articles_data = []
+    feed_by_url = {}
+    for result in results:
+        if result.error:
+            logger.error(
+                f"Error fetching articles from {result.source.name}: "
+                f"{result.error}"
+            )
             continue
-
-        try:
-            published_at = parser.parse(
-                published_str
-            ) if published_str else timezone.now()
-        except (TypeError, ValueError):
-            published_at = timezone.now()
-
-        source_info = article_data.get("source", {})
-        source_name = source_info.get("name") or "Unknown"
-        news_source = get_or_create_news_source(source_name)
-        content = article_data.get("content", "")
-        summary = article_data.get("description", "")
-        image_url = article_data.get("image")
-        topic = article_data.get("topic", "")  # GNews may include this
-
-        # Hybrid matching logic
-        category = get_category_from_topic(topic)
-        if not category:
-            category = get_category_from_keywords(title, summary, content)
-
-        if not category:
-            try:
-                category = Category.objects.get(name="General")
-            except Category.DoesNotExist:
-                logger.warning("Fallback category 'General' does not exist.")
-                category = None
-
-        _, article_created = Article.objects.get_or_create(
-            url=url_article,
-            defaults={
-                "title": title,
-                "content": content,
-                "summary": summary,
-                "image_url": image_url,
-                "published_at": published_at,
-                "source": news_source,
-                "category": category,
-                "imported": True,
-            }
-        )
-        if article_created:
-            created_count += 1
-
-        cached_articles.append({
-            "title": title,
-            "url": url_article,
-            "summary": summary,
-            "image_url": image_url,
-            "published_at": published_at.isoformat(),
-            "source": source_name,
-        })
-
-    cache_articles(cached_articles, source="gnews")
+        for article_data in result.articles:
+            feed_by_url.setdefault(
+                article_data.get("url"), result.source.cache_name
+            )
+        articles_data.extend(result.articles)
+
+    failed = [result for result in results if result.error]
+    if failed and len(failed) == len(results):
+        return f"Error fetching articles from news feeds: {failed[0].error}"
+
+    result = ingest_articles(articles_data)
+
+    cached_by_feed = {}
+    for article in result.cached_articles:
+        cached_by_feed.setdefault(
+            feed_by_url.get(article["url"], "gnews"), []
+        ).append(article)
+    for feed_name, cached_articles in cached_by_feed.items():
+        cache_articles(cached_articles, source=feed_name)
+    cache_articles(result.cached_articles, source=LATEST_FEED)
+    if result.created_count or result.updated:
+        bump_version()
+        bump_corpus_version()
+        schedule_autocomplete_refresh()
+
+    logger.info(
+        f"Ingestion batch: {result.created_count} created, "
+        f"{result.updated} updated, {result.skipped} skipped."
+    )
     message = (
         f"GNews articles fetched and stored successfully. "
-        f"{created_count} new articles created."
+        f"{result.created_count} new articles created."
     )
     logger.info(message)
     return message
@@ -239,6 +163,9 @@ def fetch_news_articles():
 
 def get_or_create_news_source(source_name):
     """Helper function to get or create a NewsSource object."""
+    news_source = news_source_lookup.get(name=source_name)
+    if news_source:
+        return news_source
     news_source, _ = NewsSource.objects.get_or_create(
         name=source_name,
         defaults={
@@ -250,6 +177,56 @@ def get_or_create_news_source(source_name):
     return news_source
 
 
+@shared_task
+def flush_article_views():
+    """
+    Write view counts buffered in Redis to Article.views.
+    """
+    try:
+        count = flush_views()
+    except redis.RedisError as e:
+        logger.warning(f"Could not flush article views: {e}")
+        return "Article views not flushed."
+    logger.info(f"Flushed {count} article views.")
+    return f"{count} article views flushed."
+
+
+@shared_task
+def reconcile_trending_articles():
+    """
+    Rebase and prune the Redis trending sets and rank new articles.
+    """
+    try:
+        count = reconcile_trending()
+    except redis.RedisError as e:
+        logger.warning(f"Could not reconcile trending articles: {e}")
+        return "Trending articles not reconciled."
+    logger.info(f"Reconciled {count} trending articles.")
+    return f"{count} trending articles reconciled."
+
+
+@shared_task
+def refresh_autocomplete_index():
+    """
+    Rebuild the search-as-you-type prefix index in Redis.
+    """
+    try:
+        count = rebuild_autocomplete_index()
+    except redis.RedisError as e:
+        logger.warning(f"Could not rebuild the autocomplete index: {e}")
+        return "Autocomplete index not rebuilt."
+    logger.info(f"Autocomplete index rebuilt with {count} entries.")
+    return f"{count} autocomplete entries indexed."
+
+
+def schedule_autocomplete_refresh():
+    """
+    Queue an index rebuild once the current transaction commits, so
+    ingestion and expiry do not wait on the index size.
+    """
+    transaction.on_commit(refresh_autocomplete_index.delay)
+
+
 @shared_task
 def redis_heartbeat():
     """
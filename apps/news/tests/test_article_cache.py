@@ -0,0 +1,87 @@
+"""
+Tests for the Redis sorted-set article cache and its read API.
+Located at: apps/news/tests/test_article_cache.py
+"""
+
+import pytest
+import redis
+from django.urls import reverse
+
+from apps.news.article_cache import (
+    LATEST_FEED, get_cached_articles, get_latest_articles
+)
+from apps.news.ingestion import ingest_articles
+from apps.news.models import Article
+from apps.news.tasks import cache_articles
+
+
+def make_payload(count):
+    return [
+        {
+            "title": f"Story {i}",
+            "url": f"https://example.com/story-{i}",
+            "source": {"name": "Wire"},
+            "description": f"Summary {i}",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_latest_articles_are_served_from_redis(
+    fake_redis, django_assert_num_queries
+):
+    result = ingest_articles(make_payload(3))
+    cache_articles(result.cached_articles, source=LATEST_FEED)
+
+    with django_assert_num_queries(0):
+        articles = get_latest_articles(limit=3)
+    assert {article.title for article in articles} == {
+        "Story 0", "Story 1", "Story 2"
+    }
+    assert articles[0].source.name == "Wire"
+    assert {article.pk for article in articles} == set(
+        Article.objects.values_list("pk", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_latest_articles_fall_back_to_database(fake_redis):
+    ingest_articles(make_payload(2))
+    assert get_cached_articles(5) == []
+    assert len(get_latest_articles(limit=5)) == 2
+
+
+@pytest.mark.django_db
+def test_latest_articles_fall_back_when_redis_is_down(monkeypatch):
+    class DownRedis:
+        def __getattr__(self, name):
+            raise redis.ConnectionError("down")
+
+    monkeypatch.setattr("apps.news.article_cache.redis_client", DownRedis())
+    ingest_articles(make_payload(1))
+    assert [a.title for a in get_latest_articles(limit=1)] == ["Story 0"]
+
+
+@pytest.mark.django_db
+def test_manual_articles_are_cached_and_deleted_ones_removed(
+    fake_redis, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        article = Article.objects.create(
+            title="Manual", url="https://example.com/manual", content="x"
+        )
+    assert [a.id for a in get_cached_articles(5)] == [article.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        article.delete()
+    assert get_cached_articles(5) == []
+
+
+@pytest.mark.django_db
+def test_homepage_renders_cached_latest_articles(client, fake_redis):
+    result = ingest_articles(make_payload(2))
+    cache_articles(result.cached_articles, source=LATEST_FEED)
+    response = client.get(reverse("news:homepage"))
+    assert response.status_code == 200
+    assert b"Story 1" in response.content
@@ -0,0 +1,114 @@
+"""
+Tests for search-as-you-type suggestions.
+Located at: apps/news/tests/test_autocomplete.py
+"""
+
+import pytest
+import redis
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news import autocomplete
+from apps.news.autocomplete import (
+    get_suggestions, index_terms, rebuild_autocomplete_index
+)
+from apps.news.models import Article, Category, NewsSource
+from apps.news.trending import GLOBAL_KEY
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def indexed(fake_redis):
+    Category.objects.create(name="Climate", slug="climate")
+    NewsSource.objects.create(name="Climate Wire", slug="climate-wire")
+    quiet = Article.objects.create(
+        title="Climate talks stall", url="https://example.com/1"
+    )
+    hot = Article.objects.create(
+        title="Heatwave: climate records fall", url="https://example.com/2"
+    )
+    Article.objects.create(title="Budget vote", url="https://example.com/3")
+    fake_redis.zadd(GLOBAL_KEY, {str(hot.id): 9.0, str(quiet.id): 1.0})
+    rebuild_autocomplete_index()
+    return quiet, hot
+
+
+def labels(suggestions):
+    return [suggestion["label"] for suggestion in suggestions]
+
+
+def test_index_terms_start_at_every_word():
+    assert list(index_terms("Heatwave: Climate records")) == [
+        "heatwave climate records", "climate records", "records"
+    ]
+
+
+def test_prefix_of_any_word_matches_ranked_by_trending(indexed):
+    with CaptureQueriesContext(connection) as ctx:
+        suggestions = get_suggestions("CLIM")
+    assert len(ctx.captured_queries) == 0
+    assert labels(suggestions) == [
+        "Climate", "Climate Wire",
+        "Heatwave: climate records fall", "Climate talks stall",
+    ]
+    assert labels(get_suggestions("climate talks")) == [
+        "Climate talks stall"
+    ]
+    assert get_suggestions("c") == []
+    assert get_suggestions("zebra") == []
+
+
+def test_trending_articles_beyond_the_candidate_range_rank_first(
+    indexed, fake_redis
+):
+    _, hot = indexed
+    Article.objects.bulk_create([
+        Article(
+            title=f"Climate alert {i}", slug=f"climate-alert-{i}",
+            url=f"https://example.com/a{i}",
+        )
+        for i in range(autocomplete.CANDIDATE_LIMIT)
+    ])
+    rebuild_autocomplete_index()
+    suggestions = get_suggestions("climate", limit=4)
+    assert labels(suggestions) == [
+        "Climate", "Climate Wire",
+        "Heatwave: climate records fall", "Climate talks stall",
+    ]
+    assert suggestions[2]["key"] == str(hot.id)
+
+
+def test_rebuild_drops_deleted_articles(indexed):
+    quiet, _ = indexed
+    quiet.delete()
+    rebuild_autocomplete_index()
+    assert "Climate talks stall" not in labels(get_suggestions("talks"))
+
+
+def test_falls_back_to_database_without_redis(monkeypatch):
+    Article.objects.create(title="Orbit change", url="https://example.com/1")
+
+    class BrokenRedis:
+        def __getattr__(self, name):
+            raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(autocomplete, "redis_client", BrokenRedis())
+    assert labels(get_suggestions("orbit")) == ["Orbit change"]
+
+
+def test_endpoint_returns_links(client, indexed):
+    _, hot = indexed
+    response = client.get(reverse("news:autocomplete"), {"q": "heat"})
+    assert response.json() == {"suggestions": [{
+        "type": "article",
+        "label": "Heatwave: climate records fall",
+        "url": hot.get_absolute_url(),
+    }]}
+    assert "max-age=60" in response["Cache-Control"]
+
+    response = client.get(reverse("news:autocomplete"), {"q": "climate w"})
+    assert response.json()["suggestions"][0]["url"] == (
+        reverse("news:search_results") + "?source=climate-wire"
+    )
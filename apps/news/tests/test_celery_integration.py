@@ -17,7 +17,7 @@ from apps.news.models import Article
 
 @pytest.mark.django_db
 @mock.patch("apps.news.tasks.redis_client")
-@mock.patch("apps.news.tasks.requests.get")
+@mock.patch("apps.news.sources.requests.Session.get")
 def test_fetch_news_articles_task(mock_get, mock_redis):
     # Setup mock API response
     mock_get.return_value.status_code = 200
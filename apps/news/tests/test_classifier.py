@@ -0,0 +1,117 @@
+"""
+Unit tests for the compiled keyword classifier.
+Located at: apps/news/tests/test_classifier.py
+"""
+
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+
+from apps.news.classifier import (
+    CLASSIFIER_VERSION_KEY, DEFAULT_KEYWORDS, KeywordClassifier,
+    get_classifier, reset_classifier
+)
+from apps.news.models import Category, CategoryKeyword
+
+
+@pytest.fixture
+def sports(db):
+    return Category.objects.create(name="Sports")
+
+
+@pytest.fixture
+def classifier():
+    return KeywordClassifier.from_mapping(DEFAULT_KEYWORDS)
+
+
+def test_acronyms_only_match_whole_upper_case_tokens(classifier):
+    assert classifier.classify("He said it was under review") is None
+    assert classifier.classify("The UN met today") == "World News"
+    assert classifier.classify("New AI rules") == "Technology"
+    assert classifier.classify("the un-named ai firm") is None
+
+
+def test_words_match_case_insensitively_with_plurals(classifier):
+    assert classifier.classify("Elections loom") == "Politics"
+    assert classifier.classify("Two MATCHES postponed.") == "Sports"
+    assert classifier.classify("A teammate scored") is None
+
+
+def test_highest_score_wins_and_ties_follow_priority(classifier):
+    text = "The team won the league match despite market jitters"
+    assert classifier.classify(text) == "Sports"
+    assert classifier.classify("market team") == "Business"
+    assert classifier.scores("market team market")["Business"] == 2
+
+
+def test_weights_and_phrases():
+    classifier = KeywordClassifier([
+        ("Sports", "goal", 1),
+        ("Business", "interest rates", 3),
+        ("World News", "Middle East", 1),
+    ])
+    text = "An early goal, then a goal, while interest rates held"
+    assert classifier.scores(text) == {"Sports": 2, "Business": 3}
+    assert classifier.classify(text) == "Business"
+    assert classifier.classify("Talks in the Middle East") == "World News"
+    assert classifier.classify("in the middle eastern") is None
+
+
+def test_classify_many_keeps_order(classifier):
+    assert classifier.classify_many(
+        ["film premiere", "", "nothing here", "stock slump"]
+    ) == ["Entertainment", None, None, "Business"]
+
+
+@pytest.mark.django_db
+def test_get_classifier_uses_database_keywords_and_rebuilds_on_change(
+    sports
+):
+    CategoryKeyword.objects.all().delete()
+    reset_classifier()
+    assert get_classifier().classify("A new film") == "Entertainment"
+
+    keyword = CategoryKeyword.objects.create(
+        category=sports, keyword="cricket", weight=2
+    )
+    assert get_classifier().classify("A cricket film") == "Sports"
+    assert get_classifier().classify("A new film") is None
+
+    # Renaming the category renames what the classifier returns
+    sports.name = "Cricket"
+    sports.save()
+    assert get_classifier().classify("A cricket film") == "Cricket"
+
+    keyword.delete()
+    assert get_classifier().classify("A new film") == "Entertainment"
+    reset_classifier()
+
+
+@pytest.mark.django_db
+@override_settings(LOOKUP_CACHE_CHECK_INTERVAL=0)
+def test_keyword_change_in_another_process_rebuilds_classifier():
+    CategoryKeyword.objects.all().delete()
+    cricket = Category.objects.create(name="Cricket")
+    with mock.patch("apps.news.classifier.redis_client") as mock_redis:
+        mock_redis.get.return_value = "1"
+        reset_classifier()
+        assert get_classifier().classify("A cricket match") == "Sports"
+
+        # Another process edits the keywords and bumps the version
+        CategoryKeyword.objects.bulk_create([
+            CategoryKeyword(category=cricket, keyword="cricket")
+        ])
+        assert get_classifier().classify("A cricket match") == "Sports"
+        mock_redis.get.return_value = "2"
+        assert get_classifier().classify("A cricket match") == "Cricket"
+    reset_classifier()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_keyword_save_bumps_shared_version(fake_redis):
+    sports = Category.objects.create(name="Sports")
+    version = int(fake_redis.get(CLASSIFIER_VERSION_KEY) or 0)
+    CategoryKeyword.objects.create(category=sports, keyword="cricket")
+    assert int(fake_redis.get(CLASSIFIER_VERSION_KEY)) == version + 1
+    reset_classifier()
@@ -0,0 +1,94 @@
+"""
+Tests for the single-query comment tree loader.
+Located at: apps/news/tests/test_comment_tree.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news.comment_tree import DOWNVOTE, UPVOTE, load_comment_tree
+from apps.news.models import Article
+from apps.users.models import Comment
+
+
+@pytest.fixture
+def article(db):
+    return Article.objects.create(
+        title="Story", url="https://example.com/story", content="x"
+    )
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="reader", password="pw")
+
+
+def make_thread(article, user, depth, name):
+    parent = None
+    for level in range(depth):
+        parent = Comment.objects.create(
+            article=article, user=user, content=f"{name} {level}",
+            parent=parent,
+        )
+    return parent
+
+
+def test_tree_nests_replies_and_counts_votes(
+    article, user, django_assert_num_queries
+):
+    other = User.objects.create_user(username="other", password="pw")
+    root = Comment.objects.create(article=article, user=user, content="Hi")
+    reply = Comment.objects.create(
+        article=article, user=other, content="Re", parent=root
+    )
+    root.upvote(user)
+    root.upvote(other)
+    reply.downvote(user)
+
+    with django_assert_num_queries(2):
+        tree = load_comment_tree(article, user)
+
+    assert tree.total == 2
+    [loaded_root] = tree.roots
+    assert loaded_root.upvote_count == 2
+    assert loaded_root.user_vote == UPVOTE
+    [loaded_reply] = loaded_root.children
+    assert loaded_reply.downvote_count == 1
+    assert loaded_reply.user_vote == DOWNVOTE
+
+
+def test_tree_sorts_roots_and_collapses_repeated_posts(article, user):
+    first = Comment.objects.create(article=article, user=user, content="A")
+    Comment.objects.create(article=article, user=user, content="A")
+    popular = Comment.objects.create(article=article, user=user, content="B")
+    popular.upvote(user)
+
+    newest = load_comment_tree(article, sort_order="newest").roots
+    assert [c.content for c in newest] == ["B", "A"]
+    assert first.id not in [c.id for c in newest]
+    oldest = load_comment_tree(article, sort_order="oldest").roots
+    assert [c.content for c in oldest] == ["A", "B"]
+    upvoted = load_comment_tree(article, sort_order="most_upvoted").roots
+    assert upvoted[0] == popular
+
+
+def test_article_detail_query_count_is_independent_of_depth(
+    client, article, user
+):
+    url = reverse("news:article_detail", args=[article.id])
+    client.force_login(user)
+    make_thread(article, user, depth=2, name="Short")
+    client.get(url)
+    with CaptureQueriesContext(connection) as shallow:
+        response = client.get(url)
+    assert response.context["comment_count"] == 2
+
+    make_thread(article, user, depth=15, name="Deep")
+    with CaptureQueriesContext(connection) as deep:
+        response = client.get(url)
+    assert response.context["comment_count"] == 17
+    assert len(deep.captured_queries) == len(shallow.captured_queries)
+    assert b"Deep 14" in response.content
@@ -0,0 +1,164 @@
+"""
+Tests for the denormalised engagement counters and rebuild_counters.
+Located at: apps/news/tests/test_counters.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news.counters import rebuild_counters, verify_counters
+from apps.news.models import Article
+from apps.users.models import Comment
+
+
+@pytest.fixture
+def article(db):
+    return Article.objects.create(
+        title="Story", url="https://example.com/story", content="x"
+    )
+
+
+@pytest.fixture
+def users(db):
+    return [
+        User.objects.create_user(username=f"reader{i}", password="pw")
+        for i in range(3)
+    ]
+
+
+def test_likes_and_saves_are_counted_from_either_side(article, users):
+    article.likes.add(*users)
+    users[0].saved_articles.add(article)
+    article.refresh_from_db()
+    assert (article.like_count, article.save_count) == (3, 1)
+
+    # Removing a user who never liked the article changes nothing
+    article.likes.remove(users[0])
+    users[0].liked_articles.remove(article)
+    users[1].liked_articles.clear()
+    article.saves.clear()
+    article.refresh_from_db()
+    assert (article.like_count, article.save_count) == (1, 0)
+
+
+def test_stale_instance_save_does_not_overwrite_counters(article, users):
+    stale = Article.objects.get(pk=article.pk)
+    article.likes.add(users[0])
+    stale.title = "Edited"
+    stale.save()
+    article.refresh_from_db()
+    assert article.title == "Edited"
+    assert article.like_count == 1
+
+
+def test_comment_counts_and_votes(article, users):
+    comment = Comment.objects.create(
+        article=article, user=users[0], content="Hi"
+    )
+    Comment.objects.create(
+        article=article, user=users[1], content="Re", parent=comment
+    )
+    comment.upvote(users[0])
+    comment.upvote(users[1])
+    comment.downvote(users[2])
+    comment.refresh_from_db()
+    article.refresh_from_db()
+    assert article.comment_count == 2
+    assert (comment.upvote_count, comment.downvote_count) == (2, 1)
+    assert comment.score == 1
+
+    # Soft-deleted comments stay in the thread and in the count
+    comment.delete()
+    comment.refresh_from_db()
+    article.refresh_from_db()
+    assert (comment.upvote_count, comment.downvote_count) == (0, 0)
+    assert comment.score == 0
+    assert article.comment_count == 2
+
+    # A hard delete keeps the reply (parent is SET_NULL)
+    Comment.objects.filter(pk=comment.pk).delete()
+    article.refresh_from_db()
+    assert article.comment_count == 1
+
+
+def test_deleting_a_user_releases_their_counters(article, users):
+    comment = Comment.objects.create(
+        article=article, user=users[1], content="Hi"
+    )
+    article.likes.add(users[0], users[1])
+    article.saves.add(users[0])
+    comment.upvote(users[0])
+    users[0].delete()
+
+    article.refresh_from_db()
+    comment.refresh_from_db()
+    assert (article.like_count, article.save_count) == (1, 0)
+    assert comment.upvote_count == 0
+    assert not any(verify_counters().values())
+
+
+def test_toggle_endpoints_return_stored_counts(client, article, users):
+    client.force_login(users[0])
+    response = client.post(reverse("news:toggle_like", args=[article.id]))
+    assert response.json()["likes_count"] == 1
+    response = client.post(reverse("news:toggle_like", args=[article.id]))
+    assert response.json()["likes_count"] == 0
+
+    comment = Comment.objects.create(
+        article=article, user=users[1], content="Hi"
+    )
+    response = client.post(
+        reverse("news:vote_comment", args=[comment.id, "downvote"])
+    )
+    assert response.json()["downvotes"] == 1
+    response = client.post(
+        reverse("news:vote_comment", args=[comment.id, "upvote"])
+    )
+    assert response.json() == {
+        "success": True, "upvotes": 1, "downvotes": 0, "score": 1
+    }
+
+
+def test_homepage_query_count_does_not_grow_with_articles(client, users):
+    def render_homepage():
+        cache.clear()  # rebuild the homepage fragments every time
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(reverse("news:homepage"))
+        return len(ctx.captured_queries)
+
+    for i in range(2):
+        Article.objects.create(
+            title=f"A{i}", url=f"https://example.com/a{i}", content="x"
+        ).likes.add(users[0])
+    few = render_homepage()
+    for i in range(2, 10):
+        Article.objects.create(
+            title=f"A{i}", url=f"https://example.com/a{i}", content="x"
+        ).likes.add(users[0])
+    assert render_homepage() == few
+
+
+def test_rebuild_and_verify_counters(article, users):
+    comment = Comment.objects.create(
+        article=article, user=users[0], content="Hi"
+    )
+    article.likes.add(users[0])
+    comment.downvote(users[1])
+    Article.objects.update(like_count=7, comment_count=0)
+    Comment.objects.update(downvote_count=0, score=3)
+
+    assert verify_counters()["news.Article.like_count"] == 1
+    with pytest.raises(CommandError):
+        call_command("rebuild_counters", "--verify")
+
+    assert rebuild_counters(batch_size=1)["news.Article.like_count"] == 1
+    article.refresh_from_db()
+    comment.refresh_from_db()
+    assert (article.like_count, article.comment_count) == (1, 1)
+    assert (comment.downvote_count, comment.score) == (1, -1)
+    call_command("rebuild_counters", "--verify")
@@ -0,0 +1,208 @@
+"""
+Tests for the single-statement like and save toggles.
+Located at: apps/news/tests/test_engagement.py
+"""
+
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import AnonymousUser, User
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news.counters import verify_counters
+from apps.news.engagement import (
+    LIKE, SAVE, add_engagement, apply_engagement_state,
+    get_engagement_state, remove_engagement, toggle_engagement
+)
+from apps.news.models import Article
+from apps.news.trending import GLOBAL_KEY
+from apps.users.models import Comment
+
+
+@pytest.fixture
+def article(db):
+    return Article.objects.create(
+        title="Story", url="https://example.com/story", content="x"
+    )
+
+
+@pytest.fixture
+def users(db):
+    return [
+        User.objects.create_user(username=f"reader{i}", password="pw")
+        for i in range(3)
+    ]
+
+
+def test_toggle_flips_state_and_counter(article, users):
+    assert toggle_engagement(LIKE, article.id, users[0].id) == (True, 1)
+    assert toggle_engagement(LIKE, article.id, users[1].id) == (True, 2)
+    assert toggle_engagement(SAVE, article.id, users[0].id) == (True, 1)
+    assert toggle_engagement(LIKE, article.id, users[0].id) == (False, 1)
+    assert list(article.likes.all()) == [users[1]]
+    assert not any(verify_counters().values())
+
+
+def test_add_and_remove_only_count_real_changes(article, users):
+    assert add_engagement(SAVE, article.id, users[0].id)
+    assert not add_engagement(SAVE, article.id, users[0].id)
+    assert remove_engagement(SAVE, article.id, users[0].id)
+    assert not remove_engagement(SAVE, article.id, users[0].id)
+    article.refresh_from_db()
+    assert article.save_count == 0
+
+
+def test_toggle_never_loads_the_relation(article, users):
+    article.likes.add(*users[1:])
+    through = connection.ops.quote_name(Article.likes.through._meta.db_table)
+    with CaptureQueriesContext(connection) as ctx:
+        toggle_engagement(LIKE, article.id, users[0].id)
+    selects = [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT")
+    ]
+    assert not any(through in sql for sql in selects)
+    assert len(selects) == 1
+
+
+def test_missing_article_is_rolled_back(client, users):
+    client.force_login(users[0])
+    response = client.post(reverse("news:toggle_like", args=[999]))
+    assert response.status_code == 404
+    assert not Article.likes.through.objects.exists()
+
+
+def test_toggles_update_trending_on_commit(
+    article, users, fake_redis, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        toggle_engagement(LIKE, article.id, users[0].id)
+    assert fake_redis.zscore(GLOBAL_KEY, str(article.id)) > 0
+
+
+def test_remove_endpoint_reports_missing_engagement(client, article, users):
+    client.force_login(users[0])
+    response = client.post(
+        reverse("users:remove_saved_article"), {"id": article.id},
+        HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+    )
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def page(db):
+    return [
+        Article.objects.create(
+            title=f"Card {i}", url=f"https://example.com/card-{i}",
+            content="x",
+        )
+        for i in range(20)
+    ]
+
+
+def test_state_takes_one_query_per_relation(page, users):
+    reader = users[0]
+    page[0].likes.add(reader)
+    page[1].saves.add(reader)
+    Comment.objects.create(article=page[2], user=reader, content="Hi")
+    Comment.objects.create(article=page[3], user=users[1], content="Hi")
+
+    with CaptureQueriesContext(connection) as ctx:
+        state = get_engagement_state(reader.id, [a.id for a in page])
+    assert len(ctx.captured_queries) == 3
+    assert state[page[0].id] == {
+        "liked": True, "saved": False, "commented": False
+    }
+    assert state[page[1].id]["saved"]
+    assert state[page[2].id]["commented"]
+    assert not any(state[page[3].id].values())
+
+
+def test_cached_likes_and_saves_leave_one_query(page, users, fake_redis):
+    ids = [a.id for a in page]
+    page[0].likes.add(users[0])
+    get_engagement_state(users[0].id, ids)
+    with CaptureQueriesContext(connection) as ctx:
+        state = get_engagement_state(users[0].id, ids)
+    assert len(ctx.captured_queries) == 1
+    assert state[page[0].id]["liked"]
+
+
+def test_anonymous_visitors_get_no_state_and_no_query(page):
+    with CaptureQueriesContext(connection) as ctx:
+        articles = apply_engagement_state(AnonymousUser(), page)
+    assert len(ctx.captured_queries) == 0
+    assert not any(a.liked or a.saved or a.commented for a in articles)
+
+
+def test_state_endpoint(client, page, users):
+    page[0].likes.add(users[0])
+    client.force_login(users[0])
+    response = client.get(
+        reverse("news:engagement_state"),
+        {"ids": f"{page[0].id},{page[1].id},nope"},
+    )
+    assert response.json() == {"articles": {
+        str(page[0].id): {"liked": True, "saved": False, "commented": False},
+        str(page[1].id): {"liked": False, "saved": False, "commented": False},
+    }}
+
+
+def test_search_results_mark_the_users_cards(client, page, users):
+    page[-1].likes.add(users[0])
+    client.force_login(users[0])
+    response = client.get(reverse("news:search_results"))
+    assert response.content.decode().count('class="like-btn me-3 active"') == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_toggles_keep_the_counter_exact():
+    article = Article.objects.create(
+        title="Viral", url="https://example.com/viral", content="x"
+    )
+    users = [
+        User.objects.create_user(username=f"fan{i}", password="pw")
+        for i in range(4)
+    ]
+    toggles_per_thread = 25
+    start = threading.Barrier(len(users) * 2)
+    errors = []
+
+    def toggle(user):
+        # SQLite allows one writer at a time and fails the others
+        # instead of blocking like PostgreSQL's row locks; retry them
+        while True:
+            try:
+                return toggle_engagement(LIKE, article.id, user.id)
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                time.sleep(0.001)
+
+    def clicker(user):
+        start.wait()
+        try:
+            for _ in range(toggles_per_thread):
+                toggle(user)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    # Two threads per user, so the same like is toggled concurrently
+    threads = [
+        threading.Thread(target=clicker, args=(user,))
+        for user in users for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    article.refresh_from_db()
+    assert article.like_count == article.likes.count()
+    assert not any(verify_counters().values())
@@ -0,0 +1,110 @@
+"""
+Tests for the versioned homepage fragment cache.
+Located at: apps/news/tests/test_fragments.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news import fragments
+from apps.news.fragments import (
+    bump_version, cached_fragment, get_fragment_key, get_version
+)
+from apps.news.models import Article, Category
+
+
+class Builder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"<p>build {self.calls}</p>"
+
+
+def test_fresh_fragment_is_served_from_cache():
+    build = Builder()
+    assert cached_fragment("test", build) == "<p>build 1</p>"
+    assert cached_fragment("test", build) == "<p>build 1</p>"
+    assert build.calls == 1
+
+
+def test_version_bump_rebuilds():
+    build = Builder()
+    cached_fragment("test", build)
+    version = get_version()
+    bump_version()
+    assert get_version() == version + 1
+    assert cached_fragment("test", build) == "<p>build 2</p>"
+
+
+def test_expired_fragment_rebuilds_after_ttl(monkeypatch, settings):
+    settings.HOMEPAGE_FRAGMENT_TTL = 60
+    build = Builder()
+    now = 1_000_000.0
+    monkeypatch.setattr(fragments.time, "time", lambda: now)
+    cached_fragment("test", build)
+    now += 61
+    assert cached_fragment("test", build) == "<p>build 2</p>"
+
+
+def test_stale_fragment_is_served_while_another_worker_rebuilds():
+    build = Builder()
+    cached_fragment("test", build)
+    bump_version()
+    # Another worker holds the rebuild lock
+    cache.add(f"{get_fragment_key('test')}:lock", 1)
+    assert cached_fragment("test", build) == "<p>build 1</p>"
+    assert build.calls == 1
+
+    cache.delete(f"{get_fragment_key('test')}:lock")
+    assert cached_fragment("test", build) == "<p>build 2</p>"
+
+
+def test_failed_build_releases_the_lock():
+    def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cached_fragment("test", broken)
+    assert cache.get(f"{get_fragment_key('test')}:lock") is None
+
+
+@pytest.mark.django_db
+def test_homepage_sections_are_cached_and_expired_by_new_articles(
+    client, fake_redis, django_capture_on_commit_callbacks
+):
+    url = reverse("news:homepage")
+    client.get(url)
+    with CaptureQueriesContext(connection) as cached:
+        response = client.get(url)
+    assert len(cached.captured_queries) == 0
+    assert b"No latest articles available." in response.content
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Article.objects.create(
+            title="Fresh story", url="https://example.com/fresh",
+            content="x",
+        )
+    response = client.get(url)
+    assert b"Fresh story" in response.content
+
+
+@pytest.mark.django_db
+def test_picked_sections_are_cached_per_user_and_categories(
+    client, fake_redis
+):
+    user = User.objects.create_user(username="reader", password="pw")
+    science = Category.objects.create(name="Science")
+    sport = Category.objects.create(name="Sport")
+    user.profile.preferred_categories.set([science])
+    client.force_login(user)
+
+    url = reverse("news:homepage")
+    assert b"Latest in Science" in client.get(url).content
+    user.profile.preferred_categories.add(sport)
+    assert b"Latest in Sport" in client.get(url).content
@@ -0,0 +1,107 @@
+"""
+Unit tests for the batched ingestion pipeline.
+Located at: apps/news/tests/test_ingestion.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from apps.news.models import Article, Category, NewsSource
+from apps.news.ingestion import ingest_articles, normalise_articles
+from apps.users.models import Notification
+
+
+def make_payload(count, prefix="story"):
+    return [
+        {
+            "title": f"Market story {i}",
+            "url": f"https://example.com/{prefix}-{i}",
+            "publishedAt": "2024-01-01T00:00:00Z",
+            "source": {"name": f"Source {i % 3}"},
+            "content": "The market rallied today.",
+            "description": "Stocks up",
+            "image": None,
+        }
+        for i in range(count)
+    ]
+
+
+def test_normalise_articles_skips_invalid_and_duplicate_items():
+    payload = make_payload(2) + [
+        {"title": "", "url": "https://example.com/no-title"},
+        {"title": "Dup", "url": "https://example.com/story-0"},
+    ]
+    records, skipped = normalise_articles(payload)
+    assert [r["url"] for r in records] == [
+        "https://example.com/story-0", "https://example.com/story-1"
+    ]
+    assert skipped == 2
+
+
+@pytest.mark.django_db
+def test_ingest_articles_creates_sources_categories_and_unique_slugs():
+    Category.objects.create(name="Business", slug="business")
+    Article.objects.create(
+        title="Market story 0", url="https://example.com/manual",
+        content="Existing"
+    )
+
+    result = ingest_articles(make_payload(3))
+
+    assert result.created_count == 3
+    assert NewsSource.objects.count() == 3
+    slugs = set(Article.objects.values_list("slug", flat=True))
+    assert len(slugs) == 4
+    assert "market-story-0-1" in slugs
+    assert all(
+        article.category.name == "Business"
+        for article in Article.objects.filter(imported=True)
+    )
+
+
+@pytest.mark.django_db
+def test_ingest_articles_skips_existing_urls():
+    ingest_articles(make_payload(2))
+    result = ingest_articles(make_payload(3))
+
+    assert result.created_count == 1
+    assert result.skipped == 2
+    assert result.updated == 0
+    assert len(result.cached_articles) == 3
+
+
+@pytest.mark.django_db
+def test_ingest_articles_updates_existing_when_requested():
+    ingest_articles(make_payload(1))
+    payload = make_payload(1)
+    payload[0]["description"] = "Revised summary"
+
+    result = ingest_articles(payload, update_existing=True)
+
+    assert result.updated == 1
+    assert Article.objects.get().summary == "Revised summary"
+
+
+@pytest.mark.django_db
+def test_ingest_articles_query_count_is_independent_of_batch_size(
+    django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(12):
+        ingest_articles(make_payload(50))
+    assert Article.objects.count() == 50
+
+
+@pytest.mark.django_db
+def test_ingest_articles_notifies_followers_once_per_created_row(
+    django_capture_on_commit_callbacks
+):
+    category = Category.objects.create(name="Business", slug="business")
+    user = User.objects.create_user(username="follower", password="pw")
+    user.profile.preferred_categories.add(category)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ingest_articles(make_payload(2))
+        ingest_articles(make_payload(2))
+
+    # Both new articles, coalesced into one digest
+    digest = Notification.objects.get(user=user)
+    assert digest.article_count == 2
@@ -0,0 +1,88 @@
+"""
+Tests for the per-process Category and NewsSource lookup caches.
+Located at: apps/news/tests/test_lookups.py
+"""
+
+from unittest import mock
+
+import pytest
+import redis
+from django.test import override_settings
+
+from apps.news.lookups import LookupCache, category_lookup
+from apps.news.models import Category, NewsSource
+
+
+@pytest.fixture
+def no_redis():
+    with mock.patch("apps.news.lookups.redis_client") as mock_redis:
+        mock_redis.get.side_effect = redis.ConnectionError("down")
+        mock_redis.incr.side_effect = redis.ConnectionError("down")
+        yield mock_redis
+
+
+@pytest.mark.django_db
+def test_get_caches_by_id_slug_and_name(
+    no_redis, django_assert_num_queries
+):
+    category = Category.objects.create(name="Sports", slug="sports")
+    with django_assert_num_queries(1):
+        assert category_lookup.get(slug="sports") == category
+    with django_assert_num_queries(0):
+        assert category_lookup.get(name="Sports") == category
+        assert category_lookup.get(id=category.id) == category
+        assert category_lookup.get(pk=category.id) == category
+    assert category_lookup.get(slug="missing") is None
+
+
+@pytest.mark.django_db
+def test_save_and_delete_invalidate_local_entries(no_redis):
+    category = Category.objects.create(name="Sports", slug="sports")
+    assert [c.name for c in category_lookup.all()] == ["Sports"]
+
+    category.name = "Sport"
+    category.save()
+    assert category_lookup.get(slug="sports").name == "Sport"
+
+    category.delete()
+    assert category_lookup.get(slug="sports") is None
+    assert category_lookup.all() == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_commit_bumps_shared_version(no_redis):
+    no_redis.incr.side_effect = None
+    no_redis.incr.return_value = 3
+    Category.objects.create(name="Sports", slug="sports")
+    no_redis.incr.assert_called_with("lookups:news.category:version")
+
+
+@pytest.mark.django_db
+@override_settings(LOOKUP_CACHE_CHECK_INTERVAL=0)
+def test_version_bump_from_another_process_clears_entries():
+    Category.objects.create(name="Sports", slug="sports")
+    with mock.patch("apps.news.lookups.redis_client") as mock_redis:
+        mock_redis.get.return_value = "1"
+        category_lookup.get(slug="sports")
+
+        # Another worker renames the row and bumps the version
+        Category.objects.filter(slug="sports").update(name="Sport")
+        assert category_lookup.get(slug="sports").name == "Sports"
+        mock_redis.get.return_value = "2"
+        assert category_lookup.get(slug="sports").name == "Sport"
+
+
+@pytest.mark.django_db
+def test_get_many_fetches_misses_in_one_query_and_stays_bounded(
+    no_redis, django_assert_num_queries
+):
+    NewsSource.objects.bulk_create([
+        NewsSource(name=f"Source {i}", slug=f"source-{i}") for i in range(6)
+    ])
+    lookup = LookupCache(NewsSource, max_size=6)
+    with django_assert_num_queries(1):
+        found = lookup.get_many("name", [f"Source {i}" for i in range(6)])
+    assert len(found) == 6
+    assert len(lookup._entries) <= 6
+    with django_assert_num_queries(0):
+        assert lookup.get(name="Source 5").slug == "source-5"
@@ -0,0 +1,207 @@
+"""
+Tests for keyset pagination of article search.
+Located at: apps/news/tests/test_pagination.py
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, FloatField, Value, When
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.news.models import Article, Category
+from apps.news.pagination import (
+    COUNT_CACHED, KeysetPaginator, decode_cursor, encode_cursor
+)
+from apps.news.search import annotate_rank_key, full_text_search
+
+pytestmark = pytest.mark.django_db
+
+
+def make_articles(count, prefix="a", **fields):
+    return [
+        Article.objects.create(
+            title=f"Article {n}", url=f"https://example.com/{prefix}{n}",
+            **fields
+        )
+        for n in range(count)
+    ]
+
+
+def walk(paginator):
+    """Follow next cursors to the end, then previous cursors back."""
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+    backwards = [pages[-1]]
+    while backwards[-1].has_previous():
+        backwards.append(
+            paginator.get_page(backwards[-1].previous_cursor)
+        )
+    return (
+        [list(page) for page in pages],
+        [list(page) for page in reversed(backwards)],
+    )
+
+
+def test_cursor_round_trip_keeps_microseconds():
+    moment = timezone.now().replace(microsecond=123456)
+    direction, values = decode_cursor(encode_cursor("n", [moment, 7]))
+    assert direction == "n"
+    assert values == [moment.isoformat(), 7]
+    assert decode_cursor("not-a-cursor!") is None
+    assert decode_cursor("") is None
+
+
+def test_pages_are_stable_with_duplicate_timestamps():
+    articles = make_articles(7)
+    Article.objects.update(published_at=timezone.now())
+    paginator = KeysetPaginator(
+        Article.objects.all(), 3, ["-published_at", "-id"]
+    )
+    forward, backward = walk(paginator)
+    expected = sorted(articles, key=lambda a: -a.id)
+    assert [len(page) for page in forward] == [3, 3, 1]
+    assert sum(forward, []) == expected
+    assert backward == forward
+
+
+def test_new_articles_do_not_shift_later_pages():
+    make_articles(6)
+    paginator = KeysetPaginator(Article.objects.all(), 3, ["-id"])
+    first = paginator.get_page()
+    second = list(paginator.get_page(first.next_cursor))
+    make_articles(2, prefix="late")
+    assert list(paginator.get_page(first.next_cursor)) == second
+
+
+def test_nullable_sort_names_are_coalesced(client):
+    sport = Category.objects.create(name="Sport", slug="sport")
+    make_articles(3, prefix="sport", category=sport)
+    make_articles(4)
+    seen = []
+    params = {"sort": "category"}
+    while True:
+        response = client.get(reverse("news:search_results"), params)
+        page = response.context["page_obj"]
+        seen.extend(page)
+        if not page.has_next():
+            break
+        params["cursor"] = page.next_cursor
+    assert len(seen) == len(set(seen)) == 7
+    assert [a.category_id for a in seen[-3:]] == [sport.id] * 3
+
+
+def test_relevance_ordering_paginates():
+    for n in range(5):
+        Article.objects.create(
+            title="Telescope" if n % 2 else "Budget",
+            url=f"https://example.com/{n}",
+            content="telescope " * (n + 1),
+        )
+    queryset = full_text_search(Article.objects.all(), "telescope")
+    paginator = KeysetPaginator(
+        queryset, 2, ["-search_rank_key", "-published_at", "-id"]
+    )
+    forward, backward = walk(paginator)
+    assert sum(forward, []) == list(
+        queryset.order_by("-search_rank", "-published_at", "-id")
+    )
+    assert backward == forward
+
+
+def test_tied_and_inexact_ranks_page_without_gaps():
+    articles = make_articles(8)
+    Article.objects.update(published_at=timezone.now())
+    # Ties, and floats with no exact binary or float4 representation
+    ranks = [0.1 + 0.2, 0.3, 1 / 3, 1 / 3, 0.1, 0.1, 2 / 3, 0.30000001]
+    queryset = annotate_rank_key(Article.objects.annotate(
+        search_rank=Case(
+            *(When(pk=a.pk, then=Value(r)) for a, r in zip(articles, ranks)),
+            output_field=FloatField(),
+        )
+    ))
+    paginator = KeysetPaginator(
+        queryset, 3, ["-search_rank_key", "-published_at", "-id"]
+    )
+    forward, backward = walk(paginator)
+    seen = sum(forward, [])
+    assert len(seen) == len(set(seen)) == 8
+    keys = [a.search_rank_key for a in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert seen[0] == articles[6]
+    assert backward == forward
+
+
+def test_tampered_cursor_falls_back_to_first_page():
+    make_articles(4)
+    paginator = KeysetPaginator(
+        Article.objects.all(), 2, ["-published_at", "-id"]
+    )
+    first = list(paginator.get_page())
+    bad_values = encode_cursor("n", ["yesterday", "x"])
+    wrong_length = encode_cursor("n", [1])
+    for cursor in (bad_values, wrong_length, "%%%"):
+        page = paginator.get_page(cursor)
+        assert list(page) == first
+        assert not page.has_previous()
+
+
+def test_deep_pages_do_not_use_offset():
+    make_articles(10)
+    paginator = KeysetPaginator(Article.objects.all(), 2, ["-id"])
+    page = paginator.get_page()
+    for _ in range(3):
+        page = paginator.get_page(page.next_cursor)
+    with CaptureQueriesContext(connection) as ctx:
+        paginator.get_page(page.next_cursor)
+    assert len(ctx.captured_queries) == 1
+    assert "OFFSET" not in ctx.captured_queries[0]["sql"].upper()
+
+
+def test_cached_count_skips_repeat_count_queries():
+    cache.clear()
+    make_articles(3)
+    queryset = Article.objects.filter(
+        published_at__gte=timezone.now() - timedelta(days=1)
+    )
+    assert KeysetPaginator(queryset, 2, ["-id"], COUNT_CACHED).count == 3
+    make_articles(1, prefix="new")
+    with CaptureQueriesContext(connection) as ctx:
+        paginator = KeysetPaginator(queryset, 2, ["-id"], COUNT_CACHED)
+        assert paginator.count == 3
+    assert len(ctx.captured_queries) == 0
+    assert paginator.count_is_estimate is False
+
+
+def test_search_page_links_use_cursors(client):
+    make_articles(12)
+    response = client.get(reverse("news:search_results"), {"q": "Article"})
+    page = response.context["page_obj"]
+    assert page.has_next() and not page.has_previous()
+    html = response.content.decode()
+    assert f"?cursor={page.next_cursor}&amp;q=Article" in html
+    assert "page=" not in html
+
+
+def test_search_page_links_encode_the_query(client):
+    sport = Category.objects.create(name="Sport", slug="sport")
+    for n in range(12):
+        Article.objects.create(
+            title=f"Rock & Roll #{n} C++", url=f"https://example.com/r{n}",
+            category=sport,
+        )
+    query = "rock & roll c++"
+    response = client.get(reverse("news:search_results"), {"q": query})
+    page = response.context["page_obj"]
+    assert page.has_next()
+    html = response.content.decode()
+    encoded = "q=rock%20%26%20roll%20c%2B%2B"
+    # Facet, sort and pagination links all carry the whole query
+    assert html.count(encoded) >= 1 + len(response.context["options"]) + 1
+    assert "q=rock & roll" not in html
+    assert "q=rock &amp; roll" not in html
@@ -0,0 +1,84 @@
+"""
+Tests for the windowed personalised homepage sections.
+Located at: apps/news/tests/test_personalized.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news.models import Article, Category
+from apps.news.personalized import build_category_sections
+from apps.news.utils import top_per_category
+
+
+def make_categories(count, start=0):
+    categories = []
+    for n in range(start, start + count):
+        category = Category.objects.create(name=f"Category {n}")
+        for i in range(3):
+            Article.objects.create(
+                title=f"C{n} story {i}", url=f"https://example.com/{n}/{i}",
+                content="x", category=category,
+            )
+        categories.append(category)
+    return categories
+
+
+@pytest.mark.django_db
+def test_top_per_category_uses_one_query(django_assert_num_queries):
+    first, second = make_categories(2)
+    with django_assert_num_queries(1):
+        latest = top_per_category([first.id, second.id], "-published_at", 2)
+    assert [a.title for a in latest[first.id]] == [
+        "C0 story 2", "C0 story 1"
+    ]
+    assert [a.title for a in latest[second.id]] == [
+        "C1 story 2", "C1 story 1"
+    ]
+
+
+@pytest.mark.django_db
+def test_sections_are_chunked_for_the_carousels(fake_redis):
+    [category] = make_categories(1)
+    sections = build_category_sections([category], {}, chunk_size=2)
+    latest = sections[category]["latest"]
+    assert [len(chunk) for chunk in latest["chunks"]] == [2, 1]
+    assert latest["carousel_id"] == "catLatestCarousel-category-0"
+    assert sections[category]["trending"]["chunks"] == []
+
+
+@pytest.mark.django_db
+def test_homepage_queries_do_not_grow_with_categories(client, fake_redis):
+    user = User.objects.create_user(username="reader", password="pw")
+    client.force_login(user)
+    url = reverse("news:homepage")
+
+    def render_homepage():
+        cache.clear()  # rebuild the homepage fragments every time
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        return response, len(ctx.captured_queries)
+
+    user.profile.preferred_categories.set(make_categories(2))
+    render_homepage()  # fills the cached unread-notification counter
+    response, few = render_homepage()
+    assert len(response.context["picked_articles_by_category"]) == 2
+
+    user.profile.preferred_categories.add(*make_categories(6, start=2))
+    response, many = render_homepage()
+    assert len(response.context["picked_articles_by_category"]) == 8
+    assert many == few
+
+
+@pytest.mark.django_db
+def test_benchmark_command_rolls_back(capsys):
+    call_command(
+        "benchmark_homepage_sections", categories=3, articles=5, repeat=1
+    )
+    assert "Windowed:" in capsys.readouterr().out
+    assert not Category.objects.exists()
@@ -0,0 +1,112 @@
+"""
+Tests for full-text article search.
+Located at: apps/news/tests/test_search.py
+"""
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from apps.news.ingestion import ingest_articles
+from apps.news.models import Article
+from apps.news.search import (
+    ensure_sqlite_index, fts5_query, full_text_search
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def make_article(n, title, content="", summary=""):
+    return Article.objects.create(
+        title=title, url=f"https://example.com/{n}", content=content,
+        summary=summary,
+    )
+
+
+def search(query):
+    return list(
+        full_text_search(Article.objects.all(), query)
+        .order_by("-search_rank", "-published_at")
+    )
+
+
+def test_fts5_query_quotes_user_input():
+    assert fts5_query('climate "AND" OR (drought*') == (
+        '"climate" "AND" "OR" "drought"'
+    )
+    assert fts5_query("?!") == ""
+
+
+def test_title_matches_rank_above_body_matches():
+    body = make_article(1, "Local news", content="A telescope was built.")
+    title = make_article(2, "Telescope spots comet", content="Details.")
+    make_article(3, "Unrelated", content="Nothing here.")
+
+    assert search("telescope") == [title, body]
+    assert search("telescopes") == [title, body]  # stemmed
+    assert search("telescope comet") == [title]
+
+
+def test_index_follows_saves_updates_and_deletes():
+    article = make_article(1, "Budget vote")
+    article.title = "Senate debate"
+    article.save()
+    assert search("budget") == []
+    assert search("senate") == [article]
+
+    Article.objects.filter(pk=article.pk).update(summary="Harvest report")
+    assert search("harvest") == [article]
+    article.delete()
+    assert search("senate") == []
+
+
+def test_search_composes_as_a_subquery():
+    title = make_article(1, "Telescope spots comet")
+    body = make_article(2, "Local news", content="A telescope was built.")
+    make_article(3, "Unrelated")
+    ranked = full_text_search(Article.objects.all(), "telescope")
+    top = ranked.order_by("-search_rank_key").values("id")[:1]
+    assert list(Article.objects.filter(id__in=top)) == [title]
+    assert list(ranked.exclude(id=title.id)) == [body]
+    assert ranked.count() == 2
+
+
+def test_ingested_articles_are_searchable():
+    ingest_articles([{
+        "title": "Wildfire spreads",
+        "url": "https://example.com/wildfire",
+        "content": "Crews respond.",
+        "description": "Dry weather.",
+        "publishedAt": "2025-01-01T00:00:00Z",
+        "source": {"name": "Wire"},
+    }])
+    assert [a.title for a in search("wildfire")] == ["Wildfire spreads"]
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="SQLite FTS5 triggers"
+)
+def test_missing_sqlite_triggers_are_restored():
+    article = make_article(1, "Festival opens")
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER news_article_fts_update")
+    assert ensure_sqlite_index() is True
+    assert ensure_sqlite_index() is False
+    Article.objects.filter(pk=article.pk).update(title="Album launch")
+    assert search("album") == [article]
+
+
+def test_relevant_sort_uses_search_rank(client):
+    body = make_article(1, "Local news", content="A merger was agreed.")
+    title = make_article(2, "Merger agreed", content="Details.")
+    response = client.get(
+        reverse("news:search_results"), {"q": "merger", "sort": "relevant"}
+    )
+    assert list(response.context["articles"]) == [title, body]
+
+
+def test_benchmark_command_rolls_back(capsys):
+    call_command("benchmark_search", articles=50, repeat=1)
+    assert "full-text" in capsys.readouterr().out
+    assert not Article.objects.exists()
@@ -0,0 +1,99 @@
+"""
+Tests for the search result and facet cache.
+Located at: apps/news/tests/test_search_cache.py
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.news.models import Article, Category, NewsSource
+from apps.news.search_cache import (
+    get_corpus_version, hydrate_articles, normalize_query
+)
+from apps.news.tasks import delete_expired_articles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def corpus():
+    cache.clear()
+    sport = Category.objects.create(name="Sport", slug="sport")
+    world = Category.objects.create(name="World", slug="world")
+    wire = NewsSource.objects.create(name="Wire", slug="wire")
+    for n in range(5):
+        Article.objects.create(
+            title=f"Derby report {n}", url=f"https://example.com/{n}",
+            category=sport if n < 3 else world, source=wire,
+        )
+    Article.objects.create(title="Unrelated", url="https://example.com/x")
+    return sport, world, wire
+
+
+def search(client, **params):
+    return client.get(reverse("news:search_results"), params)
+
+
+def test_normalize_query():
+    assert normalize_query("  Climate \t DROUGHT ") == "climate drought"
+    assert normalize_query("") == ""
+
+
+def test_repeat_search_is_served_from_cache(client, corpus):
+    first = search(client, q="derby")
+    assert first.context["page_obj"].paginator.count == 5
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = search(client, q="  DERBY ")
+    # Only the in_bulk hydration touches the database
+    assert len(ctx.captured_queries) == 1
+    assert "COUNT(" not in ctx.captured_queries[0]["sql"].upper()
+    assert list(second.context["articles"]) == list(
+        first.context["articles"]
+    )
+    assert second.context["page_obj"].paginator.count == 5
+    assert second.context["query"] == "  DERBY "
+
+
+def test_facets_count_matches_before_filters(client, corpus):
+    sport, world, wire = corpus
+    response = search(client, q="derby", category="sport")
+    facets = response.context["facets"]
+    assert [(row["slug"], row["count"]) for row in facets["category"]] == [
+        ("sport", 3), ("world", 2)
+    ]
+    assert facets["source"] == [{"slug": "wire", "name": "Wire", "count": 5}]
+    assert response.context["page_obj"].paginator.count == 3
+
+
+def test_hydration_keeps_order_and_drops_deleted():
+    a, b, c = (
+        Article.objects.create(title=t, url=f"https://example.com/{t}")
+        for t in "abc"
+    )
+    b.delete()
+    with CaptureQueriesContext(connection) as ctx:
+        articles = hydrate_articles([c.id, b.id, a.id])
+        [article.source for article in articles]
+    assert articles == [c, a]
+    assert len(ctx.captured_queries) == 1
+
+
+def test_expired_article_cleanup_bumps_corpus_version(client, corpus):
+    search(client, q="derby")
+    version = get_corpus_version()
+    Article.objects.filter(title="Derby report 0").update(
+        imported=True, published_at=timezone.now() - timedelta(days=30)
+    )
+    delete_expired_articles()
+    assert get_corpus_version() == version + 1
+    assert search(client, q="derby").context["page_obj"].paginator.count == 4
+
+    delete_expired_articles()  # nothing deleted, nothing retired
+    assert get_corpus_version() == version + 1
@@ -0,0 +1,214 @@
+"""
+Tests for the pluggable feed sources and concurrent fetcher,
+run against a local stub HTTP server.
+Located at: apps/news/tests/test_sources.py
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+
+from apps.news import sources
+from apps.news.models import Article
+from apps.news.sources import (
+    FeedFetcher, FeedSource, GNewsSource, JSONFeedSource, RSSFeedSource,
+    build_source, register_source
+)
+from apps.news.tasks import fetch_news_articles
+
+RSS_BODY = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Stub RSS</title>
+<item><title>RSS story</title><link>https://stub.test/rss-1</link>
+<description>&lt;p&gt;Hello&lt;/p&gt;</description>
+<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate>
+<enclosure url="https://stub.test/rss-1.jpg" type="image/jpeg"/></item>
+</channel></rss>"""
+
+ATOM_BODY = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Stub Atom</title>
+<entry><title>Atom story</title>
+<link rel="alternate" href="https://stub.test/atom-1"/>
+<summary>Atom summary</summary><updated>2024-01-01T10:00:00Z</updated>
+</entry></feed>"""
+
+JSON_BODY = json.dumps({
+    "version": "https://jsonfeed.org/version/1.1",
+    "title": "Stub JSON",
+    "items": [{
+        "id": "1", "title": "JSON story", "url": "https://stub.test/json-1",
+        "content_text": "JSON content",
+        "date_published": "2024-01-01T10:00:00Z",
+    }],
+}).encode()
+
+GNEWS_BODY = json.dumps({
+    "articles": [{
+        "title": "GNews story", "url": "https://stub.test/gnews-1",
+        "publishedAt": "2024-01-01T10:00:00Z", "content": "Match report",
+        "description": "Desc", "source": {"name": "Stub GNews"},
+    }],
+}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    routes = {
+        "/rss": RSS_BODY,
+        "/atom": ATOM_BODY,
+        "/json": JSON_BODY,
+        "/gnews": GNEWS_BODY,
+        "/list": b"[]",
+        "/null-articles": b'{"articles": null}',
+        "/bad-items": b'{"items": ["not an object"]}',
+    }
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            path = self.path.split("?")[0]
+            if path == "/slow":
+                time.sleep(0.5)
+            else:
+                time.sleep(0.05)
+            body = self.routes.get(path)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.active = 0
+    server.peak = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_build_source_uses_registry():
+    source = build_source(
+        {"type": "rss", "name": "BBC", "url": "https://feeds.test/rss"}
+    )
+    assert isinstance(source, RSSFeedSource)
+    assert source.cache_name == "bbc"
+    with pytest.raises(ValueError):
+        build_source({"type": "carrier-pigeon"})
+
+
+def test_source_without_parse_fails_when_built(monkeypatch):
+    monkeypatch.setattr(sources, "SOURCE_TYPES", dict(sources.SOURCE_TYPES))
+
+    @register_source("unfinished")
+    class UnfinishedSource(FeedSource):
+        pass
+
+    with pytest.raises(TypeError):
+        build_source({
+            "type": "unfinished", "name": "WIP", "url": "https://wip.test"
+        })
+
+
+def test_fetch_all_parses_each_feed_type(stub_server):
+    base = stub_server.base_url
+    sources = [
+        RSSFeedSource("rss", f"{base}/rss"),
+        RSSFeedSource("atom", f"{base}/atom"),
+        JSONFeedSource("json", f"{base}/json"),
+        GNewsSource(topic="sports", url=f"{base}/gnews"),
+    ]
+    results = FeedFetcher().fetch_all(sources)
+
+    assert [r.error for r in results] == [None] * 4
+    rss, atom, json_feed, gnews = [r.articles for r in results]
+    assert rss[0]["url"] == "https://stub.test/rss-1"
+    assert rss[0]["description"] == "Hello"
+    assert rss[0]["image"] == "https://stub.test/rss-1.jpg"
+    assert rss[0]["source"]["name"] == "Stub RSS"
+    assert atom[0]["url"] == "https://stub.test/atom-1"
+    assert json_feed[0]["content"] == "JSON content"
+    assert gnews[0]["topic"] == "sports"
+
+
+def test_fetch_all_caps_concurrency_per_host(stub_server):
+    sources = [
+        RSSFeedSource(f"rss-{i}", f"{stub_server.base_url}/rss")
+        for i in range(6)
+    ]
+    fetcher = FeedFetcher(max_workers=6, max_per_host=2)
+    results = fetcher.fetch_all(sources)
+
+    assert all(r.error is None for r in results)
+    assert stub_server.peak <= 2
+
+
+def test_fetch_reports_timeouts_and_http_errors(stub_server):
+    base = stub_server.base_url
+    fetcher = FeedFetcher(timeout=0.1)
+    slow, missing = fetcher.fetch_all([
+        RSSFeedSource("slow", f"{base}/slow"),
+        RSSFeedSource("missing", f"{base}/missing"),
+    ])
+    assert slow.error is not None and slow.articles == []
+    assert missing.error is not None
+
+
+def test_fetch_reports_unexpected_json_shapes(stub_server):
+    base = stub_server.base_url
+    as_list, null_articles, bad_items, good = FeedFetcher().fetch_all([
+        GNewsSource(url=f"{base}/list"),
+        GNewsSource(url=f"{base}/null-articles"),
+        JSONFeedSource("bad", f"{base}/bad-items"),
+        JSONFeedSource("good", f"{base}/json"),
+    ])
+    assert isinstance(as_list.error, ValueError)
+    assert null_articles.error is None and null_articles.articles == []
+    assert isinstance(bad_items.error, ValueError)
+    assert good.error is None and len(good.articles) == 1
+
+
+@pytest.mark.django_db
+@mock.patch("apps.news.tasks.redis_client")
+def test_fetch_news_articles_ingests_all_configured_feeds(
+    mock_redis, stub_server
+):
+    mock_redis.exists.return_value = False
+    base = stub_server.base_url
+    feeds = [
+        {"type": "rss", "name": "Stub RSS", "url": f"{base}/rss"},
+        {"type": "json", "name": "Stub JSON", "url": f"{base}/json"},
+        {"type": "gnews", "topic": "sports", "url": f"{base}/gnews"},
+        {"type": "rss", "name": "Broken", "url": f"{base}/missing"},
+    ]
+    with override_settings(NEWS_FEED_SOURCES=feeds), \
+            mock.patch("apps.news.tasks.cache_articles") as mock_cache:
+        result = fetch_news_articles()
+
+    assert "3 new articles created" in result
+    assert Article.objects.count() == 3
+    cached_feeds = {
+        call.kwargs["source"] for call in mock_cache.call_args_list
+    }
+    assert cached_feeds == {"stub-rss", "stub-json", "gnews", "latest"}
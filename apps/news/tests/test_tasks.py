@@ -1,20 +1,23 @@
 import pytest
 import json
+from datetime import timedelta
 from unittest import mock
 from django.utils import timezone
 
 from django_celery_beat.models import IntervalSchedule, PeriodicTask
+from apps.news.article_cache import get_payload_key, get_redis_key
 from apps.news.models import Article
 from apps.news.tasks import (
     fetch_news_articles,
     redis_heartbeat,
     cache_articles,
+    delete_expired_articles,
 )
 
 
 @pytest.mark.django_db
 @mock.patch("apps.news.tasks.redis_client")
-@mock.patch("apps.news.tasks.requests.get")
+@mock.patch("apps.news.sources.requests.Session.get")
 def test_fetch_news_articles_mocks_api_and_redis(
     mock_requests_get, mock_redis
 ):
@@ -44,30 +47,73 @@ def test_fetch_news_articles_mocks_api_and_redis(
     assert Article.objects.filter(url="https://example.com/test").exists()
 
 
+@pytest.mark.django_db
+def test_expiry_queues_the_autocomplete_refresh(
+    django_capture_on_commit_callbacks
+):
+    article = Article.objects.create(
+        title="Old", url="https://example.com/old", imported=True
+    )
+    Article.objects.filter(pk=article.pk).update(
+        published_at=timezone.now() - timedelta(days=30)
+    )
+    with mock.patch(
+        "apps.news.tasks.rebuild_autocomplete_index"
+    ) as rebuild, mock.patch(
+        "apps.news.tasks.refresh_autocomplete_index.delay"
+    ) as delay:
+        with django_capture_on_commit_callbacks() as callbacks:
+            delete_expired_articles()
+        rebuild.assert_not_called()
+        delay.assert_not_called()
+        for callback in callbacks:
+            callback()
+        delay.assert_called_once_with()
+
+
 def test_redis_heartbeat_does_not_raise():
     with mock.patch("apps.news.tasks.redis_client.ping") as mocked_ping:
         redis_heartbeat()
         mocked_ping.assert_called_once()
 
 
-def test_cache_articles_adds_only_new_items():
-    mock_redis = mock.MagicMock()
-    existing = [
-        '{"title": "Cached", "url": "https://example.com/cached"}'
-    ]
-    mock_redis.lrange.return_value = existing
+def cached_payload(url, published_at="2024-01-01T00:00:00+00:00"):
+    return {"title": url, "url": url, "published_at": published_at}
+
 
-    articles = [
-        {"title": "Cached", "url": "https://example.com/cached"},
-        {"title": "New One", "url": "https://example.com/new"}
+def test_cache_articles_adds_only_new_items(fake_redis):
+    cache_articles(
+        [cached_payload("https://example.com/cached")], source="test-source"
+    )
+    cache_articles([
+        cached_payload("https://example.com/cached"),
+        cached_payload("https://example.com/new"),
+    ], source="test-source")
+
+    assert fake_redis.zcard(get_redis_key("test-source")) == 2
+    payloads = fake_redis.hvals(get_payload_key("test-source"))
+    assert sorted(json.loads(p)["url"] for p in payloads) == [
+        "https://example.com/cached", "https://example.com/new"
     ]
 
-    with mock.patch("apps.news.tasks.redis_client", mock_redis):
-        cache_articles(articles, source="test-source")
 
-    # Only the new article should be pushed to Redis
-    pushed = json.loads(mock_redis.lpush.call_args[0][1])
-    assert pushed["url"] == "https://example.com/new"
+def test_cache_articles_trims_oldest_and_their_payloads(fake_redis):
+    cache_articles([
+        cached_payload(
+            f"https://example.com/{day}", f"2024-01-0{day}T00:00:00+00:00"
+        )
+        for day in range(1, 6)
+    ], source="test-source", max_articles=3)
+
+    urls = [
+        json.loads(p)["url"]
+        for p in fake_redis.hvals(get_payload_key("test-source"))
+    ]
+    assert fake_redis.zcard(get_redis_key("test-source")) == 3
+    assert sorted(urls) == [
+        "https://example.com/3", "https://example.com/4",
+        "https://example.com/5",
+    ]
 
 
 @pytest.mark.django_db
@@ -85,3 +131,12 @@ def test_dummy_schedule_creation_for_news_tasks():
 
     assert task.task == "apps.news.tasks.delete_expired_articles"
     assert "Dummy Test" in task.name
+
+
+def test_cache_articles_ignores_legacy_list_keys(fake_redis):
+    fake_redis.rpush("news:test-source", "legacy")
+    cache_articles(
+        [cached_payload("https://example.com/new")], source="test-source"
+    )
+    assert fake_redis.zcard(get_redis_key("test-source")) == 1
+    assert fake_redis.lrange("news:test-source", 0, -1) == ["legacy"]
@@ -0,0 +1,155 @@
+"""
+Tests for the Redis time-decayed trending rankings.
+Located at: apps/news/tests/test_trending.py
+"""
+
+import time
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.news import trending
+from apps.news.fragments import get_version
+from apps.news.models import Article, Category
+from apps.news.trending import (
+    GLOBAL_KEY, get_category_key, get_trending_articles, reconcile_trending,
+    record_engagement
+)
+
+HOUR = 3600
+
+
+@pytest.fixture
+def category(db):
+    return Category.objects.create(name="Science")
+
+
+def make_article(n, category=None, **fields):
+    return Article.objects.create(
+        title=f"Story {n}", url=f"https://example.com/{n}", content="x",
+        category=category, **fields
+    )
+
+
+def at(monkeypatch, seconds):
+    monkeypatch.setattr(trending.time, "time", lambda: seconds)
+
+
+def test_recent_engagement_outweighs_older_engagement(
+    fake_redis, monkeypatch, category
+):
+    old, new = make_article(1, category), make_article(2)
+    start = time.time()
+    at(monkeypatch, start)
+    record_engagement("like", {old.id: 3})
+    at(monkeypatch, start + 24 * HOUR)
+    record_engagement("like", {new.id: 1})
+
+    # Three likes two half-lives ago are worth 0.75 of one like now
+    scores = dict(fake_redis.zrange(GLOBAL_KEY, 0, -1, withscores=True))
+    assert scores[str(old.id)] == pytest.approx(0.75 * scores[str(new.id)])
+    assert fake_redis.zrange(get_category_key(category.id), 0, -1) == [
+        str(old.id)
+    ]
+
+
+def test_fragments_are_invalidated_only_when_the_top_moves(
+    fake_redis, db
+):
+    first, second = make_article(1), make_article(2)
+    record_engagement("comment", {first.id: 2})
+    record_engagement("like", {second.id: 1})
+    version = get_version()
+
+    # More likes for the leader leave the ranking as it was
+    record_engagement("like", {first.id: 5})
+    assert get_version() == version
+
+    record_engagement("comment", {second.id: 5})
+    assert get_version() == version + 1
+
+
+def test_engagement_signals_update_trending(
+    client, db, fake_redis, django_capture_on_commit_callbacks
+):
+    liked, commented = make_article(1), make_article(2)
+    user = User.objects.create_user(username="reader", password="pw")
+    client.force_login(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("news:toggle_like", args=[liked.id]))
+        client.post(
+            reverse("news:post_comment", args=[commented.id]),
+            {"content": "Interesting"},
+        )
+    assert fake_redis.zrevrange(GLOBAL_KEY, 0, -1) == [
+        str(commented.id), str(liked.id)
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("news:toggle_like", args=[liked.id]))
+    assert fake_redis.zscore(GLOBAL_KEY, str(liked.id)) == pytest.approx(
+        0, abs=1e-3
+    )
+
+
+def test_reconcile_rebases_prunes_and_seeds(
+    fake_redis, monkeypatch, category
+):
+    kept, dropped = make_article(1, category), make_article(2, category)
+    stale = make_article(3)
+    Article.objects.filter(pk=stale.pk).update(
+        published_at=timezone.now() - timedelta(days=10)
+    )
+    seeded = make_article(4, category)
+    Article.objects.filter(pk=seeded.pk).update(comment_count=2)
+
+    start = time.time()
+    at(monkeypatch, start)
+    record_engagement("comment", {kept.id: 1, dropped.id: 1, stale.id: 1})
+    dropped.delete()
+    at(monkeypatch, start + 12 * HOUR)
+    assert reconcile_trending() == 2
+
+    # Rebased by one half-life onto the new epoch; the seeded article's
+    # two comments count as made when it was published, 12 hours ago
+    assert fake_redis.zscore(GLOBAL_KEY, str(kept.id)) == pytest.approx(1.5)
+    assert fake_redis.zscore(GLOBAL_KEY, str(seeded.id)) == pytest.approx(
+        3, rel=0.01
+    )
+    assert float(fake_redis.get(trending.EPOCH_KEY)) == start + 12 * HOUR
+    assert set(fake_redis.zrange(GLOBAL_KEY, 0, -1)) == {
+        str(kept.id), str(seeded.id)
+    }
+    assert fake_redis.zrevrange(get_category_key(category.id), 0, -1) == [
+        str(seeded.id), str(kept.id)
+    ]
+
+
+def test_trending_articles_load_in_one_query(
+    fake_redis, category, django_assert_num_queries
+):
+    other = Category.objects.create(name="Sport")
+    articles = [make_article(n, category) for n in range(3)]
+    articles.append(make_article(3, other))
+    record_engagement("view", {a.id: n + 1 for n, a in enumerate(articles)})
+
+    with django_assert_num_queries(1):
+        top, by_category = get_trending_articles(
+            2, [category.id, other.id]
+        )
+    assert top == [articles[3], articles[2]]
+    assert by_category == {
+        category.id: [articles[2], articles[1]],
+        other.id: [articles[3]],
+    }
+
+
+def test_trending_falls_back_to_comment_counts(fake_redis, category):
+    quiet, busy = make_article(1, category), make_article(2, category)
+    Article.objects.filter(pk=busy.pk).update(comment_count=5)
+    top, by_category = get_trending_articles(8, [category.id])
+    assert top == [busy, quiet]
+    assert by_category[category.id] == [busy, quiet]
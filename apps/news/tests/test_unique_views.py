@@ -0,0 +1,69 @@
+"""
+Tests for HyperLogLog unique-viewer tracking.
+Located at: apps/news/tests/test_unique_views.py
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from apps.news.models import Article
+from apps.news.unique_views import (
+    VISITOR_COOKIE, count_unique_view, unique_viewer_counts
+)
+from apps.news.view_counts import pending_views
+
+
+@pytest.fixture
+def article(db):
+    return Article.objects.create(
+        title="Story", url="https://example.com/story", content="x"
+    )
+
+
+def test_count_unique_view_counts_each_visitor_once(fake_redis, article):
+    assert count_unique_view(article.id, "user:1") is True
+    assert count_unique_view(article.id, "user:1") is False
+    assert count_unique_view(article.id, "anon:abc") is True
+
+    assert pending_views([article.id])[article.id] == 2
+    assert unique_viewer_counts([article.id]) == {article.id: 2}
+
+
+def test_anonymous_visitor_gets_cookie_and_no_session_writes(
+    client, fake_redis, article
+):
+    url = reverse("news:article_detail", args=[article.id])
+    first = client.get(url)
+    assert VISITOR_COOKIE in first.cookies
+    second = client.get(url)
+    assert VISITOR_COOKIE not in second.cookies
+
+    assert pending_views([article.id])[article.id] == 1
+    assert not any(
+        key.startswith("viewed_article_") for key in client.session.keys()
+    )
+
+
+def test_signed_in_user_is_counted_once_across_clients(
+    client, fake_redis, article
+):
+    user = User.objects.create_user(username="reader", password="pw")
+    url = reverse("news:article_detail", args=[article.id])
+    for _ in range(2):
+        client.force_login(user)
+        client.get(url)
+        client.logout()
+    assert pending_views([article.id])[article.id] == 1
+
+
+def test_article_admin_shows_unique_viewers(client, fake_redis, article):
+    admin = User.objects.create_superuser("admin", "a@example.com", "pw")
+    for visitor in ("user:1", "user:2", "user:3"):
+        count_unique_view(article.id, visitor)
+
+    client.force_login(admin)
+    response = client.get(reverse("admin:news_article_changelist"))
+    assert response.status_code == 200
+    assert b"Unique Viewers" in response.content
+    assert b'<td class="field-unique_viewers">3</td>' in response.content
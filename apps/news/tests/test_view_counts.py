@@ -0,0 +1,178 @@
+"""
+Tests for the buffered article view counter.
+Located at: apps/news/tests/test_view_counts.py
+"""
+
+import threading
+
+import pytest
+import redis
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news import view_counts
+from apps.news.models import Article
+from apps.news.tasks import flush_article_views
+from apps.news.view_counts import (
+    FLUSHING_KEY, apply_pending_views, flush_views, pending_views,
+    record_view
+)
+
+
+def updates(queries):
+    return [
+        query["sql"] for query in queries.captured_queries
+        if query["sql"].startswith("UPDATE")
+    ]
+
+
+@pytest.fixture
+def articles(db):
+    return [
+        Article.objects.create(
+            title=f"Story {i}", url=f"https://example.com/{i}", content="x"
+        )
+        for i in range(3)
+    ]
+
+
+def test_views_are_buffered_until_flushed(
+    fake_redis, articles, django_assert_num_queries
+):
+    first, second, _ = articles
+    with django_assert_num_queries(0):
+        for _ in range(3):
+            record_view(first.id)
+        record_view(second.id)
+
+    first.refresh_from_db()
+    assert first.views == 0
+    assert apply_pending_views([first])[0].views == 3
+
+    with CaptureQueriesContext(connection) as queries:
+        assert flush_views() == 4
+    assert len(updates(queries)) == 1
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.views, second.views) == (3, 1)
+    assert pending_views([first.id]) == {first.id: 0}
+    assert flush_views() == 0
+
+
+def test_flush_batches_rows_into_case_statements(
+    fake_redis, articles, monkeypatch
+):
+    monkeypatch.setattr(view_counts, "FLUSH_BATCH_SIZE", 2)
+    for article in articles:
+        record_view(article.id)
+    with CaptureQueriesContext(connection) as queries:
+        assert flush_views() == 3
+    assert len(updates(queries)) == 2
+    assert all("CASE WHEN" in sql for sql in updates(queries))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_no_views_are_lost_when_flushing_concurrently(fake_redis):
+    article = Article.objects.create(
+        title="Viral", url="https://example.com/viral", content="x"
+    )
+    writers, views_per_writer = 8, 250
+    stop = threading.Event()
+
+    def viewer():
+        for _ in range(views_per_writer):
+            record_view(article.id)
+
+    def flusher():
+        while not stop.is_set():
+            flush_views()
+
+    flush_thread = threading.Thread(target=flusher)
+    flush_thread.start()
+    threads = [threading.Thread(target=viewer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    flush_thread.join()
+    flush_views()
+
+    article.refresh_from_db()
+    assert article.views == writers * views_per_writer
+
+
+def test_failed_flush_is_retried_without_loss(
+    fake_redis, articles, monkeypatch
+):
+    article = articles[0]
+    record_view(article.id)
+
+    def broken(deltas):
+        raise RuntimeError("database went away")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(view_counts, "write_view_deltas", broken)
+        with pytest.raises(RuntimeError):
+            flush_views()
+    record_view(article.id)
+
+    # The claimed batch is flushed first, then the newer view
+    assert flush_views() == 1
+    assert flush_views() == 1
+    article.refresh_from_db()
+    assert article.views == 2
+
+
+def test_committed_flush_is_not_counted_or_applied_twice(
+    fake_redis, articles, monkeypatch
+):
+    article = articles[0]
+    record_view(article.id)
+    delete = fake_redis.delete
+
+    def crash(*keys):
+        if FLUSHING_KEY in keys:
+            raise redis.ConnectionError("worker died")
+        return delete(*keys)
+
+    # The UPDATE commits, then the worker dies before dropping the hash
+    with monkeypatch.context() as patched:
+        patched.setattr(fake_redis, "delete", crash)
+        with pytest.raises(redis.ConnectionError):
+            flush_views()
+    assert fake_redis.exists(FLUSHING_KEY)
+    article.refresh_from_db()
+    assert article.views == 1
+    assert apply_pending_views([article])[0].views == 1
+
+    assert flush_views() == 0
+    assert not fake_redis.exists(FLUSHING_KEY)
+    article.refresh_from_db()
+    assert article.views == 1
+
+
+@override_settings(VIEW_COUNT_LOCAL_FLUSH_INTERVAL=0)
+def test_views_fall_back_to_memory_and_database_without_redis(
+    articles, monkeypatch
+):
+    class DownRedis:
+        def __getattr__(self, name):
+            raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(view_counts, "redis_client", DownRedis())
+    record_view(articles[0].id)
+    articles[0].refresh_from_db()
+    assert articles[0].views == 1
+
+
+def test_article_detail_counts_a_view_once_per_session(
+    client, fake_redis, articles
+):
+    url = reverse("news:article_detail", args=[articles[0].id])
+    client.get(url)
+    client.get(url)
+    assert pending_views([articles[0].id])[articles[0].id] == 1
+    assert "1 article views flushed." == flush_article_views()
@@ -0,0 +1,233 @@
+"""
+Time-decayed trending rankings kept in Redis sorted sets.
+Every engagement event (comment, like, save, view) adds
+weight * 2 ** ((now - epoch) / half_life) to the article's score in the
+global set and in its category's set. Older events therefore count for
+half as much every TRENDING_HALF_LIFE_HOURS without any score having to
+be rewritten, and the homepage reads the top N with ZREVRANGE.
+reconcile_trending() runs periodically: it rebases every set onto a new
+epoch (one ZUNIONSTORE with a weight, so the numbers never overflow),
+drops articles that are gone or too old, and seeds articles missing
+from the sets from their stored counters.
+Located at: apps/news/trending.py
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+from apps.news.fragments import bump_version
+from apps.news.lookups import category_lookup
+from apps.news.models import Article
+from apps.news.utils import top_per_category
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_KEY = "trending:global"
+EPOCH_KEY = "trending:epoch"
+
+# Points per engagement event, before decay
+TRENDING_WEIGHTS = {
+    "comment": 3.0,
+    "save": 2.0,
+    "like": 1.0,
+    "view": 0.1,
+}
+
+# Only articles this recent can trend; each set keeps at most this many
+TRENDING_WINDOW = timedelta(days=7)
+TRENDING_MAX_MEMBERS = 500
+
+# Articles shown per trending section on the homepage
+TRENDING_DISPLAY_COUNT = 8
+
+
+def get_category_key(category_id):
+    return f"trending:category:{category_id}"
+
+
+def get_half_life():
+    return getattr(settings, "TRENDING_HALF_LIFE_HOURS", 12) * 3600
+
+
+def decay_factor(since, until):
+    """
+    Multiplier taking a score from time `since` to time `until`.
+    """
+    return 2 ** ((since - until) / get_half_life())
+
+
+def get_epoch(now):
+    """
+    Return the epoch current scores are relative to, starting one at
+    `now` if there is none yet.
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.set(EPOCH_KEY, now, nx=True)
+    pipe.get(EPOCH_KEY)
+    return float(pipe.execute()[1])
+
+
+def record_engagement(event, deltas, categories=None):
+    """
+    Add {article_id: number of events} to the trending sets.
+    Removals (negative counts) are taken off at today's weight, which
+    is exact for a quick unlike and only slightly harsh for old likes.
+    categories maps article ids to category ids when the caller already
+    knows them; otherwise they are read in one query.
+    Homepage fragments are only invalidated when the displayed top of
+    a touched set changes; counts on the cards catch up with the
+    fragment TTL.
+    """
+    deltas = {pk: n for pk, n in deltas.items() if n}
+    if not deltas:
+        return
+    if categories is None:
+        categories = dict(
+            Article.objects.filter(pk__in=deltas)
+            .values_list("id", "category_id")
+        )
+    weight = TRENDING_WEIGHTS[event]
+    now = time.time()
+    increments = []
+    for pk, n in deltas.items():
+        if pk not in categories:
+            continue
+        increments.append((GLOBAL_KEY, pk, n))
+        if categories[pk]:
+            increments.append((get_category_key(categories[pk]), pk, n))
+    if not increments:
+        return
+    keys = list(dict.fromkeys(key for key, _, _ in increments))
+    try:
+        boost = decay_factor(now, get_epoch(now))
+        # One MULTI, so the top read before and after the increments
+        # only differs because of them
+        pipe = redis_client.pipeline()
+        for key in keys:
+            pipe.zrevrange(key, 0, TRENDING_DISPLAY_COUNT - 1)
+        for key, pk, n in increments:
+            pipe.zincrby(key, n * weight * boost, pk)
+        for key in keys:
+            pipe.zrevrange(key, 0, TRENDING_DISPLAY_COUNT - 1)
+        results = pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not record trending {event}: {e}")
+        return
+    if results[:len(keys)] != results[-len(keys):]:
+        bump_version()
+
+
+def seed_score(article, now):
+    """
+    Score for an article not yet ranked, from its stored counters,
+    treating every event as happening when it was published.
+    """
+    points = (
+        article["comment_count"] * TRENDING_WEIGHTS["comment"]
+        + article["save_count"] * TRENDING_WEIGHTS["save"]
+        + article["like_count"] * TRENDING_WEIGHTS["like"]
+        + article["views"] * TRENDING_WEIGHTS["view"]
+    )
+    return points * decay_factor(article["published_at"].timestamp(), now)
+
+
+def reconcile_trending():
+    """
+    Rebase, prune and fill the trending sets from the database.
+    Increments computed against the old epoch while this runs are off
+    by at most 2 ** (seconds since the last run / half-life), a fraction
+    of a percent at the scheduled interval.
+    Returns the number of ranked articles.
+    """
+    now = time.time()
+    articles = list(
+        Article.objects.filter(
+            published_at__gte=timezone.now() - TRENDING_WINDOW
+        ).values(
+            "id", "category_id", "published_at", "views",
+            *Article.counter_fields,
+        )
+    )
+    members = {str(article["id"]): article for article in articles}
+    # Every category's set is rebased, even with nothing to rank, so
+    # all sets stay relative to the same epoch
+    keys = {GLOBAL_KEY: set(members)}
+    for category in category_lookup.all():
+        keys[get_category_key(category.id)] = set()
+    for member, article in members.items():
+        if article["category_id"]:
+            keys.setdefault(
+                get_category_key(article["category_id"]), set()
+            ).add(member)
+
+    old_epoch = redis_client.get(EPOCH_KEY)
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.zrange(key, 0, -1)
+    existing = dict(zip(keys, pipe.execute()))
+
+    pipe = redis_client.pipeline()
+    if old_epoch is not None:
+        factor = decay_factor(float(old_epoch), now)
+        for key in keys:
+            pipe.zunionstore(key, {key: factor})
+    pipe.set(EPOCH_KEY, now)
+    for key, wanted in keys.items():
+        stale = set(existing[key]) - wanted
+        if stale:
+            pipe.zrem(key, *stale)
+        if wanted:
+            pipe.zadd(key, {
+                member: seed_score(members[member], now)
+                for member in wanted
+            }, nx=True)
+        pipe.zremrangebyrank(key, 0, -(TRENDING_MAX_MEMBERS + 1))
+    pipe.execute()
+    bump_version()
+    return len(members)
+
+
+def _hydrate(ids, articles):
+    return [articles[pk] for pk in ids if pk in articles]
+
+
+def get_trending_articles(limit=TRENDING_DISPLAY_COUNT, category_ids=()):
+    """
+    Return (global top `limit`, {category_id: top `limit`}) trending
+    articles. All sets are read in one pipeline and every article is
+    loaded with one in_bulk query. Falls back to comment counts in the
+    database (two queries) if Redis is unavailable or the sets are
+    still empty.
+    """
+    category_ids = list(category_ids)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zrevrange(GLOBAL_KEY, 0, limit - 1)
+        for category_id in category_ids:
+            pipe.zrevrange(get_category_key(category_id), 0, limit - 1)
+        ranked = [[int(pk) for pk in ids] for ids in pipe.execute()]
+    except redis.RedisError as e:
+        logger.warning(f"Trending sets unavailable: {e}")
+        ranked = [[]]
+
+    if not ranked[0]:
+        top = Article.objects.select_related("source").order_by(
+            "-comment_count", "-published_at"
+        )[:limit]
+        return list(top), top_per_category(
+            category_ids, "-comment_count", limit
+        )
+
+    articles = Article.objects.select_related("source").in_bulk(
+        {pk for ids in ranked for pk in ids}
+    )
+    return _hydrate(ranked[0], articles), {
+        category_id: _hydrate(ids, articles)
+        for category_id, ids in zip(category_ids, ranked[1:])
+    }
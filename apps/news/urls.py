@@ -9,7 +9,7 @@ from django.urls import path
 from .views import (
     homepage, search_articles, article_detail, vote_comment, post_comment,
     edit_comment, delete_comment, reply_to_comment, report_comment,
-    toggle_like, toggle_save, about_view
+    toggle_like, toggle_save, about_view, autocomplete, engagement_state
 )
 
 app_name = "news"
@@ -18,11 +18,17 @@ urlpatterns = [
     path('', homepage, name='homepage'),
     path('about/', about_view, name='about'),
     path('search/', search_articles, name='search_results'),
+    path('search/autocomplete/', autocomplete, name='autocomplete'),
     path(
         'article/<int:article_id>/',
         article_detail,
         name='article_detail'
     ),
+    path(
+        'articles/engagement/',
+        engagement_state,
+        name='engagement_state'
+    ),
     path(
         'articles/<int:article_id>/toggle_like/',
         toggle_like,
@@ -3,7 +3,12 @@ Utility functions for the News app.
 Located at: apps/news/utils.py
 """
 
-from typing import Generator, List, Any
+from typing import Any, Dict, Generator, Iterable, List, Optional
+
+from django.db.models import F, QuerySet, Window
+from django.db.models.functions import RowNumber
+
+from .models import Article
 
 
 def chunked_queryset(
@@ -22,3 +27,40 @@ def chunked_queryset(
     items = list(queryset)
     for i in range(0, len(items), chunk_size):
         yield items[i:i + chunk_size]
+
+
+def top_per_category(
+        category_ids: Iterable[int], order_by: str, limit: int,
+        queryset: Optional[QuerySet] = None) -> Dict[int, List[Article]]:
+    """
+    Fetches the first articles of several categories in one query,
+    ranked with ROW_NUMBER() OVER (PARTITION BY category_id ...).
+
+    Args:
+        category_ids (Iterable[int]): The categories to fetch.
+        order_by (str): Field to rank by, e.g. "-published_at".
+        limit (int): The number of articles per category.
+        queryset (QuerySet | None): Articles to rank; defaults to all
+            articles with their source.
+
+    Returns:
+        Dict[int, List[Article]]: Articles by category id, in order.
+    """
+    category_ids = list(category_ids)
+    result = {category_id: [] for category_id in category_ids}
+    if not category_ids:
+        return result
+    if queryset is None:
+        queryset = Article.objects.select_related("source")
+    ranked = queryset.filter(category_id__in=category_ids).annotate(
+        category_rank=Window(
+            RowNumber(),
+            partition_by=F("category_id"),
+            order_by=[order_by, "-id"],
+        )
+    ).filter(category_rank__lte=limit).order_by(
+        "category_id", "category_rank"
+    )
+    for article in ranked:
+        result[article.category_id].append(article)
+    return result
@@ -0,0 +1,208 @@
+"""
+Buffered article view counter.
+Views are counted with HINCRBY in Redis (or a per-process Counter while
+Redis is unreachable) instead of an UPDATE on every page view, and
+flush_views() writes the accumulated deltas back to Article.views in
+batched UPDATE ... CASE statements. Displayed counts add the pending
+delta to the stored value, so they stay current between flushes.
+Each claimed batch carries a flush id that is recorded as a ViewFlush
+row in the transaction that writes it, so a batch left behind by a
+crashed worker is never applied twice, and displayed counts stop adding
+it as soon as that transaction commits.
+Located at: apps/news/view_counts.py
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from apps.news.models import Article, ViewFlush
+from apps.news.trending import record_engagement
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Hash of article id -> views not yet written to the database
+PENDING_KEY = "views:pending"
+# Deltas claimed by a running flush; renamed from PENDING_KEY
+FLUSHING_KEY = "views:flushing"
+FLUSH_LOCK_KEY = "views:flush_lock"
+# Field of the claimed hash naming its flush; article ids are integers
+FLUSH_ID_FIELD = "flush_id"
+# How long applied flush ids are kept to recognise a retried batch
+FLUSH_RECORD_TTL = timedelta(days=1)
+
+# Rows updated per UPDATE ... CASE statement
+FLUSH_BATCH_SIZE = 500
+
+_local_pending = Counter()
+_local_lock = threading.Lock()
+_local_flushed_at = time.monotonic()
+
+
+def record_view(article_id):
+    """
+    Count one view of an article without touching the database.
+    """
+    try:
+        redis_client.hincrby(PENDING_KEY, article_id, 1)
+    except redis.RedisError as e:
+        logger.warning(f"Buffering view locally, Redis error: {e}")
+        with _local_lock:
+            _local_pending[article_id] += 1
+    _drain_local()
+
+
+def _drain_local():
+    """
+    Move views buffered in this process back to Redis once it answers
+    again, or straight to the database after
+    VIEW_COUNT_LOCAL_FLUSH_INTERVAL seconds without it.
+    """
+    global _local_flushed_at
+    if not _local_pending:
+        return
+    with _local_lock:
+        deltas = dict(_local_pending)
+        _local_pending.clear()
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        for article_id, delta in deltas.items():
+            pipe.hincrby(PENDING_KEY, article_id, delta)
+        pipe.execute()
+        return
+    except redis.RedisError:
+        pass
+
+    interval = getattr(settings, "VIEW_COUNT_LOCAL_FLUSH_INTERVAL", 30)
+    if time.monotonic() - _local_flushed_at >= interval:
+        write_view_deltas(deltas)
+        _local_flushed_at = time.monotonic()
+    else:
+        with _local_lock:
+            _local_pending.update(deltas)
+
+
+def pending_views(article_ids):
+    """
+    Return {article_id: views not yet flushed} for the given ids,
+    with one Redis round trip.
+    """
+    article_ids = list(article_ids)
+    pending = Counter()
+    if not article_ids:
+        return pending
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hmget(PENDING_KEY, article_ids)
+        pipe.hmget(FLUSHING_KEY, [FLUSH_ID_FIELD, *article_ids])
+        waiting, (flush_id, *flushing) = pipe.execute()
+        batches = [waiting]
+        # A claimed batch whose UPDATE committed is already in the rows
+        if not (flush_id and flush_applied(flush_id)):
+            batches.append(flushing)
+        for values in batches:
+            for article_id, value in zip(article_ids, values):
+                if value:
+                    pending[article_id] += int(value)
+    except redis.RedisError as e:
+        logger.warning(f"Could not read pending views: {e}")
+    with _local_lock:
+        for article_id in article_ids:
+            pending[article_id] += _local_pending.get(article_id, 0)
+    return pending
+
+
+def flush_applied(flush_id):
+    return ViewFlush.objects.filter(flush_id=flush_id).exists()
+
+
+def apply_pending_views(articles):
+    """
+    Add pending views to each article's `views` for display.
+    An instance shared between several lists is only adjusted once.
+    Returns the articles so it can wrap a queryset or list.
+    """
+    articles = list(articles)
+    todo = {
+        id(article): article for article in articles
+        if not getattr(article, "_pending_views_applied", False)
+    }
+    pending = pending_views({article.id for article in todo.values()})
+    for article in todo.values():
+        article.views += pending.get(article.id, 0)
+        article._pending_views_applied = True
+    return articles
+
+
+def write_view_deltas(deltas):
+    """
+    Add {article_id: delta} to Article.views with batched
+    UPDATE ... SET views = views + CASE id WHEN ... END statements.
+    """
+    deltas = {
+        int(article_id): int(delta)
+        for article_id, delta in deltas.items() if int(delta)
+    }
+    items = sorted(deltas.items())
+    for start in range(0, len(items), FLUSH_BATCH_SIZE):
+        batch = items[start:start + FLUSH_BATCH_SIZE]
+        Article.objects.filter(id__in=[pk for pk, _ in batch]).update(
+            views=F("views") + Case(
+                *[When(id=pk, then=Value(delta)) for pk, delta in batch],
+                default=Value(0),
+                output_field=PositiveIntegerField(),
+            )
+        )
+    return sum(deltas.values())
+
+
+def flush_views():
+    """
+    Write buffered views to the database and return how many were
+    flushed. The pending hash is renamed before it is read, so views
+    recorded during a flush land in a fresh hash and are never lost.
+    A flush that fails leaves its claimed hash to be retried next time;
+    one that committed but died before dropping the hash is recognised
+    by its flush id and not written again.
+    Flushed views also count towards trending.
+    """
+    token = uuid.uuid4().hex
+    if not redis_client.set(FLUSH_LOCK_KEY, token, nx=True, ex=300):
+        logger.info("View flush already running, skipping.")
+        return 0
+    try:
+        if not redis_client.exists(FLUSHING_KEY):
+            try:
+                redis_client.rename(PENDING_KEY, FLUSHING_KEY)
+            except redis.ResponseError:
+                # Nothing pending: RENAME fails on a missing key
+                return 0
+        # A retried batch keeps the id of its first attempt
+        redis_client.hsetnx(FLUSHING_KEY, FLUSH_ID_FIELD, token)
+        deltas = redis_client.hgetall(FLUSHING_KEY)
+        flush_id = deltas.pop(FLUSH_ID_FIELD)
+        with transaction.atomic():
+            _, created = ViewFlush.objects.get_or_create(flush_id=flush_id)
+            flushed = write_view_deltas(deltas) if created else 0
+            ViewFlush.objects.filter(
+                created_at__lt=timezone.now() - FLUSH_RECORD_TTL
+            ).delete()
+        redis_client.delete(FLUSHING_KEY)
+        if created:
+            record_engagement("view", {
+                int(pk): int(count) for pk, count in deltas.items()
+            })
+        return flushed
+    finally:
+        if redis_client.get(FLUSH_LOCK_KEY) == token:
+            redis_client.delete(FLUSH_LOCK_KEY)
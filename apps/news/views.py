@@ -5,65 +5,98 @@ Located at: apps/news/views.py
 """
 
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from django.core.paginator import Paginator
-from django.db.models import Q, Count, F, Max
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.conf import settings
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.decorators import login_required
 from .utils import chunked_queryset
-from .models import Article, Category
+from .models import Article
+from .lookups import category_lookup
+from .article_cache import apply_counters, get_latest_articles
+from .view_counts import apply_pending_views
+from .trending import TRENDING_DISPLAY_COUNT, get_trending_articles
+from .personalized import build_category_sections
+from .fragments import cached_fragment
+from .search import full_text_search
+from .pagination import COUNT_CACHED, KeysetPage, KeysetPaginator
+from .search_cache import (
+    cached_search, facet_counts, get_corpus_version, get_search_key,
+    hydrate_articles, normalize_query
+)
+from .autocomplete import ARTICLE, get_suggestions
+from .engagement import (
+    LIKE, MAX_STATE_ARTICLES, SAVE, apply_engagement_state,
+    get_engagement_state, toggle_engagement
+)
+from .comment_tree import load_comment_tree
+from .unique_views import (
+    count_unique_view, get_visitor_id, set_visitor_cookie
+)
 from apps.users.forms import CommentForm
-from apps.users.models import Comment
+from apps.users.models import Comment, CommentVote
+from apps.users.votes import cast_vote
 
 
-def homepage(request):
-    # 1. Trending Articles (site-wide)
-    trending_articles = (
-        Article.objects
-        .annotate(comment_count=Count('comments'))
-        .order_by('-comment_count')[:8]
+def build_home_sections():
+    # 1. Trending Articles (site-wide), from the Redis trending set
+    trending_articles, _ = get_trending_articles(TRENDING_DISPLAY_COUNT)
+    trending_chunks = list(
+        chunked_queryset(apply_pending_views(trending_articles), 3)
     )
-    trending_chunks = list(chunked_queryset(trending_articles, 3))
 
     # 2. Latest Articles (site-wide)
-    latest_articles = Article.objects.order_by('-published_at')[:12]
-    latest_chunks = list(chunked_queryset(latest_articles, 3))
+    latest_articles = apply_counters(get_latest_articles(12))
+    latest_chunks = list(
+        chunked_queryset(apply_pending_views(latest_articles), 3)
+    )
+    return render_to_string('partials/home_sections.html', {
+        'trending_chunks': trending_chunks,
+        'latest_chunks': latest_chunks,
+    })
+
 
+def build_picked_sections(user_categories):
     # 3. Picked for You (per category) => two sub-sections:
-    # "Trending in X" & "Latest in X"
-    picked_articles_by_category = {}
-    if request.user.is_authenticated:
-        user_categories = request.user.profile.preferred_categories.all()
-        for cat in user_categories:
-            # a) Trending in this category
-            cat_trending = (
-                cat.articles.all()
-                .annotate(comment_count=Count('comments'))
-                .order_by('-comment_count')[:8]
-            )
-            cat_trending_chunks = list(chunked_queryset(cat_trending, 3))
+    # "Trending in X" & "Latest in X", built with one windowed query
+    _, trending_by_category = get_trending_articles(
+        TRENDING_DISPLAY_COUNT, [cat.id for cat in user_categories]
+    )
+    picked_articles_by_category = build_category_sections(
+        user_categories, trending_by_category
+    )
+    return render_to_string('partials/home_picked.html', {
+        'picked_articles_by_category': picked_articles_by_category,
+    })
+
+
+def homepage(request):
+    """
+    Render the homepage from cached section fragments (fragments.py):
+    the site-wide carousels are shared by every visitor, the
+    "Picked for You" ones are cached per user and category set.
+    """
+    home_sections = cached_fragment('homepage:sections', build_home_sections)
 
-            # b) Latest in this category
-            cat_latest = (
-                cat.articles.all()
-                .order_by('-published_at')[:12]
+    picked_sections = ''
+    if request.user.is_authenticated:
+        user_categories = list(
+            request.user.profile.preferred_categories.all()
+        )
+        if user_categories:
+            category_ids = '-'.join(str(cat.id) for cat in user_categories)
+            picked_sections = cached_fragment(
+                f'homepage:picked:{request.user.id}:{category_ids}',
+                lambda: build_picked_sections(user_categories),
             )
-            cat_latest_chunks = list(chunked_queryset(cat_latest, 3))
-
-            picked_articles_by_category[cat] = {
-                'trending': {
-                    'chunks': cat_trending_chunks,
-                    'carousel_id': f'catTrendingCarousel-{cat.slug}',
-                },
-                'latest': {
-                    'chunks': cat_latest_chunks,
-                    'carousel_id': f'catLatestCarousel-{cat.slug}',
-                },
-            }
 
     context = {
-        'trending_chunks': trending_chunks,
-        'latest_chunks': latest_chunks,
-        'picked_articles_by_category': picked_articles_by_category,
+        'home_sections': mark_safe(home_sections),
+        'picked_sections': mark_safe(picked_sections),
     }
     return render(request, 'news/homepage.html', context)
 
@@ -77,17 +110,20 @@ def search_articles(request):
     category_slug = request.GET.get('category', '')
     source_slug = request.GET.get('source', '')
     sort = request.GET.get('sort', 'relevant')
+    cursor = request.GET.get('cursor', '')
+    search_query = normalize_query(query)
 
-    articles = Article.objects.all()
+    articles = Article.objects.select_related('source', 'category')
 
-    if query:
-        articles = articles.filter(
-            Q(title__icontains=query) | Q(content__icontains=query)
-        )
+    if search_query:
+        # Full-text match, ranked by relevance (see search.py)
+        articles = full_text_search(articles, search_query)
+    # Facets count every match, before the category/source filters
+    matches = articles
 
     if category_slug:
         articles = articles.filter(category__slug=category_slug)
-        category_obj = Category.objects.filter(slug=category_slug).first()
+        category_obj = category_lookup.get(slug=category_slug)
         category_name = category_obj.name if category_obj else ''
     else:
         category_name = ''
@@ -95,26 +131,69 @@ def search_articles(request):
     if source_slug:
         articles = articles.filter(source__slug=source_slug)
 
-    # Sorting logic here ...
+    # Sort orders, each ending in a unique key for keyset pagination
     if sort == 'recent':
-        articles = articles.order_by('-published_at')
+        ordering = ['-published_at', '-id']
     elif sort == 'oldest':
-        articles = articles.order_by('published_at')
+        ordering = ['published_at', 'id']
     elif sort == 'category':
-        articles = articles.order_by('category__name')
+        articles = articles.annotate(
+            sort_name=Coalesce('category__name', Value(''))
+        )
+        ordering = ['sort_name', '-published_at', '-id']
     elif sort == 'source':
-        articles = articles.order_by('source__name')
-    else:  # 'relevant' or unknown fallback
-        articles = articles.order_by('-id')
+        articles = articles.annotate(
+            sort_name=Coalesce('source__name', Value(''))
+        )
+        ordering = ['sort_name', '-published_at', '-id']
+    elif search_query:  # 'relevant' or unknown fallback
+        # The integer rank key compares exactly against cursor values
+        ordering = ['-search_rank_key', '-published_at', '-id']
+    else:
+        ordering = ['-id']
 
-    paginator = Paginator(articles, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(
+        articles, 9, ordering,
+        count_mode=getattr(settings, 'SEARCH_COUNT_MODE', COUNT_CACHED),
+        count_version=get_corpus_version(),
+    )
+    fresh_rows = []
+
+    def build_page():
+        page = paginator.get_page(cursor)
+        fresh_rows.extend(page.object_list)
+        return {
+            'ids': [article.id for article in page.object_list],
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+            'count': paginator.count,
+            'count_is_estimate': paginator.count_is_estimate,
+            'facets': facet_counts(matches),
+        }
+
+    entry = cached_search(
+        get_search_key(
+            q=search_query, category=category_slug, source=source_slug,
+            sort=sort, cursor=cursor,
+        ),
+        build_page,
+    )
+    # Seed the paginator's total from the cache entry
+    paginator.count = entry['count']
+    paginator.count_is_estimate = entry['count_is_estimate']
+    page_obj = KeysetPage(
+        fresh_rows or hydrate_articles(entry['ids']), paginator,
+        entry['next_cursor'], entry['previous_cursor'],
+    )
+    page_obj.object_list = apply_engagement_state(
+        request.user, apply_pending_views(page_obj.object_list)
+    )
 
     context = {
         'page_obj': page_obj,
         'articles': page_obj.object_list,
         'is_paginated': page_obj.has_other_pages(),
+        'facets': entry['facets'],
         'query': query,
         'category_slug': category_slug,
         'category_name': category_name,
@@ -127,42 +206,82 @@ def search_articles(request):
     return render(request, "news/search_results.html", context)
 
 
+@cache_control(public=True, max_age=60)
+def autocomplete(request):
+    """
+    Suggestions for the search box, answered from the prefix index.
+    """
+    search_url = reverse('news:search_results')
+    suggestions = []
+    for suggestion in get_suggestions(request.GET.get('q', '')):
+        if suggestion['type'] == ARTICLE:
+            url = reverse(
+                'news:article_detail',
+                kwargs={'article_id': int(suggestion['key'])},
+            )
+        else:
+            url = f"{search_url}?{suggestion['type']}={suggestion['key']}"
+        suggestions.append({
+            'type': suggestion['type'],
+            'label': suggestion['label'],
+            'url': url,
+        })
+    return JsonResponse({'suggestions': suggestions})
+
+
+@login_required
+def engagement_state(request):
+    """
+    Liked/saved/commented flags for the cards on a page, by article id.
+    Pages built from shared cached fragments (the homepage) render
+    cards without them and ask here once per page load.
+    """
+    article_ids = [
+        int(pk) for pk in request.GET.get('ids', '').split(',')
+        if pk.isdigit()
+    ][:MAX_STATE_ARTICLES]
+    state = get_engagement_state(request.user.id, article_ids)
+    return JsonResponse({
+        'articles': {str(pk): flags for pk, flags in state.items()}
+    })
+
+
 @login_required
 def toggle_like(request, article_id):
-    article = get_object_or_404(Article, id=article_id)
-    user = request.user
-    if user in article.likes.all():
-        article.likes.remove(user)
-        liked = False
-    else:
-        article.likes.add(user)
-        liked = True
+    try:
+        liked, count = toggle_engagement(LIKE, article_id, request.user.id)
+    except Article.DoesNotExist:
+        raise Http404("Article not found")
     return JsonResponse(
-        {'success': True, 'liked': liked, 'likes_count': article.likes.count()}
+        {'success': True, 'liked': liked, 'likes_count': count}
     )
 
 
 @login_required
 def toggle_save(request, article_id):
-    article = get_object_or_404(Article, id=article_id)
-    user = request.user
-    if user in article.saves.all():
-        article.saves.remove(user)
-        saved = False
-    else:
-        article.saves.add(user)
-        saved = True
+    try:
+        saved, count = toggle_engagement(SAVE, article_id, request.user.id)
+    except Article.DoesNotExist:
+        raise Http404("Article not found")
     return JsonResponse(
-        {'success': True, 'saved': saved, 'saves_count': article.saves.count()}
+        {'success': True, 'saved': saved, 'saves_count': count}
     )
 
 
+def get_comment_count(article_id):
+    """
+    Read the stored comment counter (kept up to date by signals).
+    """
+    return Article.objects.values_list(
+        'comment_count', flat=True
+    ).get(id=article_id)
+
+
 def get_sorted_comments(article, sort_order):
     comments = article.comments.filter(parent__isnull=True)
     if sort_order == "most_upvoted":
-        comments = comments.annotate(
-            upvote_count=Count("upvotes")
-        ).order_by("-upvote_count", "-created_at")
+        # Served by the users_comment_score_idx partial index
+        comments = comments.order_by("-score", "-created_at")
     elif sort_order == "newest":
         comments = comments.order_by("-created_at")
     elif sort_order == "oldest":
@@ -170,71 +289,32 @@ def get_sorted_comments(article, sort_order):
     return comments
 
 
-def count_all_comments(comment_qs):
-    """
-    Recursively count all comments and nested replies in a QuerySet.
-    """
-    total = 0
-    for comment in comment_qs:
-        total += 1  # count this comment
-        total += count_all_comments(comment.replies.all())
-    return total
-
-
 def article_detail(request, article_id):
     """
     Display article details along with its comments.
-    Top-level comments are filtered (parent is null)
-    and replies are pre-fetched.
+    The whole comment tree is loaded up front (see comment_tree.py),
+    so the query count does not grow with thread depth.
     Sorting is applied based on the GET parameter 'sort'.
     """
     article = get_object_or_404(Article, id=article_id)
 
-    # Create a unique key for this article in the session
-    session_key = f'viewed_article_{article.id}'
-    if not request.session.get(session_key, False):
-        # Increment view count only if not viewed in this session
-        article.views = F('views') + 1
-        article.save(update_fields=['views'])
-        article.refresh_from_db()
-        # Mark this article as viewed in the session
-        request.session[session_key] = True
+    # Count the view once per visitor, tracked in a Redis HyperLogLog
+    visitor_id, new_cookie = get_visitor_id(request)
+    count_unique_view(article.id, visitor_id)
 
+    apply_pending_views([article])
     sort_order = request.GET.get("sort", "newest")
-
-    unique_comment_ids = (
-        article.comments.filter(parent__isnull=True)
-        .values("user_id", "content")
-        .annotate(latest_id=Max("id"))
-        .values_list("latest_id", flat=True)
-    )
-
-    comments = (
-        Comment.objects.filter(id__in=unique_comment_ids)
-        .select_related("user")
-        .prefetch_related("replies")
-    )
-
-    if sort_order == "newest":
-        comments = comments.order_by("-created_at")
-    elif sort_order == "oldest":
-        comments = comments.order_by("created_at")
-    elif sort_order == "most_upvoted":
-        comments = comments.annotate(
-            upvote_count=Count("upvotes")
-        ).order_by("-upvote_count")
-
-    # Recursively count all comments (top-level and nested replies)
-    comment_count = count_all_comments(comments)
+    comment_tree = load_comment_tree(article, request.user, sort_order)
 
     context = {
         "article": article,
-        "comments": comments.prefetch_related("replies"),
+        "comments": comment_tree.roots,
         "sort_order": sort_order,
         "form": CommentForm(),
-        "comment_count": comment_count,
+        "comment_count": comment_tree.total,
     }
-    return render(request, "news/article_detail.html", context)
+    response = render(request, "news/article_detail.html", context)
+    return set_visitor_cookie(response, new_cookie)
 
 
 @login_required
@@ -252,16 +332,15 @@ def vote_comment(request, comment_id, action):
 
     if request.method == "POST":
         if action == "upvote":
-            comment.upvotes.add(request.user)
-            comment.downvotes.remove(request.user)
+            cast_vote(comment, request.user.id, CommentVote.UPVOTE)
         elif action == "downvote":
-            comment.downvotes.add(request.user)
-            comment.upvotes.remove(request.user)
+            cast_vote(comment, request.user.id, CommentVote.DOWNVOTE)
 
         return JsonResponse({
             "success": True,
-            "upvotes": comment.upvotes.count(),
-            "downvotes": comment.downvotes.count(),
+            "upvotes": comment.upvote_count,
+            "downvotes": comment.downvote_count,
+            "score": comment.score,
         })
     return JsonResponse({"success": False}, status=400)
 
@@ -300,14 +379,8 @@ def post_comment(request, article_id):
 
             comment.save()
 
-            # Compute the updated comment count
-            # (recursively count all top-level comments and their replies)
-            top_level_comments = comment.article.comments.filter(
-                parent__isnull=True
-            )
-            comment_count = count_all_comments(
-                top_level_comments
-            )
+            # Updated comment count (top-level comments and all replies)
+            comment_count = get_comment_count(article_id)
 
             return JsonResponse({
                 'success': True,
@@ -372,13 +445,8 @@ def delete_comment(request, comment_id):
     if request.method == "POST":
         comment.delete()
 
-        # Recompute total comment count for the article
-        top_level_comments = comment.article.comments.filter(
-            parent__isnull=True
-        )
-        comment_count = count_all_comments(
-            top_level_comments
-        )
+        # Current total comment count for the article
+        comment_count = get_comment_count(comment.article_id)
 
         return JsonResponse({
             "success": True,
@@ -418,13 +486,8 @@ def reply_to_comment(request, article_id, parent_comment_id):
             parent=parent_comment
         )
 
-        # Compute the updated comment count using the helper function
-        top_level_comments = new_comment.article.comments.filter(
-            parent__isnull=True
-        )
-        comment_count = count_all_comments(
-            top_level_comments
-        )
+        # Updated comment count
+        comment_count = get_comment_count(article_id)
 
         return JsonResponse({
             'success': True,
@@ -18,8 +18,8 @@ class ProfileAdmin(admin.ModelAdmin):
         'user__username', 'bio'
     )  # Search by username and bio
     list_filter = (
-        'created_at',
-    )  # Filter by creation date
+        'created_at', 'digest_frequency',
+    )  # Filter by creation date and alert delivery
     ordering = (
         '-created_at',
     )  # Order by most recent profile
@@ -73,7 +73,7 @@ class DeletedFilter(admin.SimpleListFilter):
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
         'user', 'article', 'short_content', 'created_at',
-        'parent_link', 'upvote_count', 'downvote_count',
+        'parent_link', 'upvote_count', 'downvote_count', 'score',
         'is_reported', 'is_deleted'
     )
     search_fields = (
@@ -115,14 +115,6 @@ class CommentAdmin(admin.ModelAdmin):
         return "N/A"
     parent_link.short_description = "Parent Comment"
 
-    def upvote_count(self, obj):
-        return obj.upvotes.count()
-    upvote_count.admin_order_field = 'upvotes'
-
-    def downvote_count(self, obj):
-        return obj.downvotes.count()
-    downvote_count.admin_order_field = 'downvotes'
-
     actions = ['mark_as_reviewed']
 
     def mark_as_reviewed(self, request, queryset):
@@ -133,7 +125,7 @@ class CommentAdmin(admin.ModelAdmin):
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('user', 'message', 'read', 'created_at')
+    list_display = ('user', 'message', 'article_count', 'read', 'created_at')
     list_filter = ('read', 'created_at')
     search_fields = ('message', 'user__username')
     ordering = ('-created_at',)
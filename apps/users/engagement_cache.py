@@ -0,0 +1,196 @@
+"""
+Per-user engagement id sets cached in Redis.
+The articles a user liked or saved and the comments they up- or
+downvoted are kept as one Redis set per user and kind, loaded from the
+database the first time they are needed. Membership checks such as
+Comment.has_upvoted are then one SMISMEMBER round trip, for a single
+object or a page of cards.
+Every set holds a LOADED marker, so an empty set can be told from one
+that was never loaded. Changes are written through after commit (see
+the m2m_changed receivers, apps/news/engagement.py and votes.py) and
+additions only touch sets that are already loaded, checked in a Lua
+script like the unread counters; a partial set is never created.
+Clearing a relation from the user's side, or deleting the account,
+drops the set and the next read reloads it. Sets expire after
+ENGAGEMENT_SET_TTL, which bounds any drift, and every check falls back
+to the database when Redis is unavailable.
+Located at: apps/users/engagement_cache.py
+"""
+
+import logging
+
+import redis
+from django.db import transaction
+
+from apps.news.models import Article
+from apps.users.models import CommentVote
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "engagement:"
+
+LIKED = "liked"
+SAVED = "saved"
+UPVOTED = "upvoted"
+DOWNVOTED = "downvoted"
+KINDS = (LIKED, SAVED, UPVOTED, DOWNVOTED)
+
+# Marks a set as loaded; object ids are positive integers
+LOADED = "0"
+
+# Idle users' sets expire; the next read reloads them
+ENGAGEMENT_SET_TTL = 24 * 60 * 60
+
+# SADD only if the set was loaded
+ADD_IF_LOADED = """
+if redis.call('sismember', KEYS[1], ARGV[1]) == 1 then
+    return redis.call('sadd', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def get_set_key(user_id, kind):
+    return f"{KEY_PREFIX}{kind}:{user_id}"
+
+
+def get_relation(kind):
+    """
+    Return (rows queryset, object id field) for a kind.
+    """
+    return {
+        LIKED: (Article.likes.through.objects.all(), "article_id"),
+        SAVED: (Article.saves.through.objects.all(), "article_id"),
+        UPVOTED: (
+            CommentVote.objects.filter(value=CommentVote.UPVOTE),
+            "comment_id",
+        ),
+        DOWNVOTED: (
+            CommentVote.objects.filter(value=CommentVote.DOWNVOTE),
+            "comment_id",
+        ),
+    }[kind]
+
+
+def query_engaged(user_id, kind, object_ids=None):
+    """
+    Read the user's engaged object ids from the database, optionally
+    only among object_ids.
+    """
+    rows, field = get_relation(kind)
+    rows = rows.filter(user_id=user_id)
+    if object_ids is not None:
+        rows = rows.filter(**{f"{field}__in": object_ids})
+    return set(rows.values_list(field, flat=True))
+
+
+def load_engaged(user_id, kind):
+    """
+    Load the user's whole set from the database into Redis.
+    """
+    ids = query_engaged(user_id, kind)
+    key = get_set_key(user_id, kind)
+    try:
+        pipe = redis_client.pipeline()
+        pipe.delete(key)
+        pipe.sadd(key, LOADED, *ids)
+        pipe.expire(key, ENGAGEMENT_SET_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not cache engagement set: {e}")
+    return ids
+
+
+def filter_engaged(user_id, kind, object_ids):
+    """
+    Return the ids among object_ids the user has engaged with.
+    """
+    object_ids = list(object_ids)
+    if not object_ids:
+        return set()
+    try:
+        flags = redis_client.smismember(
+            get_set_key(user_id, kind), [LOADED, *object_ids]
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Engagement cache unavailable: {e}")
+        return query_engaged(user_id, kind, object_ids)
+    if flags[0]:
+        return {pk for pk, flag in zip(object_ids, flags[1:]) if flag}
+    return load_engaged(user_id, kind) & set(object_ids)
+
+
+def has_engaged(user_id, kind, object_id):
+    return object_id in filter_engaged(user_id, kind, [object_id])
+
+
+def _apply_changes(changes):
+    try:
+        add = redis_client.register_script(ADD_IF_LOADED)
+        pipe = redis_client.pipeline(transaction=False)
+        for user_id, kind, object_id, added in changes:
+            key = get_set_key(user_id, kind)
+            if added:
+                add(keys=[key], args=[LOADED, object_id], client=pipe)
+            else:
+                pipe.srem(key, object_id)
+        pipe.execute()
+    except redis.RedisError as e:
+        # Drop the sets rather than leave them wrong
+        logger.warning(f"Could not update engagement sets: {e}")
+        forget_engagement_sets({change[0] for change in changes})
+
+
+def update_engagement_sets(changes):
+    """
+    Apply [(user_id, kind, object_id, added), ...] to the cached sets
+    once the current transaction commits.
+    """
+    changes = list(changes)
+    if changes:
+        transaction.on_commit(lambda: _apply_changes(changes))
+
+
+def forget_engagement_sets(user_ids, kinds=KINDS):
+    """
+    Drop cached sets so the next read reloads them.
+    """
+    keys = [
+        get_set_key(user_id, kind) for user_id in user_ids for kind in kinds
+    ]
+    if not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Could not drop engagement sets: {e}")
+
+
+def track_m2m_change(kind, sender, instance, action, reverse, pk_set,
+                     **kwargs):
+    """
+    m2m_changed handler body keeping the LIKED or SAVED sets in step
+    with ORM changes made from either side of the relation.
+    """
+    if action in ("post_add", "post_remove"):
+        added = action == "post_add"
+        if reverse:
+            changes = [(instance.pk, kind, pk, added) for pk in pk_set]
+        else:
+            changes = [(pk, kind, instance.pk, added) for pk in pk_set]
+        update_engagement_sets(changes)
+    elif action == "pre_clear":
+        if reverse:
+            # user.liked_articles.clear(): drop that user's set
+            transaction.on_commit(
+                lambda: forget_engagement_sets([instance.pk], [kind])
+            )
+            return
+        _, field = get_relation(kind)
+        user_ids = sender.objects.filter(
+            **{field: instance.pk}
+        ).values_list("user_id", flat=True)
+        update_engagement_sets(
+            (user_id, kind, instance.pk, False) for user_id in user_ids
+        )
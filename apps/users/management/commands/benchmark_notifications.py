@@ -0,0 +1,116 @@
+"""
+Benchmark new-article notification fan-out: the old per-follower
+create() loop against the batched, coalescing fan_out_new_articles().
+Synthetic users, follows and articles are created in a transaction that
+is rolled back afterwards, so this can run against a development
+database.
+Usage: python manage.py benchmark_notifications --followers 10000
+Located at: apps/users/management/commands/benchmark_notifications.py
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.news.models import Article, Category
+from apps.users.models import Notification, Profile
+from apps.users.tasks import fan_out_new_articles
+
+
+def legacy_fan_out(articles):
+    """The per-article, per-follower loop the post_save receiver ran."""
+    for article in articles:
+        for profile in Profile.objects.filter(
+            preferred_categories=article.category
+        ):
+            if profile.notifications_enabled:
+                Notification.objects.create(
+                    user=profile.user,
+                    message=(
+                        f"New article in {article.category.name}: "
+                        f"'{article.title}'"
+                    ),
+                    link=article.get_absolute_url(),
+                )
+
+
+def timed(function, *args):
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        start = time.perf_counter()
+        function(*args)
+        seconds = time.perf_counter() - start
+    return seconds, queries
+
+
+class Command(BaseCommand):
+    help = "Compare per-row and batched notification fan-out."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--followers", type=int, default=5000)
+        parser.add_argument("--articles", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            category = Category.objects.create(
+                name="Benchmark", slug="notification-benchmark"
+            )
+            User.objects.bulk_create(
+                User(username=f"notification-benchmark-{n}")
+                for n in range(options["followers"])
+            )
+            users = User.objects.filter(
+                username__startswith="notification-benchmark-"
+            )
+            Profile.objects.bulk_create(
+                Profile(user=user) for user in users
+            )
+            profiles = Profile.objects.filter(user__in=users)
+            Profile.preferred_categories.through.objects.bulk_create(
+                Profile.preferred_categories.through(
+                    profile=profile, category=category
+                )
+                for profile in profiles
+            )
+            articles = Article.objects.bulk_create(
+                Article(
+                    title=f"Benchmark story {n}",
+                    slug=f"notification-benchmark-{n}",
+                    url=f"https://example.com/notification-benchmark/{n}",
+                    category=category,
+                )
+                for n in range(options["articles"])
+            )
+            articles = list(
+                Article.objects.filter(
+                    slug__startswith="notification-benchmark-"
+                ).select_related("category")
+            )
+            expected = len(articles) * options["followers"]
+            self.stdout.write(
+                f"{len(articles)} articles x {options['followers']} "
+                f"followers = {expected} notifications"
+            )
+
+            for label, function, argument in (
+                ("per-row loop", legacy_fan_out, articles),
+                ("batched", fan_out_new_articles,
+                 [article.id for article in articles]),
+            ):
+                Notification.objects.filter(user__in=users).delete()
+                seconds, queries = timed(function, argument)
+                rows = Notification.objects.filter(user__in=users).count()
+                self.stdout.write(
+                    f"{label:14} {seconds * 1000:9.1f} ms "
+                    f"{queries:7} queries {rows:7} rows "
+                    f"{expected / seconds:10.0f} notifications/s"
+                )
+            transaction.set_rollback(True)
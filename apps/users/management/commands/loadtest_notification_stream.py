@@ -0,0 +1,119 @@
+"""
+Load test the notification stream: hold many concurrent event_stream()
+generators in one process, publish events for random users and report
+delivery latency and the memory each open connection costs.
+Streams run in-process against Redis (or an in-memory fake with
+--fake-redis), so this measures the hub and generator overhead, not
+the HTTP server.
+Usage: python manage.py loadtest_notification_stream --connections 5000
+Located at: apps/users/management/commands/loadtest_notification_stream.py
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+import redis.asyncio
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.stream import (
+    NOTIFICATION, NotificationHub, event_stream, get_channel
+)
+
+
+class Command(BaseCommand):
+    help = "Measure concurrent notification stream connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--events", type=int, default=200)
+        parser.add_argument(
+            "--fake-redis", action="store_true",
+            help="Use an in-memory Redis (needs fakeredis).",
+        )
+
+    def handle(self, *args, **options):
+        if options["fake_redis"]:
+            try:
+                import fakeredis
+                import fakeredis.aioredis
+            except ImportError:
+                raise CommandError("--fake-redis needs fakeredis installed.")
+            server = fakeredis.FakeServer()
+
+            def client_factory():
+                return fakeredis.aioredis.FakeRedis(
+                    server=server, decode_responses=True
+                )
+        else:
+            def client_factory():
+                return redis.asyncio.from_url(
+                    settings.REDIS_URL, decode_responses=True
+                )
+
+        results = asyncio.run(self.run(client_factory, options))
+        for label, value in results:
+            self.stdout.write(f"{label:<28} {value}")
+
+    async def run(self, client_factory, options):
+        hub = NotificationHub(client_factory)
+        publisher = client_factory()
+        users = options["users"]
+        received = []
+
+        async def listen(user_id):
+            events = event_stream(
+                user_id, 0, keepalive=60, max_seconds=3600, hub=hub
+            )
+            async for chunk in events:
+                if chunk.startswith(f"event: {NOTIFICATION}"):
+                    data = json.loads(chunk.split("data: ", 1)[1])
+                    received.append(time.perf_counter() - data["sent"])
+
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tasks = [
+            asyncio.create_task(listen(n % users))
+            for n in range(options["connections"])
+        ]
+        while hub.connection_count() < len(tasks):
+            await asyncio.sleep(0.05)
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        expected = 0
+        start = time.perf_counter()
+        for _ in range(options["events"]):
+            user_id = random.randrange(min(users, len(tasks)))
+            expected += len(hub.queues.get(user_id, ()))
+            payload = {"message": "Load test", "sent": time.perf_counter()}
+            await publisher.publish(get_channel(user_id), json.dumps({
+                "event": NOTIFICATION, "data": payload,
+            }))
+        while len(received) < expected:
+            if time.perf_counter() - start > 30:
+                break
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        latencies = sorted(received) or [0]
+        p99 = latencies[int((len(latencies) - 1) * 0.99)]
+        return [
+            ("Connections held", len(tasks)),
+            ("Redis subscriptions", min(users, len(tasks))),
+            ("Events delivered", f"{len(received)}/{expected}"),
+            ("Delivery time (s)", f"{elapsed:.2f}"),
+            ("Latency p50 (ms)", f"{statistics.median(latencies) * 1e3:.1f}"),
+            ("Latency p99 (ms)", f"{p99 * 1e3:.1f}"),
+            ("Memory per connection (KB)",
+             f"{(held - baseline) / len(tasks) / 1024:.1f}"),
+        ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_rows(model, fk_name):
+    rows = (
+        model.objects.filter(**{fk_name: OuterRef("pk")})
+        .order_by().values(fk_name).annotate(n=Count("*")).values("n")
+    )
+    return Coalesce(Subquery(rows), Value(0))
+
+
+def populate_counters(apps, schema_editor):
+    Comment = apps.get_model("users", "Comment")
+    upvotes = Comment._meta.get_field("upvotes").remote_field.through
+    downvotes = Comment._meta.get_field("downvotes").remote_field.through
+    Comment.objects.update(
+        upvote_count=count_rows(upvotes, "comment"),
+        downvote_count=count_rows(downvotes, "comment"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0016_alter_profile_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='downvote_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
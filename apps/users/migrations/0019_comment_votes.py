@@ -0,0 +1,129 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+UPVOTE = 1
+DOWNVOTE = -1
+
+
+def aggregate_votes(model, aggregate, **filters):
+    rows = (
+        model.objects.filter(comment=OuterRef("pk"), **filters)
+        .order_by().values("comment").annotate(n=aggregate).values("n")
+    )
+    return Coalesce(Subquery(rows), Value(0))
+
+
+def copy_votes(apps, schema_editor):
+    """
+    Move the upvotes/downvotes M2M rows into CommentVote. A user found
+    in both tables (possible under the old add-then-remove race) keeps
+    the upvote. The counters are then recomputed from the new table.
+    """
+    Comment = apps.get_model("users", "Comment")
+    CommentVote = apps.get_model("users", "CommentVote")
+    upvotes = Comment._meta.get_field("upvotes").remote_field.through
+    downvotes = Comment._meta.get_field("downvotes").remote_field.through
+
+    for through, value in ((upvotes, UPVOTE), (downvotes, DOWNVOTE)):
+        batch = []
+        rows = through.objects.values_list("user_id", "comment_id")
+        for user_id, comment_id in rows.iterator(chunk_size=5000):
+            batch.append(CommentVote(
+                user_id=user_id, comment_id=comment_id, value=value
+            ))
+            if len(batch) == 5000:
+                CommentVote.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        CommentVote.objects.bulk_create(batch, ignore_conflicts=True)
+
+    Comment.objects.update(
+        upvote_count=aggregate_votes(CommentVote, Count("*"), value=UPVOTE),
+        downvote_count=aggregate_votes(
+            CommentVote, Count("*"), value=DOWNVOTE
+        ),
+        score=aggregate_votes(CommentVote, Sum("value")),
+    )
+
+
+def restore_votes(apps, schema_editor):
+    Comment = apps.get_model("users", "Comment")
+    CommentVote = apps.get_model("users", "CommentVote")
+    for name, value in (("upvotes", UPVOTE), ("downvotes", DOWNVOTE)):
+        through = Comment._meta.get_field(name).remote_field.through
+        through.objects.bulk_create(
+            [
+                through(user_id=user_id, comment_id=comment_id)
+                for user_id, comment_id in CommentVote.objects.filter(
+                    value=value
+                ).values_list("user_id", "comment_id")
+            ],
+            batch_size=5000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0018_notification_digests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentVote',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID',
+                )),
+                ('value', models.SmallIntegerField(
+                    choices=[(1, 'Upvote'), (-1, 'Downvote')]
+                )),
+                ('comment', models.ForeignKey(
+                    on_delete=models.deletion.CASCADE,
+                    related_name='votes', to='users.comment',
+                )),
+                ('user', models.ForeignKey(
+                    on_delete=models.deletion.CASCADE,
+                    related_name='comment_votes',
+                    to=settings.AUTH_USER_MODEL,
+                )),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='commentvote',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'comment'), name='users_commentvote_unique'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='commentvote',
+            constraint=models.CheckConstraint(
+                check=Q(value__in=[1, -1]), name='users_commentvote_value'
+            ),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(copy_votes, restore_votes),
+        migrations.RemoveField(
+            model_name='comment',
+            name='upvotes',
+        ),
+        migrations.RemoveField(
+            model_name='comment',
+            name='downvotes',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(
+                'article', F('score').desc(), F('created_at').desc(),
+                condition=Q(parent__isnull=True),
+                name='users_comment_score_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_daily_digest_cursor(apps, schema_editor):
+    """
+    Start the daily digest after the newest existing article, so the
+    first run neither resends nor skips anything.
+    """
+    Article = apps.get_model('news', 'Article')
+    TaskCursor = apps.get_model('users', 'TaskCursor')
+    newest = Article.objects.aggregate(newest=Max('id'))['newest']
+    TaskCursor.objects.create(name='daily_digest', position=newest or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0011_article_keyset_index'),
+        ('users', '0019_comment_votes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCursor',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID',
+                )),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(
+            seed_daily_digest_cursor, migrations.RunPython.noop
+        ),
+    ]
@@ -4,15 +4,25 @@ categories for news preferences, comments, and notifications.
 Located at: apps/users/models.py
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
+from apps.news.models import CounterFieldsMixin
 
 User = get_user_model()  # Dynamically load user model
 
 
 # User Profile Model
 class Profile(models.Model):
+    DIGEST_INSTANT = "instant"
+    DIGEST_DAILY = "daily"
+    DIGEST_CHOICES = [
+        (DIGEST_INSTANT, "As articles arrive"),
+        (DIGEST_DAILY, "Daily digest"),
+    ]
+
     user = models.OneToOneField(
         User, on_delete=models.CASCADE, related_name="profile"
     )
@@ -25,6 +35,10 @@ class Profile(models.Model):
     notifications_enabled = models.BooleanField(
         default=True
     )
+    # How new-article notifications are delivered
+    digest_frequency = models.CharField(
+        max_length=10, choices=DIGEST_CHOICES, default=DIGEST_INSTANT
+    )
     created_at = models.DateTimeField(
         auto_now_add=True
     )
@@ -36,8 +50,26 @@ class Profile(models.Model):
         return f"{self.user.username}'s Profile"
 
 
+class CommentQuerySet(models.QuerySet):
+    def soft_delete(self):
+        """
+        Soft-delete the comments with one UPDATE, after one DELETE of
+        their votes; the vote counters are zeroed by the same UPDATE, in
+        the same transaction. Returns the number of comments deleted.
+        """
+        from apps.users.votes import delete_votes
+        comments = self.filter(deleted=False)
+        with transaction.atomic():
+            delete_votes(comments)
+            return comments.update(
+                content="[Deleted]", user=None, deleted=True,
+                upvote_count=0, downvote_count=0, score=0,
+                updated_at=timezone.now(),
+            )
+
+
 # Comment Model
-class Comment(models.Model):
+class Comment(CounterFieldsMixin, models.Model):
     user = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -56,13 +88,11 @@ class Comment(models.Model):
         related_name="replies"
     )
 
-    # Voting System (we rely on the many-to-many relationships)
-    upvotes = models.ManyToManyField(
-        User, related_name="upvoted_comments", blank=True
-    )
-    downvotes = models.ManyToManyField(
-        User, related_name="downvoted_comments", blank=True
-    )
+    # Denormalised vote counters, maintained by the vote engine
+    # (apps/users/votes.py); score is upvotes minus downvotes
+    upvote_count = models.PositiveIntegerField(default=0)
+    downvote_count = models.PositiveIntegerField(default=0)
+    score = models.IntegerField(default=0)
 
     # Report field: marks a comment as reported/harmful.
     reported = models.BooleanField(
@@ -74,43 +104,48 @@ class Comment(models.Model):
         default=False
     )
 
+    counter_fields = ("upvote_count", "downvote_count", "score")
+
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # "Most upvoted" top-level comments of an article
+            models.Index(
+                'article', F('score').desc(), F('created_at').desc(),
+                condition=Q(parent__isnull=True),
+                name='users_comment_score_idx',
+            ),
+        ]
 
     def get_replies(self):
         return self.replies.order_by("created_at")
 
     def upvote(self, user):
-        if not self.has_upvoted(user):
-            self.upvotes.add(user)
-            self.downvotes.remove(user)
-            self.save()
+        from apps.users.votes import cast_vote
+        cast_vote(self, user.id, CommentVote.UPVOTE)
 
     def downvote(self, user):
-        if not self.has_downvoted(user):
-            self.downvotes.add(user)
-            self.upvotes.remove(user)
-            self.save()
+        from apps.users.votes import cast_vote
+        cast_vote(self, user.id, CommentVote.DOWNVOTE)
 
     def has_upvoted(self, user):
-        return self.upvotes.filter(id=user.id).exists()
+        # Cached per-user vote sets (see engagement_cache.py)
+        from apps.users.engagement_cache import UPVOTED, has_engaged
+        return has_engaged(user.id, UPVOTED, self.id)
 
     def has_downvoted(self, user):
-        return self.downvotes.filter(id=user.id).exists()
+        from apps.users.engagement_cache import DOWNVOTED, has_engaged
+        return has_engaged(user.id, DOWNVOTED, self.id)
 
     def is_reply(self):
         return self.parent is not None
 
     def delete(self, *args, **kwargs):
-        # Clear M2M relationships
-        self.upvotes.clear()
-        self.downvotes.clear()
-
-        # Soft delete (if preferred)
-        self.content = "[Deleted]"
-        self.user = None
-        self.deleted = True
-        self.save()
+        # Soft delete, dropping the votes along with their counters
+        Comment.objects.filter(pk=self.pk).soft_delete()
+        self.refresh_from_db()
 
     def get_absolute_url(self):
         return reverse("admin:users_comment_change", args=[str(self.id)])
@@ -120,6 +155,44 @@ class Comment(models.Model):
         return f"Comment by {username} on {self.article.title}"
 
 
+class CommentVote(models.Model):
+    """
+    One user's vote on a comment. The unique constraint allows a single
+    row per user and comment, so a vote is changed in place and can
+    never be both up and down.
+    """
+    UPVOTE = 1
+    DOWNVOTE = -1
+    VALUE_CHOICES = [
+        (UPVOTE, "Upvote"),
+        (DOWNVOTE, "Downvote"),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="comment_votes"
+    )
+    comment = models.ForeignKey(
+        Comment, on_delete=models.CASCADE, related_name="votes"
+    )
+    value = models.SmallIntegerField(choices=VALUE_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'comment'], name='users_commentvote_unique'
+            ),
+            models.CheckConstraint(
+                check=Q(value__in=[1, -1]), name='users_commentvote_value'
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.get_value_display()} on comment {self.comment_id} "
+            f"by user {self.user_id}"
+        )
+
+
 class Notification(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='notifications'
@@ -134,11 +207,46 @@ class Notification(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True
     )
+    # Coalescing: notifications sharing a group key (for example
+    # "category:3") are folded into one digest; article_count is how
+    # many articles it stands for and articles the newest few as
+    # {title, url}
+    group_key = models.CharField(
+        max_length=50, blank=True, default=""
+    )
+    article_count = models.PositiveIntegerField(
+        default=0
+    )
+    articles = models.JSONField(
+        default=list, blank=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'group_key', 'created_at'],
+                name='users_notification_digest_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.username}: {self.message[:20]}"
 
 
+# Progress marker for periodic tasks (e.g. the last article id covered
+# by the daily digest), kept in the database so it survives cache
+# flushes and Redis evictions
+class TaskCursor(models.Model):
+    DAILY_DIGEST = "daily_digest"
+
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.position}"
+
+
 # Contact Message Model
 class ContactMessage(models.Model):
     name = models.CharField(max_length=255)
@@ -1,14 +1,24 @@
 """
 Signal handlers for user-related events like
-profile creation and notifications.
+profile creation and notifications, and for the comment and vote
+counters stored on Article and Comment.
 Located at: apps/users/signals.py
 """
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.dispatch import receiver
 from .models import Profile, Notification, Comment
 from apps.news.models import Article
+from apps.news.ingestion import articles_ingested
+from apps.news.counters import adjust_counter
+from apps.news.trending import record_engagement
+from .tasks import notify_new_articles
+from .unread import adjust_unread_counts, forget_unread_counts
+from .engagement_cache import forget_engagement_sets
+from .votes import remove_user_votes
+from .stream import NOTIFICATION, publish_events
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,21 +46,42 @@ def save_profile(sender, instance, **kwargs):
 def notify_new_article(sender, instance, created, **kwargs):
     """
     Notify users when a new article is posted in a category they follow.
+    Ingested articles are notified per batch by notify_ingested_articles.
     """
-    if created and instance.category:
-        for profile in Profile.objects.filter(
-            preferred_categories=instance.category
-        ):
-            if profile.notifications_enabled:
-                message = (
-                    f"New article in {instance.category.name}: "
-                    f"'{instance.title}'"
-                )
-                Notification.objects.create(
-                    user=profile.user,
-                    message=message,
-                    link=instance.get_absolute_url()
-                )
+    if created and instance.category_id and not kwargs.get("ingested"):
+        schedule_notifications([instance.id])
+
+
+@receiver(articles_ingested, sender=Article)
+def notify_ingested_articles(sender, articles, **kwargs):
+    schedule_notifications([
+        article.id for article in articles if article.category_id
+    ])
+
+
+def schedule_notifications(article_ids):
+    """
+    Queue one fan-out task once the articles are committed.
+    """
+    if article_ids:
+        transaction.on_commit(
+            lambda: notify_new_articles.delay(article_ids)
+        )
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    """
+    Keep the cached unread counter in step with notifications created
+    one at a time (bulk fan-out adjusts it itself), and push them to
+    the user's open notification streams.
+    """
+    if created and not instance.read:
+        adjust_unread_counts({instance.user_id: 1})
+        event = (instance.user_id, NOTIFICATION, {
+            "message": instance.message, "link": instance.link or "",
+        })
+        transaction.on_commit(lambda: publish_events([event]))
 
 
 @receiver(post_save, sender=Comment)
@@ -73,3 +104,45 @@ def notify_comment_reply(sender, instance, created, **kwargs):
                 message=message,
                 link=instance.article.get_absolute_url()
             )
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    """
+    Keep Article.comment_count and trending in step with new comments.
+    Soft-deleted comments stay in the count, as they stay in the thread.
+    """
+    if created:
+        article_id = instance.article_id
+        adjust_counter(Article, [article_id], "comment_count", 1)
+        transaction.on_commit(
+            lambda: record_engagement("comment", {article_id: 1})
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def count_removed_comment(sender, instance, **kwargs):
+    adjust_counter(Article, [instance.article_id], "comment_count", -1)
+
+
+@receiver(pre_delete, sender=User)
+def release_user_counters(sender, instance, **kwargs):
+    """
+    Deleting a user cascades through the like, save and vote tables
+    without updating the counters, so remove those rows first, and
+    soft-delete the user's comments with their votes.
+    """
+    instance.liked_articles.clear()
+    instance.saved_articles.clear()
+    remove_user_votes(instance.id)
+    Comment.objects.filter(user=instance).soft_delete()
+
+
+@receiver(post_delete, sender=User)
+def forget_user_unread_count(sender, instance, **kwargs):
+    forget_unread_counts([instance.id])
+
+
+@receiver(post_delete, sender=User)
+def forget_user_engagement_sets(sender, instance, **kwargs):
+    forget_engagement_sets([instance.id])
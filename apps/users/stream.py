@@ -0,0 +1,164 @@
+"""
+Server-sent notification events over Redis pub/sub.
+Whenever a user's unread counter changes, or a notification is created
+for them, an event is published on their channel. The streaming view
+holds one asyncio queue per open browser tab. Each worker process has
+a single pub/sub connection (NotificationHub) that subscribes to a
+user's channel while at least one of their tabs is connected and
+dispatches messages to the matching queues. An idle connection
+therefore costs no database query and no Redis round trip, only a
+comment line every STREAM_KEEPALIVE_SECONDS to keep proxies from
+closing it.
+Streams end after STREAM_MAX_SECONDS and the browser reconnects on its
+own, which bounds the life of any connection whose client vanished
+without the server noticing.
+Located at: apps/users/stream.py
+"""
+
+import asyncio
+import json
+import logging
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "notifications:user:"
+
+STREAM_KEEPALIVE_SECONDS = 20
+STREAM_MAX_SECONDS = 300
+# Milliseconds the browser waits before reconnecting
+STREAM_RETRY_MS = 3000
+
+UNREAD = "unread"
+NOTIFICATION = "notification"
+
+
+def get_channel(user_id):
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+def publish_events(events):
+    """
+    Publish [(user_id, event type, data dict), ...] in one pipeline.
+    Nobody listening is not an error: the event is simply dropped.
+    """
+    if not events:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for user_id, event, data in events:
+            pipe.publish(
+                get_channel(user_id),
+                json.dumps({"event": event, "data": data}),
+            )
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish notification events: {e}")
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class NotificationHub:
+    """
+    One pub/sub connection per process, shared by every open stream.
+    """
+
+    def __init__(self, client_factory=None):
+        self.client_factory = client_factory or (
+            lambda: redis.asyncio.from_url(
+                settings.REDIS_URL, decode_responses=True
+            )
+        )
+        self.queues = {}
+        self.pubsub = None
+        self.reader = None
+        self.lock = None
+
+    async def subscribe(self, user_id):
+        """
+        Return a queue receiving (event, data) pairs for the user.
+        """
+        self.lock = self.lock or asyncio.Lock()
+        queue = asyncio.Queue(maxsize=100)
+        async with self.lock:
+            if self.pubsub is None:
+                self.pubsub = self.client_factory().pubsub()
+            listeners = self.queues.setdefault(user_id, set())
+            if not listeners:
+                await self.pubsub.subscribe(get_channel(user_id))
+            listeners.add(queue)
+            if self.reader is None or self.reader.done():
+                self.reader = asyncio.create_task(self.read())
+        return queue
+
+    async def unsubscribe(self, user_id, queue):
+        async with self.lock:
+            listeners = self.queues.get(user_id, set())
+            listeners.discard(queue)
+            if not listeners:
+                self.queues.pop(user_id, None)
+                await self.pubsub.unsubscribe(get_channel(user_id))
+
+    def connection_count(self):
+        return sum(len(listeners) for listeners in self.queues.values())
+
+    async def read(self):
+        """
+        Dispatch published messages to the queues of that user's tabs.
+        """
+        while self.queues:
+            try:
+                message = await self.pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Notification stream reader failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message is None:
+                continue
+            user_id = int(message["channel"][len(CHANNEL_PREFIX):])
+            payload = json.loads(message["data"])
+            for queue in list(self.queues.get(user_id, ())):
+                try:
+                    queue.put_nowait((payload["event"], payload["data"]))
+                except asyncio.QueueFull:
+                    # A stalled tab misses events; the next count fixes it
+                    pass
+
+
+hub = NotificationHub()
+
+
+async def event_stream(user_id, unread_count, keepalive=None,
+                       max_seconds=None, hub=hub):
+    """
+    Yield the SSE body for one browser tab: the current unread count,
+    then every event published for the user until max_seconds.
+    """
+    keepalive = keepalive or STREAM_KEEPALIVE_SECONDS
+    max_seconds = max_seconds or STREAM_MAX_SECONDS
+    queue = await hub.subscribe(user_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    try:
+        yield f"retry: {STREAM_RETRY_MS}\n"
+        yield format_event(UNREAD, {"count": unread_count})
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event, data = await asyncio.wait_for(
+                    queue.get(), timeout=min(keepalive, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event, data)
+    finally:
+        await hub.unsubscribe(user_id, queue)
@@ -0,0 +1,261 @@
+"""
+Celery tasks for the users app.
+New-article notifications are fanned out here rather than inside the
+request or ingestion transaction that created the articles: followers
+of every affected category are read in one query and notifications are
+written with chunked bulk inserts.
+Notifications are coalesced per user and category: a batch with many
+articles in one category writes one digest ("12 new articles in
+Sport"), and articles arriving within NOTIFICATION_DIGEST_WINDOW_MINUTES
+of an unread digest are folded into it. Users who chose the daily
+digest get one per category from send_daily_digests instead.
+Clearing a prolific user's comments is also handed off here.
+Located at: apps/users/tasks.py
+"""
+
+import logging
+from collections import Counter
+from datetime import timedelta
+from itertools import islice
+
+import redis
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.news.models import Article
+from apps.users.models import (
+    Comment, Notification, Profile, TaskCursor
+)
+from apps.users.unread import (
+    adjust_unread_counts, reconcile_unread_counts
+)
+
+logger = logging.getLogger(__name__)
+
+# Notifications per INSERT or UPDATE
+NOTIFICATION_BATCH_SIZE = 1000
+# Newest articles linked from a digest
+DIGEST_MAX_LINKS = 5
+
+
+def get_digest_window():
+    minutes = getattr(settings, "NOTIFICATION_DIGEST_WINDOW_MINUTES", 60)
+    return timedelta(minutes=minutes)
+
+
+def get_followers(category_ids, frequency=Profile.DIGEST_INSTANT):
+    """
+    Map each category id to the ids of users who follow it, have
+    notifications enabled and chose `frequency`, in one query.
+    """
+    follows = Profile.preferred_categories.through.objects.filter(
+        category_id__in=category_ids,
+        profile__notifications_enabled=True,
+        profile__digest_frequency=frequency,
+    ).values_list("category_id", "profile__user_id")
+    followers = {}
+    for category_id, user_id in follows:
+        followers.setdefault(category_id, []).append(user_id)
+    return followers
+
+
+def group_by_category(articles):
+    """
+    Map category id to (category, [article links, newest first]).
+    """
+    groups = {}
+    for article in sorted(articles, key=lambda a: a.id, reverse=True):
+        _, links = groups.setdefault(
+            article.category_id, (article.category, [])
+        )
+        links.append({
+            "title": article.title, "url": article.get_absolute_url(),
+        })
+    return groups
+
+
+def get_group_key(category_id):
+    return f"category:{category_id}"
+
+
+def describe_digest(notification, category):
+    """
+    Set the message and link of a new-article notification from its
+    article_count and articles.
+    """
+    if notification.article_count == 1:
+        newest = notification.articles[0]
+        notification.message = (
+            f"New article in {category.name}: '{newest['title']}'"
+        )
+        notification.link = newest["url"]
+    else:
+        notification.message = (
+            f"{notification.article_count} new articles in {category.name}"
+        )
+        notification.link = (
+            f"{reverse('news:search_results')}?category={category.slug}"
+        )
+    return notification
+
+
+def new_digest(user_id, category, links):
+    return describe_digest(Notification(
+        user_id=user_id, group_key=get_group_key(category.id),
+        article_count=len(links),
+        articles=links[:DIGEST_MAX_LINKS],
+    ), category)
+
+
+def get_open_digests(category_ids):
+    """
+    Unread new-article notifications still inside the digest window,
+    keyed by (user id, group key); the newest wins.
+    """
+    since = timezone.now() - get_digest_window()
+    digests = Notification.objects.filter(
+        group_key__in=[get_group_key(pk) for pk in category_ids],
+        read=False, created_at__gte=since,
+    ).order_by("created_at")
+    return {
+        (digest.user_id, digest.group_key): digest for digest in digests
+    }
+
+
+def write_notifications(created, updated, batch_size):
+    """
+    Bulk insert the `created` iterable in chunks and bulk update the
+    `updated` digests; returns the number of rows written.
+    """
+    written = Counter()
+    with transaction.atomic():
+        while batch := list(islice(created, batch_size)):
+            Notification.objects.bulk_create(batch)
+            written.update(
+                notification.user_id for notification in batch
+            )
+        Notification.objects.bulk_update(
+            updated, ["message", "link", "article_count", "articles"],
+            batch_size=batch_size,
+        )
+        # Folded digests were already unread, so only new rows count
+        adjust_unread_counts(written)
+    return written.total() + len(updated)
+
+
+def fan_out_new_articles(article_ids, batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Notify the followers of each article's category, one digest per
+    user and category; returns the number of notification rows
+    written (inserted or folded into an open digest).
+    """
+    articles = Article.objects.filter(
+        id__in=article_ids, category__isnull=False
+    ).select_related("category")
+    groups = group_by_category(articles)
+    if not groups:
+        return 0
+    followers = get_followers(groups)
+    open_digests = get_open_digests(groups)
+
+    updated = []
+    fresh = []
+    for category_id, (category, links) in groups.items():
+        for user_id in followers.get(category_id, ()):
+            digest = open_digests.get(
+                (user_id, get_group_key(category_id))
+            )
+            if digest is None:
+                fresh.append((user_id, category, links))
+                continue
+            digest.article_count += len(links)
+            digest.articles = (links + digest.articles)[:DIGEST_MAX_LINKS]
+            updated.append(describe_digest(digest, category))
+    created = (new_digest(*args) for args in fresh)
+    return write_notifications(created, updated, batch_size)
+
+
+@shared_task
+def notify_new_articles(article_ids):
+    """
+    Send new-article notifications for one ingestion batch (or one
+    article created elsewhere).
+    """
+    count = fan_out_new_articles(article_ids)
+    logger.info(
+        f"Sent {count} notifications for {len(article_ids)} new articles."
+    )
+    return f"{count} notifications sent."
+
+
+@shared_task
+def send_daily_digests():
+    """
+    Send daily-digest users one notification per followed category
+    covering the articles added since the previous run.
+    Progress is an article id kept in a TaskCursor row, advanced in the
+    transaction that writes the digests and locked for its duration, so
+    a lost cache or an overlapping run never resends or skips articles.
+    Ids rather than published_at, which feeds often backdate.
+    """
+    with transaction.atomic():
+        cursor = TaskCursor.objects.select_for_update().filter(
+            name=TaskCursor.DAILY_DIGEST
+        ).first()
+        newest = Article.objects.aggregate(newest=Max("id"))["newest"] or 0
+        if cursor is None:
+            # Migration 0020 seeds the row; without it, start from now
+            TaskCursor.objects.create(
+                name=TaskCursor.DAILY_DIGEST, position=newest
+            )
+            logger.warning("Daily digest cursor was missing; reset it.")
+            return "0 daily digests sent."
+
+        articles = list(Article.objects.filter(
+            id__gt=cursor.position, id__lte=newest,
+            category__isnull=False,
+        ).select_related("category"))
+        count = 0
+        if articles:
+            groups = group_by_category(articles)
+            followers = get_followers(groups, Profile.DIGEST_DAILY)
+            created = (
+                new_digest(user_id, category, links)
+                for category_id, (category, links) in groups.items()
+                for user_id in followers.get(category_id, ())
+            )
+            count = write_notifications(
+                created, [], NOTIFICATION_BATCH_SIZE
+            )
+        cursor.position = max(cursor.position, newest)
+        cursor.save(update_fields=["position", "updated_at"])
+    logger.info(f"Sent {count} daily digests.")
+    return f"{count} daily digests sent."
+
+
+@shared_task
+def reconcile_unread_notification_counts():
+    """
+    Repair cached unread counters that drifted from the database.
+    """
+    try:
+        corrected = reconcile_unread_counts()
+    except redis.RedisError as e:
+        logger.warning(f"Could not reconcile unread counters: {e}")
+        return "Unread counters not reconciled."
+    logger.info(f"Corrected {corrected} unread counters.")
+    return f"{corrected} unread counters corrected."
+
+
+@shared_task
+def clear_user_comments(user_id):
+    """
+    Soft-delete all of a user's comments (see clear_comments).
+    """
+    count = Comment.objects.filter(user_id=user_id).soft_delete()
+    logger.info(f"Cleared {count} comments of user {user_id}.")
+    return f"{count} comments cleared."
@@ -0,0 +1,151 @@
+"""
+Tests for the cached per-user engagement sets.
+Located at: apps/users/tests/test_engagement_cache.py
+"""
+
+import pytest
+import redis
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news.engagement import LIKE, toggle_engagement
+from apps.news.models import Article
+from apps.users import engagement_cache
+from apps.users.engagement_cache import (
+    LIKED, SAVED, UPVOTED, filter_engaged, get_set_key
+)
+from apps.users.models import Comment
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+AJAX = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+
+@pytest.fixture
+def user(fake_redis):
+    return User.objects.create_user(username="reader", password="pw")
+
+
+@pytest.fixture
+def article(db):
+    return Article.objects.create(
+        title="Story", url="https://example.com/story", content="x"
+    )
+
+
+@pytest.fixture
+def comments(article):
+    author = User.objects.create_user(username="author", password="pw")
+    return [
+        Comment.objects.create(article=article, user=author, content=f"C{i}")
+        for i in range(2)
+    ]
+
+
+def test_membership_is_loaded_once_then_answered_from_redis(
+    user, comments
+):
+    comments[0].upvote(user)
+    with CaptureQueriesContext(connection) as ctx:
+        assert comments[0].has_upvoted(user)
+    assert len(ctx.captured_queries) == 1
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert comments[0].has_upvoted(user)
+        assert not comments[1].has_upvoted(user)
+    assert len(ctx.captured_queries) == 0
+
+
+def test_votes_are_written_through(
+    client, user, comments, django_capture_on_commit_callbacks
+):
+    comment = comments[0]
+    assert not comment.has_upvoted(user)
+    assert not comment.has_downvoted(user)
+    client.force_login(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("news:vote_comment", args=[comment.id, "upvote"]))
+    with CaptureQueriesContext(connection) as ctx:
+        assert comment.has_upvoted(user)
+        assert not comment.has_downvoted(user)
+    assert len(ctx.captured_queries) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(
+            reverse("news:vote_comment", args=[comment.id, "downvote"])
+        )
+    assert not comment.has_upvoted(user)
+    assert comment.has_downvoted(user)
+
+
+def test_toggles_are_written_through(
+    user, article, fake_redis, django_capture_on_commit_callbacks
+):
+    assert filter_engaged(user.id, LIKED, [article.id]) == set()
+    with django_capture_on_commit_callbacks(execute=True):
+        toggle_engagement(LIKE, article.id, user.id)
+    assert fake_redis.sismember(get_set_key(user.id, LIKED), article.id)
+    with django_capture_on_commit_callbacks(execute=True):
+        toggle_engagement(LIKE, article.id, user.id)
+    assert filter_engaged(user.id, LIKED, [article.id]) == set()
+
+
+def test_changes_do_not_create_unloaded_sets(
+    user, article, fake_redis, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        article.saves.add(user)
+    assert not fake_redis.exists(get_set_key(user.id, SAVED))
+    assert filter_engaged(user.id, SAVED, [article.id]) == {article.id}
+
+
+def test_clearing_saved_articles_drops_the_set(
+    client, user, article, fake_redis, django_capture_on_commit_callbacks
+):
+    article.saves.add(user)
+    filter_engaged(user.id, SAVED, [article.id])
+    client.force_login(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("users:clear_saved_articles"), **AJAX)
+    assert not fake_redis.exists(get_set_key(user.id, SAVED))
+    assert filter_engaged(user.id, SAVED, [article.id]) == set()
+
+
+def test_deleted_comments_leave_the_voters_sets(
+    user, comments, django_capture_on_commit_callbacks
+):
+    comment = comments[0]
+    comment.upvote(user)
+    assert comment.has_upvoted(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.delete()
+    assert not comment.has_upvoted(user)
+
+
+def test_deleting_the_account_drops_every_set(
+    user, article, fake_redis, django_capture_on_commit_callbacks
+):
+    article.likes.add(user)
+    filter_engaged(user.id, LIKED, [article.id])
+    filter_engaged(user.id, UPVOTED, [1])
+    with django_capture_on_commit_callbacks(execute=True):
+        user.delete()
+    assert not fake_redis.keys("engagement:*")
+
+
+def test_falls_back_to_database_without_redis(
+    user, comments, monkeypatch
+):
+    comments[1].upvote(user)
+
+    class BrokenRedis:
+        def smismember(self, *args, **kwargs):
+            raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(engagement_cache, "redis_client", BrokenRedis())
+    assert comments[1].has_upvoted(user)
+    assert not comments[0].has_upvoted(user)
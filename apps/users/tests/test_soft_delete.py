@@ -0,0 +1,138 @@
+"""
+Tests for the batched comment soft-delete.
+Located at: apps/users/tests/test_soft_delete.py
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news.counters import verify_counters
+from apps.news.models import Article
+from apps.users.engagement_cache import UPVOTED, filter_engaged
+from apps.users.models import Comment, CommentVote
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+AJAX = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+
+@pytest.fixture
+def article(db):
+    return Article.objects.create(
+        title="Story", url="https://example.com/story", content="x"
+    )
+
+
+@pytest.fixture
+def author(db):
+    return User.objects.create_user(username="author", password="pw")
+
+
+@pytest.fixture
+def voter(db):
+    return User.objects.create_user(username="voter", password="pw")
+
+
+def post_comments(article, user, count):
+    return [
+        Comment.objects.create(article=article, user=user, content=f"C{i}")
+        for i in range(count)
+    ]
+
+
+def assert_soft_deleted(comments):
+    for comment in comments:
+        comment.refresh_from_db()
+        assert comment.deleted
+        assert comment.content == "[Deleted]"
+        assert comment.user is None
+        assert comment.score == 0
+
+
+def test_query_count_does_not_grow_with_comments(article, author, voter):
+    few = post_comments(article, author, 2)
+    many = post_comments(article, voter, 30)
+    for comment in few + many:
+        comment.upvote(voter)
+
+    def soft_delete(user):
+        with CaptureQueriesContext(connection) as ctx:
+            Comment.objects.filter(user=user).soft_delete()
+        return len(ctx.captured_queries)
+
+    assert soft_delete(author) == soft_delete(voter)
+    assert_soft_deleted(few + many)
+    assert not CommentVote.objects.exists()
+    assert not any(verify_counters().values())
+
+
+def test_soft_delete_skips_deleted_comments(article, author):
+    comments = post_comments(article, author, 3)
+    comments[0].delete()
+    assert Comment.objects.filter(article=article).soft_delete() == 2
+    article.refresh_from_db()
+    assert article.comment_count == 3
+
+
+def test_voters_sets_are_updated(
+    article, author, voter, fake_redis, django_capture_on_commit_callbacks
+):
+    [comment] = post_comments(article, author, 1)
+    comment.upvote(voter)
+    assert filter_engaged(voter.id, UPVOTED, [comment.id])
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.filter(user=author).soft_delete()
+    assert not filter_engaged(voter.id, UPVOTED, [comment.id])
+
+
+def test_clear_comments_in_the_request(client, article, author, voter):
+    comments = post_comments(article, author, 3)
+    comments[0].upvote(voter)
+    client.force_login(author)
+    response = client.post(reverse("users:clear_comments"), **AJAX)
+    assert response.json() == {
+        "success": True, "message": "All comments cleared."
+    }
+    assert_soft_deleted(comments)
+
+
+def test_large_clears_are_queued(
+    client, settings, article, author, django_capture_on_commit_callbacks
+):
+    settings.COMMENT_CLEAR_ASYNC_THRESHOLD = 2
+    comments = post_comments(article, author, 3)
+    client.force_login(author)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(reverse("users:clear_comments"), **AJAX)
+    assert response.json()["queued"]
+    assert_soft_deleted(comments)
+
+
+def test_remove_comment_only_removes_own_comments(
+    client, article, author, voter
+):
+    [comment] = post_comments(article, author, 1)
+    client.force_login(voter)
+    response = client.post(
+        reverse("users:remove_comment"), {"comment_id": comment.id}, **AJAX
+    )
+    assert response.status_code == 404
+    client.force_login(author)
+    client.post(
+        reverse("users:remove_comment"), {"comment_id": comment.id}, **AJAX
+    )
+    assert_soft_deleted([comment])
+
+
+def test_deleting_the_account_soft_deletes_comments(article, author, voter):
+    comments = post_comments(article, author, 2)
+    comments[1].downvote(voter)
+    author.delete()
+    assert_soft_deleted(comments)
+    assert not CommentVote.objects.exists()
+    assert not any(verify_counters().values())
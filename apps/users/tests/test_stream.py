@@ -0,0 +1,139 @@
+"""
+Tests for the server-sent notification stream.
+Located at: apps/users/tests/test_stream.py
+"""
+
+import asyncio
+import json
+
+import pytest
+import redis
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import AsyncRequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.users import stream
+from apps.users.models import Notification
+from apps.users.stream import (
+    NotificationHub, event_stream, get_channel, publish_events
+)
+from apps.users.unread import get_unread_count
+from apps.users.views import notification_stream
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def hub(fake_redis, monkeypatch):
+    """
+    A hub whose async client shares a fake server with the publisher.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    aioredis = pytest.importorskip("fakeredis.aioredis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(stream, "redis_client", fakeredis.FakeStrictRedis(
+        server=server, decode_responses=True
+    ))
+    return NotificationHub(
+        lambda: aioredis.FakeRedis(server=server, decode_responses=True)
+    )
+
+
+@pytest.fixture
+def user(fake_redis):
+    return User.objects.create_user(username="reader", password="pw")
+
+
+def parse(chunk):
+    lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_stream_sends_the_count_then_published_events(hub):
+    async def run():
+        events = event_stream(7, 3, hub=hub)
+        assert await anext(events) == "retry: 3000\n"
+        assert parse(await anext(events)) == ("unread", {"count": 3})
+        assert hub.connection_count() == 1
+        publish_events([
+            (8, "unread", {"count": 1}), (7, "unread", {"count": 4}),
+        ])
+        assert parse(await anext(events)) == ("unread", {"count": 4})
+        await events.aclose()
+        assert hub.connection_count() == 0
+
+    asyncio.run(run())
+
+
+def test_idle_stream_sends_keepalives_until_max_seconds(hub):
+    async def run():
+        return [
+            chunk async for chunk in event_stream(
+                7, 0, keepalive=0.05, max_seconds=0.2, hub=hub
+            )
+        ]
+
+    with CaptureQueriesContext(connection) as ctx:
+        chunks = asyncio.run(run())
+    assert len(ctx.captured_queries) == 0
+    assert chunks.count(": keepalive\n\n") >= 2
+    assert hub.connection_count() == 0
+
+
+def test_new_notifications_are_published_after_commit(
+    user, fake_redis, django_capture_on_commit_callbacks
+):
+    get_unread_count(user.id)
+    pubsub = fake_redis.pubsub()
+    pubsub.subscribe(get_channel(user.id))
+    with django_capture_on_commit_callbacks(execute=True):
+        Notification.objects.create(user=user, message="Hi", link="/a/")
+
+    messages = []
+    while message := pubsub.get_message():
+        if message["type"] == "message":
+            messages.append(json.loads(message["data"]))
+    assert messages == [
+        {"event": "unread", "data": {"count": 1}},
+        {"event": "notification", "data": {"message": "Hi", "link": "/a/"}},
+    ]
+
+
+def test_publishing_survives_redis_outage(monkeypatch):
+    class BrokenRedis:
+        def pipeline(self, *args, **kwargs):
+            raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(stream, "redis_client", BrokenRedis())
+    publish_events([(1, "unread", {"count": 1})])
+
+
+def test_stream_requires_login():
+    request = AsyncRequestFactory().get(reverse("users:notification_stream"))
+    request.user = AnonymousUser()
+    response = async_to_sync(notification_stream)(request)
+    assert response.status_code == 401
+
+
+def test_stream_response_is_unbuffered_event_stream(user):
+    request = AsyncRequestFactory().get(reverse("users:notification_stream"))
+    request.user = user
+    response = async_to_sync(notification_stream)(request)
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "text/event-stream"
+    assert response["Cache-Control"] == "no-cache"
+    assert response["X-Accel-Buffering"] == "no"
+
+
+def test_stream_is_refused_without_asgi(client, user):
+    # The test client is WSGI, which would buffer the whole stream
+    client.force_login(user)
+    response = client.get(reverse("users:notification_stream"))
+    assert response.status_code == 204
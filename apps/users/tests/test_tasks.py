@@ -0,0 +1,243 @@
+"""
+Tests for the batched new-article notification fan-out.
+Located at: apps/users/tests/test_tasks.py
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.news.ingestion import ingest_articles
+from apps.news.models import Article, Category
+from apps.users.models import Notification, Profile, TaskCursor
+from apps.users.tasks import (
+    fan_out_new_articles, notify_new_articles, send_daily_digests
+)
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+def make_follower(name, *categories, enabled=True):
+    user = User.objects.create_user(username=name, password="pw")
+    user.profile.preferred_categories.add(*categories)
+    if not enabled:
+        user.profile.notifications_enabled = False
+        user.profile.save()
+    return user
+
+
+def test_fan_out_notifies_enabled_followers_in_bulk():
+    politics = Category.objects.create(name="Politics", slug="politics")
+    sport = Category.objects.create(name="Sport", slug="sport")
+    alice = make_follower("alice", politics, sport)
+    bob = make_follower("bob", sport)
+    make_follower("carol", politics, enabled=False)
+    vote = Article.objects.create(
+        title="Vote", url="https://example.com/1", category=politics
+    )
+    derby = Article.objects.create(
+        title="Derby", url="https://example.com/2", category=sport
+    )
+    Notification.objects.all().delete()
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert fan_out_new_articles([vote.id, derby.id], batch_size=2) == 3
+    # articles, followers, open digests, two INSERTs, savepoint pair
+    assert len(ctx.captured_queries) <= 7
+    assert set(Notification.objects.values_list("user", "link")) == {
+        (alice.id, vote.get_absolute_url()),
+        (alice.id, derby.get_absolute_url()),
+        (bob.id, derby.get_absolute_url()),
+    }
+    assert Notification.objects.filter(user=alice).first().message in (
+        "New article in Politics: 'Vote'", "New article in Sport: 'Derby'"
+    )
+
+
+def test_article_notifications_wait_for_commit(
+    django_capture_on_commit_callbacks
+):
+    category = Category.objects.create(name="Tech", slug="tech")
+    user = make_follower("dev", category)
+    with django_capture_on_commit_callbacks() as callbacks:
+        Article.objects.create(
+            title="Chips", url="https://example.com/c", category=category
+        )
+    assert not Notification.objects.exists()
+    for callback in callbacks:
+        callback()
+    assert Notification.objects.filter(user=user).count() == 1
+
+
+def test_one_task_per_ingestion_batch(django_capture_on_commit_callbacks):
+    category = Category.objects.create(name="General", slug="general")
+    make_follower("reader", category)
+    payload = [
+        {
+            "title": f"Story {n}", "url": f"https://example.com/s{n}",
+            "publishedAt": "2024-01-01T00:00:00Z",
+            "source": {"name": "Wire"}, "content": "Text.",
+        }
+        for n in range(5)
+    ]
+    with mock.patch.object(
+        notify_new_articles, "delay", wraps=notify_new_articles.delay
+    ) as delay:
+        with django_capture_on_commit_callbacks(execute=True):
+            ingest_articles(payload)
+    delay.assert_called_once()
+    assert len(delay.call_args.args[0]) == 5
+    # Coalesced into one digest for the reader
+    digest = Notification.objects.get()
+    assert digest.article_count == 5
+
+
+def test_benchmark_command_rolls_back(capsys):
+    call_command("benchmark_notifications", followers=20, articles=2)
+    assert "batched" in capsys.readouterr().out
+    assert not Notification.objects.exists()
+    assert not User.objects.exists()
+
+
+def test_articles_in_a_category_coalesce_per_user(settings):
+    settings.NOTIFICATION_DIGEST_WINDOW_MINUTES = 60
+    sport = Category.objects.create(name="Sport", slug="sport")
+    fan = make_follower("fan", sport)
+    first, second, third = (
+        Article.objects.create(
+            title=title, url=f"https://example.com/{title}", category=sport
+        )
+        for title in ("Derby", "Transfer", "Final")
+    )
+    Notification.objects.all().delete()
+
+    fan_out_new_articles([first.id])
+    digest = Notification.objects.get(user=fan)
+    assert digest.message == "New article in Sport: 'Derby'"
+    assert digest.link == first.get_absolute_url()
+
+    fan_out_new_articles([second.id, third.id])
+    digest = Notification.objects.get(user=fan)
+    assert digest.article_count == 3
+    assert digest.message == "3 new articles in Sport"
+    assert digest.link.endswith("?category=sport")
+    assert [item["title"] for item in digest.articles] == [
+        "Final", "Transfer", "Derby"
+    ]
+
+    # A read digest, or one outside the window, starts a new one
+    digest.read = True
+    digest.save()
+    fan_out_new_articles([third.id])
+    assert Notification.objects.filter(user=fan).count() == 2
+
+
+def test_coalescing_cuts_rows_by_an_order_of_magnitude():
+    sport = Category.objects.create(name="Sport", slug="sport")
+    for n in range(10):
+        make_follower(f"fan{n}", sport)
+    articles = [
+        Article.objects.create(
+            title=f"Story {n}", url=f"https://example.com/{n}",
+            category=sport,
+        )
+        for n in range(20)
+    ]
+    Notification.objects.all().delete()
+    fan_out_new_articles([article.id for article in articles])
+    # 20 articles x 10 followers would have been 200 rows
+    assert Notification.objects.count() == 10
+
+
+def test_daily_digest_users_wait_for_the_daily_task(client):
+    world = Category.objects.create(name="World", slug="world")
+    instant = make_follower("instant", world)
+    daily = make_follower("daily", world)
+    daily.profile.digest_frequency = Profile.DIGEST_DAILY
+    daily.profile.save()
+    articles = [
+        Article.objects.create(
+            title=f"Summit {n}", url=f"https://example.com/{n}",
+            category=world,
+        )
+        for n in range(3)
+    ]
+    Notification.objects.all().delete()
+
+    fan_out_new_articles([article.id for article in articles])
+    assert not Notification.objects.filter(user=daily).exists()
+    assert Notification.objects.filter(user=instant).count() == 1
+
+    assert send_daily_digests() == "1 daily digests sent."
+    digest = Notification.objects.get(user=daily)
+    assert digest.article_count == 3
+    # Already-covered articles are not sent again
+    assert send_daily_digests() == "0 daily digests sent."
+    later = Article.objects.create(
+        title="Summit 4", url="https://example.com/4", category=world
+    )
+    send_daily_digests()
+    assert Notification.objects.filter(
+        user=daily, article_count=1, link=later.get_absolute_url()
+    ).exists()
+
+
+def test_daily_digest_cursor_is_durable_and_id_based(client):
+    world = Category.objects.create(name="World", slug="world")
+    daily = make_follower("daily", world)
+    daily.profile.digest_frequency = Profile.DIGEST_DAILY
+    daily.profile.save()
+    Article.objects.create(
+        title="Summit", url="https://example.com/summit", category=world
+    )
+    assert send_daily_digests() == "1 daily digests sent."
+
+    # A feed backdates this article, and the cache is flushed
+    backdated = Article.objects.create(
+        title="Archive", url="https://example.com/archive", category=world
+    )
+    Article.objects.filter(pk=backdated.pk).update(
+        published_at=timezone.now() - timedelta(days=30)
+    )
+    cache.clear()
+    assert send_daily_digests() == "1 daily digests sent."
+    assert send_daily_digests() == "0 daily digests sent."
+    cursor = TaskCursor.objects.get(name=TaskCursor.DAILY_DIGEST)
+    assert cursor.position == backdated.id
+
+
+def test_missing_daily_digest_cursor_starts_from_now(client):
+    world = Category.objects.create(name="World", slug="world")
+    article = Article.objects.create(
+        title="Summit", url="https://example.com/summit", category=world
+    )
+    TaskCursor.objects.all().delete()
+    assert send_daily_digests() == "0 daily digests sent."
+    assert TaskCursor.objects.get().position == article.id
+
+
+def test_update_notifications_sets_digest_frequency(client):
+    user = make_follower("settings")
+    client.force_login(user)
+    url = reverse("users:update_notifications")
+    headers = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+    response = client.post(url, {
+        "notification_preferences": "on", "digest_frequency": "daily",
+    }, **headers)
+    assert response.json()["success"] is True
+    user.profile.refresh_from_db()
+    assert user.profile.digest_frequency == Profile.DIGEST_DAILY
+    assert user.profile.notifications_enabled is True
+
+    response = client.post(url, {"digest_frequency": "hourly"}, **headers)
+    assert response.status_code == 400
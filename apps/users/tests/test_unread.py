@@ -0,0 +1,152 @@
+"""
+Tests for the cached unread notification counters.
+Located at: apps/users/tests/test_unread.py
+"""
+
+import pytest
+import redis
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.news.models import Article, Category
+from apps.users import unread
+from apps.users.models import Notification
+from apps.users.tasks import fan_out_new_articles
+from apps.users.unread import (
+    get_unread_count, get_unread_key, reconcile_unread_counts
+)
+from core.context_processors import notifications_unread_count
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+AJAX = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+
+@pytest.fixture
+def user(fake_redis):
+    return User.objects.create_user(username="reader", password="pw")
+
+
+def notify(user, n=1, **fields):
+    return [
+        Notification.objects.create(user=user, message=f"N{i}", **fields)
+        for i in range(n)
+    ]
+
+
+def test_count_is_cached_after_first_read(user):
+    notify(user, 2)
+    assert get_unread_count(user.id) == 2
+    request = RequestFactory().get("/")
+    request.user = user
+    with CaptureQueriesContext(connection) as ctx:
+        context = notifications_unread_count(request)
+    assert context == {"notifications_unread_count": 2}
+    assert len(ctx.captured_queries) == 0
+
+
+def test_creation_and_reads_adjust_the_counter(
+    client, user, django_capture_on_commit_callbacks
+):
+    assert get_unread_count(user.id) == 0
+    with django_capture_on_commit_callbacks(execute=True):
+        first, second, third = notify(user, 3)
+    assert get_unread_count(user.id) == 3
+
+    client.force_login(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("users:mark_notification_read"), {"id": first.id})
+        # Marking it again changes nothing
+        client.post(reverse("users:mark_notification_read"), {"id": first.id})
+    assert get_unread_count(user.id) == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("users:mark_all_notifications_read"), **AJAX)
+    assert get_unread_count(user.id) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        notify(user, 2)
+        client.post(reverse("users:clear_notifications"))
+    assert get_unread_count(user.id) == 0
+    assert not Notification.objects.exists()
+
+
+def test_missing_notification_still_404s(client, user):
+    client.force_login(user)
+    response = client.post(reverse("users:mark_notification_read"), {"id": 0})
+    assert response.status_code == 404
+
+
+def test_adjustments_do_not_create_missing_counters(
+    user, fake_redis, django_capture_on_commit_callbacks
+):
+    notify(user, 2)
+    with django_capture_on_commit_callbacks(execute=True):
+        notify(user, 1)
+    assert fake_redis.get(get_unread_key(user.id)) is None
+    assert get_unread_count(user.id) == 3
+
+
+def test_bulk_fan_out_counts_new_rows_only(
+    fake_redis, django_capture_on_commit_callbacks
+):
+    sport = Category.objects.create(name="Sport", slug="sport")
+    fan = User.objects.create_user(username="fan", password="pw")
+    fan.profile.preferred_categories.add(sport)
+    first, second = (
+        Article.objects.create(
+            title=t, url=f"https://example.com/{t}", category=sport
+        )
+        for t in ("a", "b")
+    )
+    Notification.objects.all().delete()
+    assert get_unread_count(fan.id) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        fan_out_new_articles([first.id])
+        fan_out_new_articles([second.id])  # folded into the digest
+    assert get_unread_count(fan.id) == 1
+
+
+def test_preview_skips_the_query_when_nothing_is_unread(client, user):
+    client.force_login(user)
+    get_unread_count(user.id)
+    url = reverse("users:fetch_notifications_preview")
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, **AJAX)
+    assert response.json()["count"] == 0
+    assert not any(
+        "users_notification" in query["sql"]
+        for query in ctx.captured_queries
+    )
+
+
+def test_reconcile_repairs_drift(user, fake_redis):
+    notify(user, 2)
+    get_unread_count(user.id)
+    fake_redis.set(get_unread_key(user.id), 7)
+    assert reconcile_unread_counts() == 1
+    assert get_unread_count(user.id) == 2
+    assert reconcile_unread_counts() == 0
+
+
+def test_falls_back_to_database_without_redis(user, monkeypatch):
+    notify(user, 1)
+
+    class BrokenRedis:
+        def get(self, key):
+            raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(unread, "redis_client", BrokenRedis())
+    assert get_unread_count(user.id) == 1
+
+
+def test_deleting_the_user_drops_the_counter(user, fake_redis):
+    get_unread_count(user.id)
+    user.delete()
+    assert fake_redis.get(get_unread_key(user.id)) is None
@@ -104,6 +104,29 @@ def test_remove_saved_article(logged_in_client, user_with_password):
     assert not article.saves.filter(id=user_with_password.id).exists()
 
 
+@pytest.mark.parametrize(
+    "name", ["users:remove_saved_article", "users:remove_upvoted_article"]
+)
+def test_remove_article_rejects_bad_ids(logged_in_client, name):
+    article = Article.objects.create(
+        title="Sample Article",
+        content="Some content",
+        url="https://example.com/sample",
+        slug="sample-article"
+    )
+    url = reverse(name)
+    ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+    assert logged_in_client.post(
+        url, {"id": "abc"}, **ajax
+    ).status_code == 400
+    assert logged_in_client.post(
+        url, {"id": article.id + 1}, **ajax
+    ).status_code == 404
+    assert logged_in_client.post(
+        url, {"id": article.id}, **ajax
+    ).status_code == 400
+
+
 def test_clear_saved_articles(logged_in_client, user_with_password):
     article = Article.objects.create(
         title="Sample Article",
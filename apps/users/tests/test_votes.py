@@ -0,0 +1,165 @@
+"""
+Tests for the single-table comment votes.
+Located at: apps/users/tests/test_votes.py
+"""
+
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.urls import reverse
+
+from apps.news.counters import verify_counters
+from apps.news.models import Article
+from apps.news.views import get_sorted_comments
+from apps.users.models import Comment, CommentVote
+from apps.users.votes import (
+    DOWNVOTE, UPVOTE, cast_vote, remove_user_votes
+)
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def article(db):
+    return Article.objects.create(
+        title="Story", url="https://example.com/story", content="x"
+    )
+
+
+@pytest.fixture
+def users(db):
+    return [
+        User.objects.create_user(username=f"reader{i}", password="pw")
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def comment(article, users):
+    return Comment.objects.create(
+        article=article, user=users[0], content="Hi"
+    )
+
+
+def counters(comment):
+    comment.refresh_from_db()
+    return comment.upvote_count, comment.downvote_count, comment.score
+
+
+def test_first_vote_flip_and_repeat(comment, users):
+    assert cast_vote(comment, users[0].id, UPVOTE) == 0
+    assert cast_vote(comment, users[1].id, UPVOTE) == 0
+    assert counters(comment) == (2, 0, 2)
+
+    assert cast_vote(comment, users[1].id, DOWNVOTE) == UPVOTE
+    assert counters(comment) == (1, 1, 0)
+
+    # Repeating a vote changes nothing
+    assert cast_vote(comment, users[1].id, DOWNVOTE) == DOWNVOTE
+    assert counters(comment) == (1, 1, 0)
+    assert CommentVote.objects.count() == 2
+    assert not any(verify_counters().values())
+
+
+def test_invalid_value_is_rejected(comment, users):
+    with pytest.raises(ValueError):
+        cast_vote(comment, users[0].id, 2)
+    assert not CommentVote.objects.exists()
+
+
+def test_vote_endpoint_reports_the_score(client, comment, users):
+    client.force_login(users[1])
+    response = client.post(
+        reverse("news:vote_comment", args=[comment.id, "downvote"])
+    )
+    assert response.json()["score"] == -1
+
+
+def test_removing_a_users_votes_updates_each_comment(article, users):
+    first, second = (
+        Comment.objects.create(article=article, user=users[0], content=c)
+        for c in ("A", "B")
+    )
+    first.upvote(users[1])
+    first.upvote(users[2])
+    second.downvote(users[1])
+    remove_user_votes(users[1].id)
+    assert counters(first) == (1, 0, 1)
+    assert counters(second) == (0, 0, 0)
+    assert not any(verify_counters().values())
+
+
+def test_most_upvoted_sorts_top_level_comments_by_score(article, users):
+    liked, disliked, quiet = (
+        Comment.objects.create(article=article, user=users[0], content=c)
+        for c in ("Liked", "Disliked", "Quiet")
+    )
+    Comment.objects.create(
+        article=article, user=users[0], content="Reply", parent=quiet
+    )
+    liked.upvote(users[1])
+    liked.upvote(users[2])
+    disliked.downvote(users[1])
+    ordered = get_sorted_comments(article, "most_upvoted")
+    assert list(ordered) == [liked, quiet, disliked]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_votes_keep_one_vote_per_user():
+    article = Article.objects.create(
+        title="Debate", url="https://example.com/debate", content="x"
+    )
+    voters = [
+        User.objects.create_user(username=f"voter{i}", password="pw")
+        for i in range(4)
+    ]
+    comment = Comment.objects.create(
+        article=article, user=voters[0], content="Hot take"
+    )
+    votes_per_thread = 25
+    start = threading.Barrier(len(voters) * 2)
+    errors = []
+
+    def vote(user, value):
+        # SQLite fails concurrent writers instead of blocking; retry
+        while True:
+            try:
+                return cast_vote(
+                    Comment.objects.get(pk=comment.pk), user.id, value
+                )
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                time.sleep(0.001)
+
+    def clicker(user, value):
+        start.wait()
+        try:
+            for i in range(votes_per_thread):
+                vote(user, value if i % 2 else -value)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    # Each user upvotes and downvotes from two threads at once
+    threads = [
+        threading.Thread(target=clicker, args=(user, value))
+        for user in voters for value in (UPVOTE, DOWNVOTE)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert CommentVote.objects.count() == len(voters)
+    upvotes, downvotes, score = counters(comment)
+    assert upvotes + downvotes == len(voters)
+    assert score == upvotes - downvotes
+    assert not any(verify_counters().values())
@@ -0,0 +1,140 @@
+"""
+Per-user unread notification counters cached in Redis.
+The navbar shows the unread count on every page, so it is read from
+one Redis key per user instead of a COUNT(*) per render. Creating a
+notification, marking notifications read and clearing them adjust the
+key after commit; a missing key is filled from the database on the
+next read. Adjustments only touch keys that already exist (a Lua
+check-and-increment), so a missing counter is never started from a
+partial delta, and each new count is published to the user's open
+notification streams. reconcile_unread_counts() periodically rewrites
+every cached counter from the database to repair any drift.
+Located at: apps/users/unread.py
+"""
+
+import logging
+
+import redis
+from django.db import transaction
+from django.db.models import Count
+
+from apps.users.models import Notification
+from apps.users.stream import UNREAD, publish_events
+from core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "notifications:unread:"
+
+# Idle users' counters expire; the next read recomputes them
+UNREAD_COUNT_TTL = 24 * 60 * 60
+
+# INCRBY only if the counter exists
+INCREMENT_IF_EXISTS = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('incrby', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+def get_unread_key(user_id):
+    return f"{KEY_PREFIX}{user_id}"
+
+
+def count_unread(user_id):
+    return Notification.objects.filter(user_id=user_id, read=False).count()
+
+
+def get_unread_count(user_id):
+    """
+    Return the user's unread notification count, from Redis when the
+    counter is cached (no database query).
+    """
+    key = get_unread_key(user_id)
+    try:
+        cached = redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Unread counter unavailable: {e}")
+        return count_unread(user_id)
+    if cached is not None:
+        return max(int(cached), 0)
+    count = count_unread(user_id)
+    try:
+        redis_client.set(key, count, ex=UNREAD_COUNT_TTL, nx=True)
+    except redis.RedisError as e:
+        logger.warning(f"Could not cache unread counter: {e}")
+    return count
+
+
+def _apply_deltas(deltas):
+    try:
+        increment = redis_client.register_script(INCREMENT_IF_EXISTS)
+        pipe = redis_client.pipeline(transaction=False)
+        for user_id, delta in deltas.items():
+            increment(
+                keys=[get_unread_key(user_id)], args=[delta], client=pipe
+            )
+        counts = pipe.execute()
+    except redis.RedisError as e:
+        # Drop the counters rather than leave them wrong
+        logger.warning(f"Could not adjust unread counters: {e}")
+        forget_unread_counts(deltas)
+        return
+    # Open notification streams show the new counts (see stream.py)
+    publish_events([
+        (user_id, UNREAD, {"count": max(int(count), 0)})
+        for user_id, count in zip(deltas, counts) if count is not None
+    ])
+
+
+def adjust_unread_counts(deltas):
+    """
+    Add {user_id: change} to the cached counters once the current
+    transaction commits.
+    """
+    deltas = {user_id: n for user_id, n in deltas.items() if n}
+    if deltas:
+        transaction.on_commit(lambda: _apply_deltas(deltas))
+
+
+def forget_unread_counts(user_ids):
+    """
+    Drop cached counters so the next read recomputes them.
+    """
+    keys = [get_unread_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Could not drop unread counters: {e}")
+
+
+def reconcile_unread_counts(batch_size=500):
+    """
+    Rewrite every cached counter from the database; returns how many
+    were corrected. Counters are only overwritten, never created, so
+    keys that expire meanwhile stay gone.
+    """
+    user_ids = [
+        int(key[len(KEY_PREFIX):])
+        for key in redis_client.scan_iter(match=f"{KEY_PREFIX}*")
+    ]
+    corrected = 0
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        counts = dict(
+            Notification.objects.filter(user_id__in=batch, read=False)
+            .values_list("user_id").annotate(n=Count("id"))
+        )
+        keys = [get_unread_key(user_id) for user_id in batch]
+        cached = redis_client.mget(keys)
+        pipe = redis_client.pipeline(transaction=False)
+        for user_id, key, value in zip(batch, keys, cached):
+            count = counts.get(user_id, 0)
+            if value is not None and int(value) != count:
+                pipe.set(key, count, ex=UNREAD_COUNT_TTL, xx=True)
+                corrected += 1
+        pipe.execute()
+    return corrected
@@ -46,6 +46,8 @@ urlpatterns = [
     # Notifications management
     path("notifications/preview/", views.fetch_unread_notifications,
          name="fetch_notifications_preview"),
+    path("notifications/stream/", views.notification_stream,
+         name="notification_stream"),
     path('toggle_notifications/', views.toggle_notifications,
          name='toggle_notifications'),
     path('profile/update_notifications/', views.update_notifications,
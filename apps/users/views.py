@@ -15,14 +15,23 @@ from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
-from django.http import JsonResponse
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 from allauth.account.utils import send_email_confirmation
 import json
+from asgiref.sync import sync_to_async
 from .models import Profile, Comment, ContactMessage, Notification
-from apps.news.models import Category
+from apps.news.engagement import (
+    LIKE, SAVE, apply_engagement_state, remove_engagement
+)
+from apps.news.lookups import category_lookup
 from apps.news.models import Article
 from .forms import ProfileForm, ContactForm
+from .unread import adjust_unread_counts, get_unread_count
+from .stream import event_stream
+from .tasks import clear_user_comments
 
 User = get_user_model()
 
@@ -46,11 +55,14 @@ def profile_view(request):
             return redirect("users:profile")
         messages.error(request, "There was an error updating your profile.")
 
-    # Fetch saved (bookmarked) articles
-    saved_articles = request.user.saved_articles.all()
-
-    # Fetch upvoted articles
-    upvoted_articles = request.user.liked_articles.all()
+    # Fetch saved (bookmarked) and upvoted articles, each marked with
+    # the user's other engagement with it
+    saved_articles = apply_engagement_state(
+        request.user, request.user.saved_articles.all()
+    )
+    upvoted_articles = apply_engagement_state(
+        request.user, request.user.liked_articles.all()
+    )
 
     # Fetch user comments with related articles
     # (to display article titles in the profile)
@@ -70,7 +82,10 @@ def profile_view(request):
         "preferred_category_names": list(
             profile.preferred_categories.values_list('name', flat=True)
         ),
-        "categories": Category.objects.exclude(name__iexact="General"),
+        "categories": [
+            category for category in category_lookup.all()
+            if category.name.lower() != "general"
+        ],
     }
 
     return render(request, "users/profile.html", context)
@@ -225,17 +240,46 @@ def fetch_unread_notifications(request):
     Returns the rendered HTML for recent unread notifications (AJAX).
     """
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        # Nothing unread (the common case) needs no query at all
+        count = get_unread_count(request.user.id)
         notifications = request.user.notifications.filter(
             read=False
-        ).order_by('-created_at')[:3]
+        ).order_by('-created_at')[:3] if count else []
         html = render_to_string(
             "partials/notifications_preview.html",
             {"notifications": notifications}
         )
-        return JsonResponse({"success": True, "html": html})
+        return JsonResponse({"success": True, "html": html, "count": count})
     return JsonResponse({"success": False}, status=400)
 
 
+async def notification_stream(request):
+    """
+    Server-sent events carrying the user's unread count and new
+    notifications (see stream.py). Browsers without EventSource, or
+    whose stream keeps failing, poll fetch_unread_notifications.
+    The stream needs an ASGI server (core.asgi, see Procfile): under
+    WSGI, Django reads an async iterator to the end before sending
+    anything, so there it answers 204, which closes the browser's
+    EventSource and makes it poll instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user_id = await sync_to_async(
+        lambda: request.user.id if request.user.is_authenticated else None
+    )()
+    if user_id is None:
+        return JsonResponse({"success": False}, status=401)
+    count = await sync_to_async(get_unread_count)(user_id)
+    response = StreamingHttpResponse(
+        event_stream(user_id, count), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @login_required
 def toggle_notifications(request):
     """
@@ -276,6 +320,14 @@ def update_notifications(request):
         profile.notifications_enabled = request.POST.get(
             'notification_preferences'
         ) is not None
+        frequency = request.POST.get('digest_frequency')
+        if frequency is not None:
+            if frequency not in dict(Profile.DIGEST_CHOICES):
+                return JsonResponse(
+                    {'success': False, 'error': 'Invalid digest option.'},
+                    status=400
+                )
+            profile.digest_frequency = frequency
 
         try:
             profile.save()
@@ -296,24 +348,24 @@ def notification_list(request):
     notifications = request.user.notifications.order_by('-created_at')
     return render(
         request, "users/notifications.html", {
-            "notifications": notifications})
+            "notifications": notifications,
+            "digest_choices": Profile.DIGEST_CHOICES})
 
 
 @login_required
 @require_POST
 def mark_notification_read(request):
     notification_id = request.POST.get("id")
-    try:
-        notification = Notification.objects.get(
-            id=notification_id, user=request.user
-        )
-        notification.read = True
-        notification.save()
-        return JsonResponse({"success": True})
-    except Notification.DoesNotExist:
+    notifications = Notification.objects.filter(
+        id=notification_id, user=request.user
+    )
+    if notifications.filter(read=False).update(read=True):
+        adjust_unread_counts({request.user.id: -1})
+    elif not notifications.exists():
         return JsonResponse(
             {"success": False, "error": "Notification not found"}, status=404
         )
+    return JsonResponse({"success": True})
 
 
 @login_required
@@ -324,7 +376,10 @@ def mark_all_notifications_read(request):
     if request.method == "POST" and request.headers.get(
         "X-Requested-With"
     ) == "XMLHttpRequest":
-        request.user.notifications.filter(read=False).update(read=True)
+        marked = request.user.notifications.filter(
+            read=False
+        ).update(read=True)
+        adjust_unread_counts({request.user.id: -marked})
         return JsonResponse(
             {'success': True, 'message': "All notifications marked as read."}
         )
@@ -337,29 +392,46 @@ def mark_all_notifications_read(request):
 @login_required
 def clear_notifications(request):
     if request.method == "POST":
-        Notification.objects.filter(user=request.user).delete()
+        notifications = Notification.objects.filter(user=request.user)
+        unread, _ = notifications.filter(read=False).delete()
+        notifications.delete()
+        adjust_unread_counts({request.user.id: -unread})
     return redirect("users:notification_list")
 
 
+def remove_article_engagement(request, kind, error):
+    """
+    Undo the user's like or save of the posted article. An id that is
+    not a number is a bad request and an unknown article a 404; the
+    extra lookup only runs when there was nothing to remove.
+    """
+    article_id = request.POST.get("id")
+    if not article_id:
+        return JsonResponse(
+            {"success": False, "error": "Missing article ID"}, status=400
+        )
+    try:
+        article_id = int(article_id)
+    except ValueError:
+        return JsonResponse(
+            {"success": False, "error": "Invalid article ID"}, status=400
+        )
+
+    if remove_engagement(kind, article_id, request.user.id):
+        return JsonResponse({"success": True})
+
+    get_object_or_404(Article.objects.only("id"), pk=article_id)
+    return JsonResponse({"success": False, "error": error}, status=400)
+
+
 @login_required
 def remove_saved_article(request):
     """Removes an article from the user's saved list."""
     if request.method == "POST" and request.headers.get(
         "X-Requested-With"
     ) == "XMLHttpRequest":
-        article_id = request.POST.get("id")
-        if not article_id:
-            return JsonResponse(
-                {"success": False, "error": "Missing article ID"}, status=400
-            )
-
-        article = get_object_or_404(Article, id=article_id)
-        if request.user in article.saves.all():
-            article.saves.remove(request.user)
-            return JsonResponse({"success": True})
-
-        return JsonResponse(
-            {"success": False, "error": "Article was not saved"}, status=400
+        return remove_article_engagement(
+            request, SAVE, "Article was not saved"
         )
 
     return JsonResponse(
@@ -375,20 +447,8 @@ def remove_upvoted_article(request):
     if request.method == "POST" and request.headers.get(
         "X-Requested-With"
     ) == "XMLHttpRequest":
-        article_id = request.POST.get("id")
-        if not article_id:
-            return JsonResponse(
-                {"success": False, "error": "Missing article ID"}, status=400
-            )
-
-        article = get_object_or_404(Article, id=article_id)
-
-        if request.user in article.likes.all():
-            article.likes.remove(request.user)
-            return JsonResponse({"success": True})
-
-        return JsonResponse(
-            {"success": False, "error": "Article was not upvoted"}, status=400
+        return remove_article_engagement(
+            request, LIKE, "Article was not upvoted"
         )
 
     return JsonResponse(
@@ -414,7 +474,8 @@ def remove_comment(request):
             Comment, id=comment_id, user=request.user
         )
 
-        comment.delete()  # Uses the overridden `delete()` method
+        # Soft delete (see CommentQuerySet.soft_delete)
+        comment.delete()
         return JsonResponse({"success": True, "message": "Comment deleted."})
 
     return JsonResponse(
@@ -460,16 +521,27 @@ def clear_upvoted_articles(request):
 def clear_comments(request):
     """
     Clears all comments made by the current user.
-    Uses the overridden delete() method on Comment which marks them as deleted.
+    They are soft-deleted in bulk (see CommentQuerySet.soft_delete);
+    more than COMMENT_CLEAR_ASYNC_THRESHOLD comments are cleared by a
+    Celery task instead of inside the request.
     """
     if request.method == "POST" and request.headers.get(
         "X-Requested-With"
     ) == "XMLHttpRequest":
-        user_comments = Comment.objects.filter(user=request.user)
-        for comment in user_comments:
-            # This will mark the comment as "[Deleted]"
-            # per your model override.
-            comment.delete()
+        user_comments = Comment.objects.filter(
+            user=request.user, deleted=False
+        )
+        threshold = settings.COMMENT_CLEAR_ASYNC_THRESHOLD
+        if user_comments.count() > threshold:
+            user_id = request.user.id
+            transaction.on_commit(
+                lambda: clear_user_comments.delay(user_id)
+            )
+            return JsonResponse({
+                "success": True, "queued": True,
+                "message": "Your comments are being cleared.",
+            })
+        user_comments.soft_delete()
         return JsonResponse(
             {"success": True, "message": "All comments cleared."}
         )
@@ -524,9 +596,13 @@ def onboarding(request):
         messages.success(request, "Your categories have been saved.")
         return redirect("home")
     else:
-        categories = Category.objects.exclude(
-            name__iexact="General"
-        ).order_by("name")
+        categories = sorted(
+            (
+                category for category in category_lookup.all()
+                if category.name.lower() != "general"
+            ),
+            key=lambda category: category.name,
+        )
         return render(
             request, "onboarding/category_selection.html",
             {"categories": categories}
@@ -561,7 +637,7 @@ def test_onboarding(request):
     """
     Temporary test view for category selection.
     """
-    categories = Category.objects.all()
+    categories = category_lookup.all()
     return render(
         request, "onboarding/category_selection.html",
         {"categories": categories}
@@ -0,0 +1,138 @@
+"""
+Comment votes.
+Each user has at most one CommentVote per comment, holding +1 or -1.
+cast_vote() records it with single conditional statements whose row
+counts say what happened: INSERT ... ON CONFLICT DO NOTHING for a first
+vote, otherwise an UPDATE of rows whose value differs, which flips the
+vote or finds it unchanged. The comment's upvote_count, downvote_count
+and score then move by F() updates in the same transaction. A user can
+therefore never be counted in both directions, and parallel clicks
+cannot make the counters drift.
+Located at: apps/users/votes.py
+"""
+
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from apps.users.engagement_cache import (
+    DOWNVOTED, UPVOTED, update_engagement_sets
+)
+from apps.users.models import Comment, CommentVote
+
+UPVOTE = CommentVote.UPVOTE
+DOWNVOTE = CommentVote.DOWNVOTE
+
+
+def get_deltas(old, new):
+    """
+    Counter changes for a vote going from `old` to `new` (0 for none).
+    """
+    return {
+        "upvote_count": (new == UPVOTE) - (old == UPVOTE),
+        "downvote_count": (new == DOWNVOTE) - (old == DOWNVOTE),
+        "score": new - old,
+    }
+
+
+def apply_deltas(comment_ids, deltas):
+    """
+    Add the deltas to the counters of the given comments in one UPDATE;
+    the vote counts never go below zero.
+    """
+    values = {}
+    for field, delta in deltas.items():
+        if not delta:
+            continue
+        value = F(field) + delta
+        if delta < 0 and field != "score":
+            value = Greatest(value, Value(0))
+        values[field] = value
+    if comment_ids and values:
+        Comment.objects.filter(pk__in=comment_ids).update(**values)
+
+
+def _insert(comment_id, user_id, value):
+    quote = connection.ops.quote_name
+    table = quote(CommentVote._meta.db_table)
+    user, comment, vote = (
+        quote(CommentVote._meta.get_field(name).column)
+        for name in ("user", "comment", "value")
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({user}, {comment}, {vote}) "
+            "VALUES (%s, %s, %s) ON CONFLICT DO NOTHING",
+            [user_id, comment_id, value],
+        )
+        return cursor.rowcount == 1
+
+
+def _upsert(comment_id, user_id, value):
+    """
+    Store the vote and return the previous value (0 if there was none).
+    """
+    if _insert(comment_id, user_id, value):
+        return 0
+    flipped = CommentVote.objects.filter(
+        comment_id=comment_id, user_id=user_id
+    ).exclude(value=value).update(value=value)
+    return -value if flipped else value
+
+
+def cast_vote(comment, user_id, value):
+    """
+    Record the user's UPVOTE or DOWNVOTE on the comment and refresh the
+    comment's counters; returns the previous value (0 for none).
+    """
+    if value not in (UPVOTE, DOWNVOTE):
+        raise ValueError(f"Invalid vote value: {value}")
+    with transaction.atomic():
+        old = _upsert(comment.id, user_id, value)
+        if old != value:
+            apply_deltas([comment.id], get_deltas(old, value))
+            update_engagement_sets([
+                (user_id, UPVOTED, comment.id, value == UPVOTE),
+                (user_id, DOWNVOTED, comment.id, value == DOWNVOTE),
+            ])
+    comment.refresh_from_db(
+        fields=["upvote_count", "downvote_count", "score"]
+    )
+    return old
+
+
+def delete_votes(comments):
+    """
+    Delete every vote on a queryset of comments with one DELETE and
+    take the voters' engagement sets with them. The caller zeroes the
+    comments' counters in the same transaction (see
+    CommentQuerySet.soft_delete).
+    """
+    votes = CommentVote.objects.filter(comment__in=comments)
+    voters = list(votes.values_list("user_id", "comment_id", "value"))
+    if not voters:
+        return
+    votes.delete()
+    update_engagement_sets(
+        (user_id, UPVOTED if value == UPVOTE else DOWNVOTED, comment_id,
+         False)
+        for user_id, comment_id, value in voters
+    )
+
+
+def remove_user_votes(user_id):
+    """
+    Delete a user's votes, taking them off each comment's counters with
+    one UPDATE per vote direction.
+    """
+    votes = CommentVote.objects.filter(user_id=user_id)
+    by_value = defaultdict(list)
+    for comment_id, value in votes.values_list("comment_id", "value"):
+        by_value[value].append(comment_id)
+    if not by_value:
+        return
+    votes.delete()
+    for value, comment_ids in by_value.items():
+        apply_deltas(comment_ids, get_deltas(value, 0))
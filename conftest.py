@@ -0,0 +1,56 @@
+"""
+Project-wide pytest fixtures.
+Located at: conftest.py
+"""
+
+import pytest
+from django.core.cache import cache
+
+from apps.news import view_counts
+from apps.news.lookups import clear_lookup_caches
+
+# Modules holding their own reference to core.redis_client.redis_client
+REDIS_CLIENT_MODULES = [
+    "core.redis_client",
+    "apps.news.tasks",
+    "apps.news.lookups",
+    "apps.news.classifier",
+    "apps.news.article_cache",
+    "apps.news.view_counts",
+    "apps.news.unique_views",
+    "apps.news.trending",
+    "apps.news.autocomplete",
+    "apps.users.unread",
+    "apps.users.stream",
+    "apps.users.engagement_cache",
+]
+
+
+def clear_process_state():
+    clear_lookup_caches()
+    view_counts._local_pending.clear()
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_process_state():
+    """
+    Test transactions roll back without firing model signals, so the
+    per-process lookup caches, view buffer and Django cache (homepage
+    fragments) are emptied around every test instead.
+    """
+    clear_process_state()
+    yield
+    clear_process_state()
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """
+    Point every module's Redis client at one in-memory fake server.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeStrictRedis(decode_responses=True)
+    for module in REDIS_CLIENT_MODULES:
+        monkeypatch.setattr(f"{module}.redis_client", client)
+    return client
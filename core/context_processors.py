@@ -5,6 +5,7 @@ Located at: core/context_processors.py
 
 from django.contrib.auth.forms import AuthenticationForm
 from allauth.account.forms import SignupForm
+from apps.users.unread import get_unread_count
 
 
 def auth_forms(request):
@@ -20,7 +21,8 @@ def notifications_unread_count(request):
     count = 0
     try:
         if request.user.is_authenticated:
-            count = request.user.notifications.filter(read=False).count()
+            # Cached in Redis (see apps/users/unread.py)
+            count = get_unread_count(request.user.id)
     except Exception:
         pass
     return {"notifications_unread_count": count}
@@ -0,0 +1,14 @@
+"""
+Shared Redis client for application-level caching and counters.
+Every module that talks to Redis directly imports redis_client from here,
+so gunicorn and Celery workers hold one connection pool per process.
+Located at: core/redis_client.py
+"""
+
+import redis
+from django.conf import settings
+
+# Initialize Redis client using full REDIS_URL (e.g., from Upstash)
+redis_client = redis.StrictRedis.from_url(
+    settings.REDIS_URL, decode_responses=True
+)
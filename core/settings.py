@@ -91,9 +91,15 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 DATABASE_URL = config("DATABASE_URL", default=None)
 
+# Persistent connections are not reliably reused or closed under ASGI
+# (the web tier runs on uvicorn workers, see Procfile), so by default
+# every request closes its connection; raise it for WSGI deployments
+DB_CONN_MAX_AGE = config("DB_CONN_MAX_AGE", default=0, cast=int)
+
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600,
+        'default': dj_database_url.parse(DATABASE_URL,
+                                         conn_max_age=DB_CONN_MAX_AGE,
                                          ssl_require=True)
     }
 else:
@@ -199,6 +205,7 @@ JAZZMIN_SETTINGS = {
         "news.Article": "fas fa-newspaper",
         "news.NewsSource": "fas fa-globe",
         "news.Category": "fas fa-tags",
+        "news.CategoryKeyword": "fas fa-key",
         "auth.User": "fas fa-users-cog",
     },
 
@@ -342,9 +349,48 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # API Keys
 GNEWS_API_KEY = config("GNEWS_API_KEY")
 
+# News feeds pulled on every fetch cycle (see apps/news/sources.py)
+# Types: "gnews" (topic, country), "rss" (name, url), "json" (name, url)
+NEWS_FEED_SOURCES = [
+    {"type": "gnews", "country": "gb"},
+]
+NEWS_FETCH_MAX_WORKERS = 8  # concurrent feed downloads
+NEWS_FETCH_MAX_PER_HOST = 2  # concurrent requests to any single host
+NEWS_FETCH_TIMEOUT = 10  # seconds
+
 # Redis Configuration
 REDIS_URL = config("REDIS_URL")
 
+# Seconds between checks of the shared Category/NewsSource lookup version
+LOOKUP_CACHE_CHECK_INTERVAL = 5
+
+# Seconds a web process buffers views itself while Redis is unreachable
+VIEW_COUNT_LOCAL_FLUSH_INTERVAL = 30
+
+# Hours for an engagement event's weight in trending to halve
+TRENDING_HALF_LIFE_HOURS = 12
+
+# Seconds a cached homepage section is served before it is rebuilt
+HOMEPAGE_FRAGMENT_TTL = 60
+
+# Result totals on search/listing pages: "exact", "cached" (for five
+# minutes) or "estimate" (PostgreSQL planner rows, else cached)
+SEARCH_COUNT_MODE = "cached"
+
+# Seconds a search result page (ids, total, facets) stays cached; the
+# corpus version retires entries sooner whenever articles change
+SEARCH_CACHE_TTL = 60 * 60
+
+# New-article notifications for a user and category within this many
+# minutes are folded into one unread digest
+NOTIFICATION_DIGEST_WINDOW_MINUTES = 60
+
+# Users with more comments than this have "clear all comments" run as a
+# Celery task instead of inside the request
+COMMENT_CLEAR_ASYNC_THRESHOLD = config(
+    "COMMENT_CLEAR_ASYNC_THRESHOLD", default=1000, cast=int
+)
+
 # Celery Configuration
 CELERY_BROKER_URL = config("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = config("CELERY_RESULT_BACKEND")
@@ -360,6 +406,22 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.news.tasks.delete_expired_articles',
         'schedule': crontab(hour=0, minute=0),  # every day at midnight
     },
+    'flush-article-views-every-minute': {
+        'task': 'apps.news.tasks.flush_article_views',
+        'schedule': 60.0,  # every minute
+    },
+    'reconcile-trending-every-10-minutes': {
+        'task': 'apps.news.tasks.reconcile_trending_articles',
+        'schedule': 600.0,  # every 10 minutes
+    },
+    'send-daily-digests-every-morning': {
+        'task': 'apps.users.tasks.send_daily_digests',
+        'schedule': crontab(hour=7, minute=0),  # every day at 07:00
+    },
+    'reconcile-unread-counts-every-30-minutes': {
+        'task': 'apps.users.tasks.reconcile_unread_notification_counts',
+        'schedule': 1800.0,  # every 30 minutes
+    },
     'redis-heartbeat-every-5-days': {
         'task': 'apps.news.tasks.redis_heartbeat',
         'schedule': 5 * 86400.0,  # every 5 days
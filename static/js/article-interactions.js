@@ -53,6 +53,36 @@ document.addEventListener('DOMContentLoaded', function() {
     });
   }
 
+  // === Engagement state for cards rendered from shared cached fragments ===
+  document.querySelectorAll('[data-engagement-url]').forEach(function(container) {
+    const ids = new Set();
+    container.querySelectorAll('.like-btn').forEach(function(button) {
+      ids.add(button.dataset.articleId);
+    });
+    if (!ids.size) return;
+    const url = `${container.dataset.engagementUrl}?ids=${[...ids].join(',')}`;
+    fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+    .then(response => response.json())
+    .then(data => {
+      const classes = {
+        liked: '.like-btn', saved: '.save-btn', commented: '.comment-count'
+      };
+      Object.entries(data.articles).forEach(([articleId, flags]) => {
+        Object.entries(classes).forEach(([flag, selector]) => {
+          container.querySelectorAll(
+            `${selector}[data-article-id="${articleId}"]`
+          ).forEach(function(element) {
+            element.classList.toggle('active', flags[flag]);
+            if (flag !== 'commented') {
+              element.setAttribute('aria-pressed', flags[flag]);
+            }
+          });
+        });
+      });
+    })
+    .catch(error => console.error('Error loading engagement state:', error));
+  });
+
   // === Event Listeners for Article Card Buttons ===
   document.querySelectorAll('.like-btn').forEach(function(button) {
     button.addEventListener('click', function(e) {
@@ -71,6 +101,8 @@ document.addEventListener('DOMContentLoaded', function() {
       .then(data => {
         if (data.success) {
           this.innerHTML = `<i class="fas fa-thumbs-up"></i> ${data.likes_count}`;
+          this.classList.toggle('active', data.liked);
+          this.setAttribute('aria-pressed', data.liked);
           const message = data.liked ? "Article liked!" : "Article unliked!";
           showToast(message);
         } else {
@@ -102,6 +134,8 @@ document.addEventListener('DOMContentLoaded', function() {
       .then(data => {
         if (data.success) {
           this.innerHTML = `<i class="fas fa-bookmark"></i> ${data.saves_count}`;
+          this.classList.toggle('active', data.saved);
+          this.setAttribute('aria-pressed', data.saved);
           const message = data.saved ? "Article saved!" : "Article unsaved!";
           showToast(message);
         } else {
@@ -114,4 +114,101 @@ document.addEventListener('DOMContentLoaded', function() {
       .catch(() => showToast("Error marking notification as read", "danger"));
     });
   });
+
+  const settingsForm = document.getElementById("notificationSettingsForm");
+  if (settingsForm) {
+    settingsForm.addEventListener("submit", function (event) {
+      event.preventDefault();
+      fetch(settingsForm.action, {
+        method: "POST",
+        headers: {
+          "X-CSRFToken": getCSRFToken(),
+          "X-Requested-With": "XMLHttpRequest"
+        },
+        body: new FormData(settingsForm)
+      })
+      .then(response => response.json())
+      .then(data => {
+        if (data.success) {
+          showToast("Notification settings saved", "success");
+        } else {
+          showToast("Error updating notification settings", "danger");
+        }
+      })
+      .catch(() => showToast("Error updating notification settings", "danger"));
+    });
+  }
+
+  // Live unread count: server-sent events, polling the preview if the
+  // stream is unavailable
+  const profileButton = document.querySelector("[data-notification-stream]");
+  if (profileButton) {
+    const POLL_MS = 60000;
+    const MAX_STREAM_FAILURES = 3;
+    let lastCount = null;
+    let failures = 0;
+
+    function showCount(count) {
+      let badge = document.getElementById("notification-count");
+      if (count > 0) {
+        if (!badge) {
+          badge = document.createElement("span");
+          badge.id = "notification-count";
+          badge.className = "badge bg-danger ms-2";
+          profileButton.appendChild(badge);
+        }
+        badge.textContent = count;
+      } else if (badge) {
+        badge.remove();
+      }
+    }
+
+    function refreshPreview() {
+      return fetch(profileButton.dataset.notificationPreview, {
+        headers: { "X-Requested-With": "XMLHttpRequest" }
+      })
+      .then(response => response.json())
+      .then(data => {
+        if (!data.success) return;
+        const previewContainer = document.querySelector("#notification-preview");
+        if (previewContainer) previewContainer.innerHTML = data.html;
+        showCount(data.count);
+      });
+    }
+
+    function onCount(count) {
+      // Only fetch the preview when something new arrived
+      if (lastCount !== null && count > lastCount) refreshPreview();
+      lastCount = count;
+      showCount(count);
+    }
+
+    function poll() {
+      refreshPreview().catch(() => {});
+      setInterval(() => refreshPreview().catch(() => {}), POLL_MS);
+    }
+
+    if (window.EventSource) {
+      const source = new EventSource(profileButton.dataset.notificationStream);
+      source.addEventListener("unread", event => {
+        failures = 0;
+        onCount(JSON.parse(event.data).count);
+      });
+      source.addEventListener("notification", event => {
+        const data = JSON.parse(event.data);
+        showToast(data.message, "info");
+      });
+      source.onerror = function () {
+        failures += 1;
+        // A 204 (no ASGI server) closes the stream for good
+        if (source.readyState === EventSource.CLOSED ||
+            failures >= MAX_STREAM_FAILURES) {
+          source.close();
+          poll();
+        }
+      };
+    } else {
+      poll();
+    }
+  }
 });
@@ -212,7 +212,7 @@ document.addEventListener("DOMContentLoaded", function () {
                         }
                     }
 
-                    showToast("All comments removed.");
+                    showToast(data.queued ? data.message : "All comments removed.");
                     clearCommentsButton.remove();
                 }
             })
@@ -0,0 +1,110 @@
+// search-autocomplete.js
+// Debounced suggestions for every search form with data-autocomplete-url.
+
+document.addEventListener("DOMContentLoaded", function () {
+  const DEBOUNCE_MS = 200;
+  const MIN_LENGTH = 2;
+
+  document.querySelectorAll("input[data-autocomplete-url]").forEach(function (input) {
+    const form = input.closest("form");
+    const list = form && form.querySelector(".search-suggestions");
+    if (!list) return;
+
+    const cache = new Map();
+    let timer = null;
+    let controller = null;
+    let active = -1;
+
+    function hide() {
+      list.classList.add("d-none");
+      list.innerHTML = "";
+      active = -1;
+    }
+
+    function render(suggestions) {
+      list.innerHTML = "";
+      active = -1;
+      if (!suggestions.length) {
+        hide();
+        return;
+      }
+      suggestions.forEach(function (suggestion) {
+        const item = document.createElement("a");
+        item.href = suggestion.url;
+        item.className = "list-group-item list-group-item-action py-1 small text-truncate";
+        item.setAttribute("role", "option");
+        if (suggestion.type !== "article") {
+          const icon = document.createElement("i");
+          icon.className = suggestion.type === "category"
+            ? "fas fa-folder me-2 text-muted"
+            : "fas fa-newspaper me-2 text-muted";
+          item.appendChild(icon);
+        }
+        item.appendChild(document.createTextNode(suggestion.label));
+        list.appendChild(item);
+      });
+      list.classList.remove("d-none");
+    }
+
+    function highlight(index) {
+      const items = list.querySelectorAll("a");
+      if (!items.length) return;
+      active = (index + items.length) % items.length;
+      items.forEach(function (item, i) {
+        item.classList.toggle("active", i === active);
+      });
+    }
+
+    function fetchSuggestions(query) {
+      if (cache.has(query)) {
+        render(cache.get(query));
+        return;
+      }
+      if (controller) controller.abort();
+      controller = new AbortController();
+      const url = input.dataset.autocompleteUrl + "?q=" + encodeURIComponent(query);
+      fetch(url, {
+        headers: { "X-Requested-With": "XMLHttpRequest" },
+        signal: controller.signal
+      })
+        .then(response => response.json())
+        .then(data => {
+          cache.set(query, data.suggestions);
+          if (input.value.trim() === query) render(data.suggestions);
+        })
+        .catch(() => {});
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      const query = input.value.trim();
+      if (query.length < MIN_LENGTH) {
+        if (controller) controller.abort();
+        hide();
+        return;
+      }
+      timer = setTimeout(() => fetchSuggestions(query), DEBOUNCE_MS);
+    });
+
+    input.addEventListener("keydown", function (event) {
+      if (list.classList.contains("d-none")) return;
+      if (event.key === "ArrowDown") {
+        event.preventDefault();
+        highlight(active + 1);
+      } else if (event.key === "ArrowUp") {
+        event.preventDefault();
+        highlight(active - 1);
+      } else if (event.key === "Enter" && active >= 0) {
+        event.preventDefault();
+        window.location.href = list.querySelectorAll("a")[active].href;
+      } else if (event.key === "Escape") {
+        hide();
+      }
+    });
+
+    input.addEventListener("blur", function () {
+      // Let a click on a suggestion land before the list goes away
+      setTimeout(hide, 150);
+    });
+  });
+});